@@ -0,0 +1,51 @@
+# benchmarks/bench_advice_batch.py
+import argparse
+import time
+from src.advisor import generate_advice, generate_advice_batch, get_advisor
+
+
+def make_items(count):
+    """One (spending_data, risks) item per month-like report."""
+    return [
+        (
+            {"Needs": 1500.0 + 10 * i, "Wants": 1200.0 - 5 * i, "Savings/Debt": 800.0},
+            "High" if i % 3 == 0 else "Low",
+        )
+        for i in range(count)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare sequential and batched advice generation throughput."
+    )
+    parser.add_argument("--model", default=None, help="model id (default: env/gpt2)")
+    parser.add_argument("--prompts", type=int, default=24)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[4, 8, 16])
+    args = parser.parse_args()
+
+    try:
+        advisor = get_advisor(args.model)
+    except Exception as e:
+        print(f"Error loading advisor model: {e}")
+        return
+    items = make_items(args.prompts)
+    generate_advice(*items[0], advisor=advisor)  # warm-up
+
+    start = time.perf_counter()
+    for spending_data, risks in items:
+        generate_advice(spending_data, risks, advisor)
+    elapsed = time.perf_counter() - start
+    print(f"prompts: {args.prompts}")
+    print(f"{'sequential':<14} {args.prompts / elapsed:>8.2f} prompts/s")
+    for batch_size in args.batch_sizes:
+        start = time.perf_counter()
+        generate_advice_batch(items, batch_size, advisor)
+        elapsed = time.perf_counter() - start
+        print(
+            f"{'batch ' + str(batch_size):<14} {args.prompts / elapsed:>8.2f} prompts/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+# benchmarks/bench_advisor.py
+import argparse
+import subprocess
+import sys
+import time
+
+
+def import_time(statement):
+    """Seconds to run an import statement in a fresh interpreter, or None."""
+    code = (
+        "import time; start = time.perf_counter(); "
+        f"{statement}; print(time.perf_counter() - start)"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        return None
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure advisor import time and first/warm call latency."
+    )
+    parser.add_argument("--model", default=None, help="model id (default: env/gpt2)")
+    args = parser.parse_args()
+
+    model = args.model or "gpt2"
+    statements = {
+        "import src.advisor (lazy)": "import src.advisor",
+        # What importing the old advisor module used to do
+        "import with eager model load": (
+            "from transformers import pipeline; "
+            f"pipeline('text-generation', model='{model}', device='cpu')"
+        ),
+    }
+    for label, statement in statements.items():
+        seconds = import_time(statement)
+        result = "failed" if seconds is None else f"{seconds * 1e3:.1f} ms"
+        print(f"{label:<29} {result}")
+
+    from src.advisor import generate_advice, get_advisor
+
+    spending = {"Needs": 1600.0, "Wants": 1200.0, "Savings/Debt": 800.0}
+    try:
+        start = time.perf_counter()
+        get_advisor(args.model)
+        load = time.perf_counter() - start
+    except Exception as e:
+        print(f"Error loading advisor model: {e}")
+        return
+    advisor = get_advisor(args.model)
+    for label in ["first call (after load)", "warm call"]:
+        start = time.perf_counter()
+        generate_advice(spending, "Low", advisor)
+        print(f"{label:<29} {(time.perf_counter() - start) * 1e3:.1f} ms")
+    print(f"{'model load':<29} {load * 1e3:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+# benchmarks/bench_clean_transactions.py
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+import pandas as pd
+from src.clean_transactions import (
+    CATEGORY_MAPPING,
+    clean_transactions,
+    primary_category,
+)
+
+
+def make_transactions(count, seed=0):
+    """Build Plaid-shaped raw transactions, a share of them posted on the 1st."""
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    primaries = list(CATEGORY_MAPPING.keys())
+    transactions = []
+    for i in range(count):
+        date = start + timedelta(days=rng.randint(0, 729))
+        if rng.random() < 0.1:
+            date = date.replace(day=1)
+        authorized = date - timedelta(days=rng.randint(0, 3))
+        has_primary = rng.random() < 0.9
+        transactions.append(
+            {
+                "transaction_id": f"tx{i}",
+                "account_id": f"acc{rng.randint(1, 3)}",
+                "date": date.strftime("%Y-%m-%d"),
+                "authorized_date": authorized.strftime("%Y-%m-%d"),
+                "merchant_name": f"Store_{rng.randint(1, 10)}",
+                "name": f"Transaction_{rng.randint(1, 10)}",
+                "amount": round(rng.uniform(-50.0, 300.0), 2),
+                "personal_finance_category": (
+                    {"primary": rng.choice(primaries)} if has_primary else {}
+                ),
+                "category": None if has_primary else [rng.choice(primaries)],
+            }
+        )
+    return transactions
+
+
+def prepare_frame(transactions):
+    """Reproduce the cleaning steps that precede date adjustment and categorization."""
+    df = pd.DataFrame(transactions)
+    df["date"] = pd.to_datetime(df["date"], errors="coerce", format="%Y-%m-%d")
+    df["authorized_date"] = pd.to_datetime(
+        df["authorized_date"], errors="coerce", format="%Y-%m-%d"
+    )
+    return df
+
+
+def rowwise_steps(df):
+    """Original row-wise adjust_date and get_category implementation."""
+
+    def adjust_date(row):
+        if pd.isna(row["authorized_date"]):
+            return row["date"]
+        if (
+            row["date"].day == 1
+            and row["authorized_date"].month == row["date"].month - 1
+        ):
+            return row["authorized_date"]
+        return row["date"]
+
+    def get_category(row):
+        if (
+            isinstance(row["personal_finance_category"], dict)
+            and "primary" in row["personal_finance_category"]
+        ):
+            return row["personal_finance_category"]["primary"]
+        if isinstance(row["category"], list) and row["category"]:
+            return row["category"][0].split()[0]
+        return "Uncategorized"
+
+    dates = df.apply(adjust_date, axis=1)
+    categories = df.apply(get_category, axis=1).map(CATEGORY_MAPPING)
+    return dates, categories.fillna("Uncategorized")
+
+
+def columnwise_steps(df):
+    """Column-wise implementation used by clean_transactions."""
+    use_authorized = (
+        df["authorized_date"].notna()
+        & (df["date"].dt.day == 1)
+        & (df["authorized_date"].dt.month == df["date"].dt.month - 1)
+    )
+    dates = df["date"].mask(use_authorized, df["authorized_date"])
+    categories = primary_category(df["personal_finance_category"])
+    is_list = df["category"].map(type).eq(list)
+    if is_list.any():
+        first_category = df.loc[is_list, "category"].str.get(0).astype("string")
+        categories = categories.fillna(first_category.str.split().str.get(0))
+    return dates, categories.map(CATEGORY_MAPPING).fillna("Uncategorized")
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark transaction cleaning throughput."
+    )
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    transactions = make_transactions(args.rows)
+    df = prepare_frame(transactions)
+
+    (before_dates, before_categories), before = timed(rowwise_steps, df)
+    (after_dates, after_categories), after = timed(columnwise_steps, df)
+    assert before_dates.equals(after_dates)
+    assert before_categories.equals(after_categories)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        output_path = os.path.join(tmpdir, "transactions_cleaned.json")
+        _, full = timed(clean_transactions, transactions, output_path)
+
+    print(f"rows: {args.rows}")
+    print(f"date + category, row-wise:    {args.rows / before:>12,.0f} rows/s")
+    print(f"date + category, column-wise: {args.rows / after:>12,.0f} rows/s")
+    print(f"speedup: {before / after:.1f}x")
+    print(f"clean_transactions end to end: {args.rows / full:>10,.0f} rows/s")
+
+
+if __name__ == "__main__":
+    main()
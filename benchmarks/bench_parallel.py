@@ -0,0 +1,45 @@
+# benchmarks/bench_parallel.py
+import argparse
+import os
+import tempfile
+from src.parallel import DEFAULT_SHARDS, run_parallel
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure scaling of the process-pool pipeline across worker counts."
+    )
+    parser.add_argument("--count", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--shards", type=int, default=DEFAULT_SHARDS)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    args = parser.parse_args()
+
+    print(f"rows: {args.count}, users: {args.users}, CPUs: {os.cpu_count()}")
+    print(f"{'workers':>7} {'seconds':>8} {'speedup':>8} {'efficiency':>11}")
+    baseline = None
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for workers in args.workers:
+            stats = run_parallel(
+                args.count,
+                args.users,
+                workers,
+                args.shards,
+                cleaned_path=os.path.join(tmpdir, "transactions_cleaned.parquet"),
+                budget_path=os.path.join(tmpdir, "budget_report.json"),
+                db_path=os.path.join(tmpdir, "finagent.db"),
+            )
+            if not stats:
+                return
+            # Efficiency is speedup over the first run per added worker
+            baseline = baseline or (stats["seconds"], workers)
+            speedup = baseline[0] / stats["seconds"]
+            efficiency = speedup / (workers / baseline[1])
+            print(
+                f"{workers:>7} {stats['seconds']:>8.2f} {speedup:>7.2f}x "
+                f"{efficiency:>10.0%}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+# benchmarks/bench_spending_cube.py
+import argparse
+import time
+import pandas as pd
+from benchmarks.bench_storage import make_cleaned, timed
+from src.spending_cube import SpendingCube
+
+
+def panel_spending(df, month):
+    """The Spending Analysis panel's per-rerun filter + groupby."""
+    df_month = df[
+        (df["date"].dt.to_period("M") == pd.to_datetime(month).to_period("M"))
+        & (df["amount"] > 0)
+    ]
+    return df_month.groupby("category")["amount"].sum().to_dict()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Time month switches with a full-frame groupby vs the spending cube."
+    )
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--appended", type=int, default=10)
+    args = parser.parse_args()
+
+    df = make_cleaned(args.rows)
+    cube, build_time = timed(SpendingCube.from_frame, df)
+    months = cube.months()
+
+    start = time.perf_counter()
+    for month in months:
+        panel_spending(df, month)
+    groupby_time = (time.perf_counter() - start) / len(months)
+    start = time.perf_counter()
+    for month in months:
+        cube.spending(month)
+    cube_time = (time.perf_counter() - start) / len(months)
+    _, append_time = timed(cube.with_frame, make_cleaned(args.appended, seed=1))
+
+    print(f"rows: {args.rows}, months: {len(months)}")
+    for label, seconds in [
+        ("cube build (once per load)", build_time),
+        (f"cube append of {args.appended} rows", append_time),
+        ("month switch, groupby", groupby_time),
+        ("month switch, cube lookup", cube_time),
+    ]:
+        print(f"{label:<30} {seconds * 1e3:>10.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+# benchmarks/bench_storage.py
+import argparse
+import os
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+from src.storage import load_transactions, save_transactions
+
+
+def make_cleaned(rows, seed=0):
+    """Build a cleaned-transactions frame shaped like clean_transactions output."""
+    rng = np.random.default_rng(seed)
+    categories = np.array(
+        ["Food", "Travel", "Shopping", "Other", "Transportation", "Bills"]
+    )
+    start = np.datetime64("2024-01-01")
+    return pd.DataFrame(
+        {
+            "transaction_id": pd.Series(np.arange(rows)).astype(str).radd("tx"),
+            "date": start + rng.integers(0, 730, rows).astype("timedelta64[D]"),
+            "merchant_name": np.array(["store_", "lufthansa", "merchant_"])[
+                rng.integers(0, 3, rows)
+            ],
+            "amount": rng.uniform(-50.0, 300.0, rows).round(2),
+            "category": categories[rng.integers(0, len(categories), rows)],
+            "account_id": np.array(["acc1", "acc2", "acc3"])[rng.integers(0, 3, rows)],
+        }
+    )
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare JSON and Parquet storage for cleaned transactions."
+    )
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    df = make_cleaned(args.rows)
+    columns = ["date", "amount", "category"]
+    print(f"rows: {args.rows}")
+    print(
+        f"{'format':<8} {'size MB':>9} {'save s':>8} {'load s':>8} {'load 3 cols s':>14}"
+    )
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for extension in [".json", ".parquet"]:
+            path = os.path.join(tmpdir, f"transactions_cleaned{extension}")
+            _, save_time = timed(save_transactions, df, path)
+            _, load_time = timed(load_transactions, path)
+            _, projected_time = timed(load_transactions, path, columns=columns)
+            size_mb = os.path.getsize(path) / 1e6
+            print(
+                f"{extension[1:]:<8} {size_mb:>9.1f} {save_time:>8.2f} "
+                f"{load_time:>8.2f} {projected_time:>14.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+# src/advice_cache.py
+import hashlib
+import json
+import time
+
+ADVICE_CACHE_SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS advice_cache
+        (key TEXT PRIMARY KEY, model_id TEXT, advice TEXT, created_at REAL,
+        last_used REAL)""",
+    """CREATE INDEX IF NOT EXISTS advice_cache_last_used
+        ON advice_cache (last_used)""",
+]
+
+MAX_ENTRIES = 2000  # least recently used advice beyond this is evicted
+# Keys per lookup, well below SQLite's limit on bound variables (999 before 3.32)
+LOOKUP_CHUNK_SIZE = 500
+
+
+def advice_key(spending_data, risks, model_id, params):
+    """Hash everything that determines the generated advice into a cache key."""
+    payload = {
+        "needs": float(spending_data["Needs"]),
+        "wants": float(spending_data["Wants"]),
+        "savings_debt": float(spending_data["Savings/Debt"]),
+        "risks": risks,
+        "model_id": model_id,
+        "params": params,
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+def init_advice_cache(conn):
+    """Create the advice_cache table if it does not exist yet."""
+    with conn:
+        for statement in ADVICE_CACHE_SCHEMA:
+            conn.execute(statement)
+
+
+def get_cached_advice(conn, keys):
+    """Return {key: advice} for the cached keys and mark them as recently used."""
+    keys = list(keys)
+    found = {}
+    for start in range(0, len(keys), LOOKUP_CHUNK_SIZE):
+        chunk = keys[start : start + LOOKUP_CHUNK_SIZE]
+        placeholders = ",".join("?" * len(chunk))
+        found.update(
+            conn.execute(
+                f"SELECT key, advice FROM advice_cache WHERE key IN ({placeholders})",
+                chunk,
+            )
+        )
+    if found:
+        with conn:
+            conn.executemany(
+                "UPDATE advice_cache SET last_used = ? WHERE key = ?",
+                [(time.time(), key) for key in found],
+            )
+    return found
+
+
+def put_cached_advice(conn, entries, model_id, max_entries=MAX_ENTRIES):
+    """Store {key: advice} and evict the least recently used beyond max_entries."""
+    now = time.time()
+    with conn:
+        conn.executemany(
+            """INSERT OR REPLACE INTO advice_cache
+                (key, model_id, advice, created_at, last_used)
+                VALUES (?, ?, ?, ?, ?)""",
+            [(key, model_id, advice, now, now) for key, advice in entries.items()],
+        )
+        conn.execute(
+            """DELETE FROM advice_cache WHERE key IN (
+                SELECT key FROM advice_cache ORDER BY last_used DESC
+                LIMIT -1 OFFSET ?)""",
+            (max_entries,),
+        )
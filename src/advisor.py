@@ -0,0 +1,365 @@
+# src/advisor.py
+import json
+import os
+import threading
+import time
+from contextlib import closing
+import pandas as pd
+from src.advice_cache import (
+    advice_key,
+    get_cached_advice,
+    init_advice_cache,
+    put_cached_advice,
+)
+from src.db import connect, init_schema
+from src.tenancy import DEFAULT_USER, nest_by_user, select_months
+
+# Hugging Face model id of the advisor, overridable per deployment
+MODEL_ENV = "FINAGENT_ADVISOR_MODEL"
+DEFAULT_MODEL = "gpt2"
+# Anchored on the repository rather than the working directory, so advice
+# works wherever the dashboard or a script is started from
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DB_PATH = os.path.join(BASE_DIR, "data", "finagent.db")
+ADVICE_LOG_PATH = os.path.join(BASE_DIR, "data", "advice_log.json")
+# Pipeline arguments for advice; part of the advice cache key
+GENERATION_PARAMS = {"max_length": 150, "num_return_sequences": 1, "temperature": 0.7}
+
+# One loaded pipeline per model id, shared by every thread (and Streamlit
+# session/rerun) in the process. Nothing is loaded at import time.
+_advisors = {}
+_advisors_lock = threading.Lock()
+# Background warm-up thread per model id, started at most once per process
+_warm_ups = {}
+
+
+def model_id_from_env():
+    """Return the configured advisor model id."""
+    return os.getenv(MODEL_ENV, DEFAULT_MODEL)
+
+
+def build_pipeline(model_id):
+    """Load a CPU text-generation pipeline; transformers is imported only here."""
+    from transformers import pipeline
+
+    return pipeline(
+        "text-generation", model=model_id, framework="pt", device="cpu", truncation=True
+    )
+
+
+def get_advisor(model_id=None, factory=None):
+    """Return the process-wide advisor pipeline, loading it on first use.
+
+    Double-checked locking makes concurrent first calls load the model once;
+    later calls only do a dict lookup.
+    """
+    model_id = model_id or model_id_from_env()
+    advisor = _advisors.get(model_id)
+    if advisor is None:
+        with _advisors_lock:
+            advisor = _advisors.get(model_id)
+            if advisor is None:
+                start = time.perf_counter()
+                advisor = (factory or build_pipeline)(model_id)
+                _advisors[model_id] = advisor
+                print(
+                    f"Loaded advisor model {model_id} in "
+                    f"{time.perf_counter() - start:.2f}s"
+                )
+    return advisor
+
+
+def unload_advisor(model_id=None):
+    """Drop loaded advisors (all of them if model_id is None) to free memory."""
+    with _advisors_lock:
+        if model_id is None:
+            _advisors.clear()
+            _warm_ups.clear()
+        else:
+            _advisors.pop(model_id, None)
+            _warm_ups.pop(model_id, None)
+
+
+def warm_up(model_id=None, factory=None):
+    """Load the advisor and run one tiny generation so the first request is fast.
+
+    Returns the seconds it took, or None if the model could not be loaded.
+    """
+    start = time.perf_counter()
+    try:
+        advisor = get_advisor(model_id, factory)
+        advisor("Hello", max_new_tokens=1, num_return_sequences=1)
+    except Exception as e:
+        print(f"Error warming up advisor: {e}")
+        return None
+    return time.perf_counter() - start
+
+
+def warm_up_in_background(model_id=None, factory=None):
+    """Start warm_up on a daemon thread, e.g. when the dashboard starts.
+
+    Only the first call per model id in a process starts a thread, so it is
+    safe to call on every Streamlit rerun; later calls return that thread.
+    """
+    model_id = model_id or model_id_from_env()
+    with _advisors_lock:
+        thread = _warm_ups.get(model_id)
+        if thread is None:
+            thread = threading.Thread(
+                target=warm_up,
+                args=(model_id, factory),
+                name="advisor-warm-up",
+                daemon=True,
+            )
+            _warm_ups[model_id] = thread
+            thread.start()
+    return thread
+
+
+def build_prompt(spending_data, risks):
+    """Build the advisor prompt for one month's spending and risks."""
+    return (
+        f"You are a financial advisor. Based on the following spending data: Needs={spending_data['Needs']}, "
+        f"Wants={spending_data['Wants']}, Savings/Debt={spending_data['Savings/Debt']}, and risks: {risks}, "
+        f"provide a concise and actionable financial plan."
+    )
+
+
+def set_seed(seed):
+    """Seed generation for reproducible (and therefore cacheable) sampling."""
+    if seed is not None:
+        from transformers import set_seed as transformers_set_seed
+
+        transformers_set_seed(seed)
+
+
+def generate_advice(spending_data, risks, advisor=None, model_id=None, seed=None):
+    """Generate financial advice based on spending data and risks."""
+    advisor = advisor or get_advisor(model_id)
+    set_seed(seed)
+    response = advisor(build_prompt(spending_data, risks), **GENERATION_PARAMS)[0][
+        "generated_text"
+    ]
+    return response.strip()
+
+
+def build_question_prompt(query, spending_data, risks):
+    """Build the advisor prompt for a free-form question about the user's month."""
+    return (
+        f"You are a financial advisor. Answer: {query} based on spending data "
+        f"Needs={spending_data['Needs']}, Wants={spending_data['Wants']}, "
+        f"Savings/Debt={spending_data['Savings/Debt']}, and risks {risks}."
+    )
+
+
+def text_streamer(tokenizer):
+    """Create a TextIteratorStreamer that yields only newly generated text."""
+    from transformers import TextIteratorStreamer
+
+    return TextIteratorStreamer(
+        tokenizer, skip_prompt=True, skip_special_tokens=True, timeout=120.0
+    )
+
+
+def stream_generate(prompt, advisor=None, model_id=None, streamer_factory=None):
+    """Yield generated text pieces as soon as the model produces them.
+
+    Generation runs on a background thread that feeds a TextIteratorStreamer;
+    this generator drains it, so the caller sees the first tokens after
+    time-to-first-token instead of after the whole generation. Errors in the
+    generation thread are re-raised here.
+    """
+    advisor = advisor or get_advisor(model_id)
+    streamer = (streamer_factory or text_streamer)(advisor.tokenizer)
+    errors = []
+
+    def generate():
+        try:
+            advisor(prompt, streamer=streamer, **GENERATION_PARAMS)
+        except Exception as e:
+            errors.append(e)
+            streamer.end()
+
+    thread = threading.Thread(target=generate, name="advisor-stream", daemon=True)
+    thread.start()
+    for text in streamer:
+        if text:
+            yield text
+    thread.join()
+    if errors:
+        raise errors[0]
+
+
+def stream_advice(spending_data, risks, advisor=None, model_id=None):
+    """Stream generate_advice's answer piece by piece."""
+    return stream_generate(build_prompt(spending_data, risks), advisor, model_id)
+
+
+def prepare_for_batching(advisor):
+    """Give the pipeline's tokenizer a pad token and left padding.
+
+    GPT-style tokenizers ship without a pad token, and decoder-only models
+    must be padded on the left so every prompt ends where generation starts.
+    Safe to call repeatedly; single prompts are unaffected.
+    """
+    tokenizer = getattr(advisor, "tokenizer", None)
+    if tokenizer is None:
+        return
+    if tokenizer.pad_token is None:
+        tokenizer.pad_token = tokenizer.eos_token
+    tokenizer.padding_side = "left"
+    model = getattr(advisor, "model", None)
+    config = getattr(model, "generation_config", None)
+    if config is not None and config.pad_token_id is None:
+        config.pad_token_id = tokenizer.pad_token_id
+
+
+def generate_advice_batch(items, batch_size=8, advisor=None, model_id=None, seed=None):
+    """Generate advice for many (spending_data, risks) items, in input order.
+
+    Prompts are padded and sent through the pipeline batch_size at a time,
+    so each batch is one generate call instead of one per prompt.
+    """
+    if not items:
+        return []
+    advisor = advisor or get_advisor(model_id)
+    prepare_for_batching(advisor)
+    set_seed(seed)
+    prompts = [build_prompt(spending_data, risks) for spending_data, risks in items]
+    outputs = advisor(prompts, batch_size=batch_size, **GENERATION_PARAMS)
+    return [output[0]["generated_text"].strip() for output in outputs]
+
+
+def report_items(report):
+    """Turn monthly_reports rows into (spending_data, risks) advice items."""
+    return [
+        (
+            {
+                "Needs": float(row.needs_amount),
+                "Wants": float(row.wants_amount),
+                "Savings/Debt": float(row.savings_debt_amount),
+            },
+            row.risks,
+        )
+        for row in report.itertuples()
+    ]
+
+
+def advisor_model_id(advisor):
+    """Return the model id a loaded pipeline was built from, or None if unknown."""
+    with _advisors_lock:
+        for model_id, loaded in _advisors.items():
+            if loaded is advisor:
+                return model_id
+    return getattr(getattr(advisor, "model", None), "name_or_path", None) or None
+
+
+def advise_with_cache(
+    conn, items, advisor=None, model_id=None, seed=None, batch_size=8, cache=True
+):
+    """Return advice for items, generating only those not in the advice cache.
+
+    Cache keys hash the report values, risks, model id and generation
+    parameters, so unchanged reports are answered from finagent.db without
+    loading the model. New advice is stored for next time. With an explicit
+    advisor, the model id is the advisor's own; if it cannot be told (nor
+    is model_id given), the cache is not used.
+    """
+    if advisor is not None:
+        model_id = advisor_model_id(advisor) or model_id
+        cache = cache and model_id is not None
+    else:
+        model_id = model_id or model_id_from_env()
+    params = {**GENERATION_PARAMS, "seed": seed}
+    keys = [advice_key(spending, risks, model_id, params) for spending, risks in items]
+    if cache:
+        init_advice_cache(conn)
+    advice = get_cached_advice(conn, keys) if cache else {}
+    misses = {key: item for key, item in zip(keys, items) if key not in advice}
+    if len(misses) == 1:
+        generated = [
+            generate_advice(*next(iter(misses.values())), advisor, model_id, seed)
+        ]
+    else:
+        generated = generate_advice_batch(
+            list(misses.values()), batch_size, advisor, model_id, seed
+        )
+    new = dict(zip(misses, generated))
+    if cache and new:
+        put_cached_advice(conn, new, model_id)
+    advice.update(new)
+    return [advice[key] for key in keys]
+
+
+def get_advice(
+    month="2025-06", db_path=DB_PATH, advisor=None, cache=True, user_id=DEFAULT_USER
+):
+    """Fetch advice for a specific month of one user from database."""
+    with closing(connect(db_path)) as conn:
+        init_schema(conn)  # migrates reports stored before user_id existed
+        report = pd.read_sql_query(
+            "SELECT * FROM monthly_reports WHERE user_id = ? AND month = ?",
+            conn,
+            params=(user_id, month),
+        )
+        if not report.empty:
+            return advise_with_cache(
+                conn, report_items(report.iloc[:1]), advisor, cache=cache
+            )[0]
+    return "No data available for advice."
+
+
+def get_advice_for_months(
+    months=None,
+    db_path=DB_PATH,
+    batch_size=8,
+    advisor=None,
+    cache=True,
+    user_id=DEFAULT_USER,
+):
+    """Fetch advice for several months (all stored months if None) in batches.
+
+    user_id is one user, a list of users or None for every user. All the
+    selected (user_id, month) reports go through advise_with_cache in one
+    pass, so months of different users share batches and cached advice.
+    months holds "YYYY-MM" strings and/or (user_id, "YYYY-MM") pairs.
+
+    Returns {month: advice} in month order for a single user_id, otherwise
+    {user_id: {month: advice}} ({} for an empty list of users).
+    """
+    users = [user_id] if isinstance(user_id, str) else user_id
+    if users is not None and not users:
+        return {}
+    query, params = "SELECT * FROM monthly_reports", ()
+    if users is not None:
+        query += f" WHERE user_id IN ({', '.join('?' * len(users))})"
+        params = tuple(users)
+    with closing(connect(db_path)) as conn:
+        init_schema(conn)  # migrates reports stored before user_id existed
+        report = pd.read_sql_query(
+            f"{query} ORDER BY user_id, month", conn, params=params
+        )
+        if months is not None:
+            report = report[
+                select_months(
+                    report["user_id"], report["month"].astype("period[M]"), months
+                )
+            ]
+        advice = advise_with_cache(
+            conn, report_items(report), advisor, batch_size=batch_size, cache=cache
+        )
+    advice = dict(zip(zip(report["user_id"], report["month"]), advice))
+    if isinstance(user_id, str):
+        return {month: text for (_, month), text in advice.items()}
+    return nest_by_user(advice)
+
+
+def get_rule_based_advice(advice_path=ADVICE_LOG_PATH):
+    """Fetch legacy rule-based advice as a fallback."""
+    with open(advice_path, "r") as f:
+        advice = json.load(f)
+    return advice.get("advice", ["No advice available."])
+
+
+if __name__ == "__main__":
+    print(get_advice())
@@ -1,102 +1,163 @@
 # src/analysis.py
+import numpy as np
 import pandas as pd
-import sqlite3
+from contextlib import closing
 from datetime import datetime
+from src.debt import payoff_strategies
+from src.instrumentation import instrumented, set_rows
+from src.db import DB_PATH, connect, init_schema, save_monthly_reports
+from src.storage import load_transactions
+from src.tenancy import DEFAULT_USER, nest_by_user, select_months, user_ids
 
+NEEDS_CATEGORIES = ["Bills", "Transportation", "Food"]
+WANTS_CATEGORIES = ["Shopping", "Entertainment", "Travel"]
 
-def analyze_spending(income, clean_input_path="data/transactions_cleaned.json"):
-    """Analyze spending habits, flag risks, and calculate debt payoff plan."""
+
+def monthly_spending(df, by_user=False):
+    """Total each user's and month's spending in one groupby pass.
+
+    Returns a DataFrame indexed by (user_id, month period), in order of first
+    appearance, with total, needs and wants (positive amounts only),
+    savings_debt (all "Other" amounts) and n (all rows). Without by_user
+    every row belongs to DEFAULT_USER.
+    """
+    amount = df["amount"]
+    positive = amount > 0
+    category = df["category"]
+    return (
+        pd.DataFrame(
+            {
+                "user_id": user_ids(df, by_user),
+                "month": df["date"].dt.to_period("M"),
+                "total": amount.where(positive, 0.0),
+                "needs": amount.where(positive & category.isin(NEEDS_CATEGORIES), 0.0),
+                "wants": amount.where(positive & category.isin(WANTS_CATEGORIES), 0.0),
+                "savings_debt": amount.where(category == "Other", 0.0),
+                "n": 1,
+            }
+        )
+        .groupby(["user_id", "month"], sort=False, observed=True)
+        .sum()
+    )
+
+
+def spending_reports(df, income, by_user=False):
+    """Analyze cleaned transactions without any file or database I/O.
+
+    income is one income for every month or, with by_user, a {user_id: income}
+    mapping. Returns (rows, reports): monthly_reports rows for
+    save_monthly_reports(conn, rows, user_id=None) and
+    {(user_id, "YYYY-MM"): report}.
+    """
+    totals = monthly_spending(df, by_user)
+    users = totals.index.get_level_values("user_id")
+    incomes = (
+        users.map(income).to_numpy(dtype=float)
+        if isinstance(income, dict)
+        else np.full(len(totals), float(income))
+    )
+    total_spending = totals["total"].to_numpy()
+    avg_spending = total_spending / totals["n"].to_numpy()
+    wants_spending = totals["wants"].to_numpy()
+    savings_debt_spending = totals["savings_debt"].to_numpy()
+
+    # Risk flagging (e.g., high spending in wants or low savings)
+    risks = np.where(
+        (wants_spending > incomes * 0.30) | (savings_debt_spending < incomes * 0.20),
+        "High",
+        "Low",
+    )
+
+    # Debt payoff plan (€5000 at 12.5% a year, repaid from savings)
+    monthly_saving = np.maximum(
+        incomes * 0.20 - savings_debt_spending, 0
+    )  # Savings after debt spending
+    debt_strategies = payoff_strategies(monthly_saving)
+
+    analysis_reports = {}
+    rows = []
+    for i, (user, month) in enumerate(totals.index):
+        month_str = month.strftime("%Y-%m")
+        # numpy numbers would be stored as BLOBs, so cast to float
+        rows.append(
+            (
+                user,
+                month_str,
+                incomes[i].item(),
+                totals["needs"].iat[i].item(),
+                wants_spending[i].item(),
+                savings_debt_spending[i].item(),
+                total_spending[i].item(),
+                avg_spending[i].item(),
+                str(risks[i]),
+                debt_strategies[i],
+            )
+        )
+
+        # Create analysis report
+        report = {
+            "income": income.get(user) if isinstance(income, dict) else income,
+            "total_spending": total_spending[i].item(),
+            "avg_spending": avg_spending[i].item(),
+            "risks": str(risks[i]),
+            "debt_strategy": debt_strategies[i],
+        }
+        analysis_reports[(user, month_str)] = report
+    return rows, analysis_reports
+
+
+@instrumented()
+def analyze_spending(
+    income,
+    clean_input_path="data/transactions_cleaned.json",
+    db_path=DB_PATH,
+    conn=None,
+    months=None,
+    by_user=False,
+):
+    """Analyze spending habits, flag risks, and calculate debt payoff plan.
+
+    Reports are written to monthly_reports through conn if given, otherwise
+    through a connection opened (and closed) on db_path. If months is given,
+    only those months are analyzed and upserted.
+
+    With by_user, every user_id in the transactions is analyzed in the same
+    grouped pass, income may be a {user_id: income} mapping, months may hold
+    (user_id, month) pairs and the result is {user_id: {month: report}}.
+    """
     try:
         # Load cleaned transactions
-        df = pd.read_json(clean_input_path)
+        columns = ["date", "amount", "category"] + (["user_id"] if by_user else [])
+        df = load_transactions(clean_input_path, columns=columns)
         print("Analyzing spending for all months...")
 
-        # Convert date to datetime and extract unique months
-        df["date"] = pd.to_datetime(df["date"], format="%Y-%m-%d")
-        unique_months = df["date"].dt.to_period("M").unique()
-
-        analysis_reports = {}
-
-        for month in unique_months:
-            month_str = month.strftime("%Y-%m")
-            df_month = df[df["date"].dt.to_period("M") == month]
-
-            # Spending analysis
-            total_spending = df_month[df_month["amount"] > 0]["amount"].sum()
-            avg_spending = total_spending / len(df_month) if len(df_month) > 0 else 0
-
-            # Risk flagging (e.g., high spending in wants or low savings)
-            wants_spending = df_month[
-                df_month["category"].isin(["Shopping", "Entertainment", "Travel"])
-                & (df_month["amount"] > 0)
-            ]["amount"].sum()
-            savings_debt_spending = df_month[df_month["category"] == "Other"][
-                "amount"
-            ].sum()
-            risk = (
-                "High"
-                if wants_spending > income * 0.30
-                or savings_debt_spending < income * 0.20
-                else "Low"
-            )
+        if months is not None:
+            df = df[
+                select_months(
+                    user_ids(df, by_user), df["date"].dt.to_period("M"), months
+                )
+            ]
+        rows, analysis_reports = spending_reports(df, income, by_user)
+        set_rows(rows_in=len(df), rows_out=len(rows))
+        if by_user:
+            users = {user for user, _ in analysis_reports}
+            print(f"Analyzed {len(rows)} months for {len(users)} users")
+        else:
+            for (_, month), report in analysis_reports.items():
+                print(f"Spending Analysis Report for {month}: {report}")
 
-            # Simple debt payoff plan (assuming initial debt of €5000, paid from savings)
-            initial_debt = 5000.0
-            monthly_saving = max(
-                income * 0.20 - savings_debt_spending, 0
-            )  # Savings after debt spending
-            months_to_payoff = (
-                initial_debt / monthly_saving if monthly_saving > 0 else float("inf")
-            )
-            debt_strategy = (
-                f"Pay off €{initial_debt:.2f} in {months_to_payoff:.1f} months with €{monthly_saving:.2f}/month"
-                if monthly_saving > 0
-                else "No payoff plan; increase savings or reduce debt spending"
-            )
-
-            # Save to SQLite
-            conn = sqlite3.connect("data/finagent.db")
-            cursor = conn.cursor()
-            cursor.execute(
-                """CREATE TABLE IF NOT EXISTS monthly_reports
-                            (month TEXT PRIMARY KEY, income REAL, needs_amount REAL, wants_amount REAL, 
-                            savings_debt_amount REAL, total_spending REAL, avg_spending REAL, risks TEXT, debt_strategy TEXT)"""
-            )
-            cursor.execute(
-                """INSERT OR REPLACE INTO monthly_reports 
-                            (month, income, needs_amount, wants_amount, savings_debt_amount, total_spending, 
-                            avg_spending, risks, debt_strategy)
-                            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-                (
-                    month_str,
-                    income,
-                    df_month[
-                        df_month["category"].isin(["Bills", "Transportation", "Food"])
-                        & (df_month["amount"] > 0)
-                    ]["amount"].sum(),
-                    wants_spending,
-                    savings_debt_spending,
-                    total_spending,
-                    avg_spending,
-                    risk,
-                    debt_strategy,
-                ),
-            )
-            conn.commit()
-            conn.close()
-
-            # Create analysis report
-            analysis_reports[month_str] = {
-                "income": income,
-                "total_spending": total_spending,
-                "avg_spending": avg_spending,
-                "risks": risk,
-                "debt_strategy": debt_strategy,
-            }
-            print(
-                f"Spending Analysis Report for {month_str}: {analysis_reports[month_str]}"
-            )
+        # Save every user's months to SQLite in one transaction
+        if conn is None:
+            with closing(connect(db_path)) as own_conn:
+                init_schema(own_conn)
+                save_monthly_reports(own_conn, rows, user_id=None)
+        else:
+            init_schema(conn)
+            save_monthly_reports(conn, rows, user_id=None)
 
+        analysis_reports = nest_by_user(analysis_reports)
+        if not by_user:
+            return analysis_reports.get(DEFAULT_USER, {})
         return analysis_reports
 
     except Exception as e:
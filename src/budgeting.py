@@ -2,155 +2,314 @@
 import pandas as pd
 import json
 import os
+import numpy as np
 from datetime import datetime
+from src.clean_transactions import primary_category
+from src.instrumentation import instrumented, set_rows
+from src.storage import load_transactions
+from src.tenancy import DEFAULT_USER, nest_by_user, select_months, user_ids
+
+
+# Category mappings for the 50/30/20 buckets
+NEEDS_CATEGORIES = ["Bills", "Transportation", "Food"]
+WANTS_CATEGORIES = ["Shopping", "Entertainment", "Travel"]
+SAVINGS_DEBT_CATEGORIES = ["Other"]
+BUDGET_BUCKETS = {
+    **{category: "needs" for category in NEEDS_CATEGORIES},
+    **{category: "wants" for category in WANTS_CATEGORIES},
+    **{category: "savings_debt" for category in SAVINGS_DEBT_CATEGORIES},
+}
+
+
+def load_raw_transactions(raw_input_path="data/transactions.json"):
+    """Load raw transactions with parsed dates, dropping rows without date or amount."""
+    # Only "date" is needed as a datetime; pandas' automatic conversion of the
+    # other date-like Plaid columns overflows on all-null columns
+    df = pd.read_json(raw_input_path, convert_dates=False, keep_default_dates=False)
+    return prepare_raw_transactions(df)
+
+
+def prepare_raw_transactions(df):
+    """Parse dates of raw transactions and drop rows without date or amount."""
+    df = df.assign(date=pd.to_datetime(df["date"], errors="coerce"))
+    return df.dropna(subset=["date", "amount"])
+
+
+def income_by_month(df, by_user=False):
+    """Sum income for every month of raw transactions in one vectorized pass.
+
+    Returns {month period: income}, or {(user_id, month period): income}
+    with by_user.
+    """
+    income_df = df[
+        (df["amount"] < 0)  # Negative amounts indicate income
+        & (
+            primary_category(df["personal_finance_category"]).eq("INCOME")
+            | df["merchant_name"].str.contains(
+                "Payroll|Direct Deposit", case=False, na=False
+            )
+            | df["name"].str.contains("Payroll|Direct Deposit", case=False, na=False)
+        )
+    ]
+    # Sum of negative amounts as positive income
+    periods = income_df["date"].dt.to_period("M")
+    keys = [user_ids(income_df), periods] if by_user else periods
+    income = -income_df["amount"].groupby(keys).sum()
+    return income[income > 0].to_dict()
+
+
+def estimate_monthly_income(raw_input_path="data/transactions.json", by_user=False):
+    """Estimate income for every month, reading the raw transaction data once."""
+    try:
+        return income_by_month(load_raw_transactions(raw_input_path), by_user)
+    except Exception as e:
+        print(f"Error estimating income: {e}")
+        return {}
 
 
 def estimate_income(raw_input_path="data/transactions.json", month=None):
     """Estimate monthly income from raw transaction data."""
     try:
-        df = pd.read_json(raw_input_path)
-        df["date"] = pd.to_datetime(df["date"], errors="coerce")
-        df = df.dropna(subset=["date", "amount"])
+        df = load_raw_transactions(raw_input_path)
 
         if month is None:
             month = df["date"].dt.to_period("M").max()
-        df_month = df[df["date"].dt.to_period("M") == month]
-
-        income_df = df_month[
-            (df_month["amount"] < 0)  # Negative amounts indicate income
-            & (
-                df_month["personal_finance_category"].apply(
-                    lambda x: isinstance(x, dict) and x.get("primary") == "INCOME"
-                )
-                | df_month["merchant_name"].str.contains(
-                    "Payroll|Direct Deposit", case=False, na=False
-                )
-                | df_month["name"].str.contains(
-                    "Payroll|Direct Deposit", case=False, na=False
-                )
-            )
-        ]
-
-        income = -income_df[
-            "amount"
-        ].sum()  # Sum of negative amounts as positive income
-        return income if income > 0 else None
+        return income_by_month(df).get(pd.Period(month, freq="M"))
     except Exception as e:
         print(f"Error estimating income: {e}")
         return None
 
 
+def get_status(actual, target):
+    """Compare an actual value against its target."""
+    if actual > target:
+        return "Over"
+    elif actual < target:
+        return "Under"
+    return "Meets"
+
+
+def monthly_bucket_totals(df, by_user=False):
+    """Sum positive spending per month and budget bucket in a single groupby pass.
+
+    Returns a DataFrame indexed by month period (in order of first appearance)
+    with one column per bucket: needs, wants and savings_debt. With by_user
+    the index is (user_id, month period) and every user is totaled in the
+    same pass.
+    """
+    periods = df["date"].dt.to_period("M")
+    keys = [user_ids(df, by_user), periods] if by_user else [periods]
+    positive = (df["amount"] > 0).to_numpy()
+    totals = (
+        df["amount"][positive]
+        .groupby(
+            [key[positive] for key in keys]
+            + [df["category"][positive].map(BUDGET_BUCKETS)],
+            sort=False,
+            observed=True,
+        )
+        .sum()
+        .unstack(fill_value=0.0)
+    )
+    if by_user:
+        index = pd.MultiIndex.from_arrays(keys)[periods.notna().to_numpy()].unique()
+    else:
+        index = periods.dropna().unique()
+    return totals.reindex(
+        index=index,
+        columns=["needs", "wants", "savings_debt"],
+        fill_value=0.0,
+    )
+
+
+def resolve_income(estimated_income, default_income=4000.0):
+    """Pick the estimated income when plausible, otherwise the default."""
+    if estimated_income and estimated_income >= 100.0:
+        return estimated_income, "estimated"
+    return default_income, "default"
+
+
+def bucket_statuses(percentages, target):
+    """Vectorized get_status of percentages against one target."""
+    return np.select(
+        [percentages > target, percentages < target], ["Over", "Under"], "Meets"
+    )
+
+
+def user_months(df, by_user=False):
+    """Return the distinct (user_id, month period) pairs of transactions in df."""
+    periods = df["date"].dt.to_period("M")
+    return pd.MultiIndex.from_arrays([user_ids(df, by_user), periods])[
+        periods.notna().to_numpy()
+    ].unique()
+
+
+def budget_reports(
+    df,
+    incomes,
+    default_income=4000.0,
+    custom_savings_goal=None,
+    months=None,
+    by_user=False,
+):
+    """Budget cleaned transactions against estimated incomes, without any file I/O.
+
+    incomes is estimate_monthly_income's result for the same by_user. Returns
+    {(user_id, "YYYY-MM"): report}; if months is given only those months are
+    budgeted. Without a custom goal, every month is measured against 20% of
+    the income of the user's earliest month, so the goal is resolved from
+    all of df.
+    """
+
+    def income_of(user, month):
+        return incomes.get((user, month) if by_user else month)
+
+    goals = {}
+    for user, month in user_months(df, by_user).sort_values():
+        if user not in goals:
+            first_income, _ = resolve_income(income_of(user, month), default_income)
+            goals[user] = (
+                first_income * 0.20
+                if custom_savings_goal is None
+                else custom_savings_goal
+            )
+
+    # Total every user's and month's buckets at once; user_id is only
+    # loaded with by_user, so otherwise everything is DEFAULT_USER's
+    if months is not None:
+        df = df[
+            select_months(user_ids(df, by_user), df["date"].dt.to_period("M"), months)
+        ]
+    totals = monthly_bucket_totals(df, by_user=True)
+
+    keys = totals.index
+    estimated = [income_of(user, month) for user, month in keys]
+    resolved = [resolve_income(value, default_income) for value in estimated]
+    income = np.array([value for value, _ in resolved], dtype=float)
+    goal = np.array([goals[user] for user in keys.get_level_values(0)], dtype=float)
+    needs, wants, savings_debt = (
+        totals[bucket].to_numpy() for bucket in ["needs", "wants", "savings_debt"]
+    )
+    # Percentages of income, 0 where there is no income
+    has_income = income > 0
+    needs_pct, wants_pct, savings_debt_pct = (
+        np.divide(amount, income, out=np.zeros(len(keys)), where=has_income) * 100
+        for amount in (needs, wants, savings_debt)
+    )
+    needs_status = bucket_statuses(needs_pct, 50.0)
+    wants_status = bucket_statuses(wants_pct, 30.0)
+    savings_status = bucket_statuses(savings_debt, goal)
+
+    reports = {}
+    for i, (user, month) in enumerate(keys):
+        month_str = month.strftime("%Y-%m")
+        reports[(user, month_str)] = {
+            "month": month_str,
+            "income": income[i].item(),
+            "income_source": resolved[i][1],
+            "estimated_income": estimated[i] or 0.0,
+            "needs": {
+                "amount": needs[i].item(),
+                "percentage": needs_pct[i].item(),
+                "target_percentage": 50.0,
+                "status": str(needs_status[i]),
+            },
+            "wants": {
+                "amount": wants[i].item(),
+                "percentage": wants_pct[i].item(),
+                "target_percentage": 30.0,
+                "status": str(wants_status[i]),
+            },
+            "savings_debt": {
+                "amount": savings_debt[i].item(),
+                "percentage": savings_debt_pct[i].item(),
+                "target_percentage": 20.0,
+                "status": str(savings_status[i]),
+                "custom_goal": goal[i].item(),
+            },
+        }
+    return reports
+
+
+def print_budget_report(report):
+    needs, wants, savings = (
+        report[bucket] for bucket in ["needs", "wants", "savings_debt"]
+    )
+    print(f"Budget Report for {report['month']}:")
+    print(f"Income: €{report['income']:.2f}")
+    print(
+        f"Needs: €{needs['amount']:.2f} ({needs['percentage']:.1f}%, {needs['status'].lower()} 50%)"
+    )
+    print(
+        f"Wants: €{wants['amount']:.2f} ({wants['percentage']:.1f}%, {wants['status'].lower()} 30%)"
+    )
+    print(
+        f"Savings/Debt: €{savings['amount']:.2f} ({savings['percentage']:.1f}%, {savings['status'].lower()} 20%, Goal: €{savings['custom_goal']:.2f})"
+    )
+
+
+@instrumented()
 def apply_50_30_20_rule(
     clean_input_path="data/transactions_cleaned.json",
     output_path="data/budget_report.json",
     default_income=4000.0,
     custom_savings_goal=None,
+    raw_input_path="data/transactions.json",
+    months=None,
+    by_user=False,
 ):
-    """Apply 50/30/20 budgeting rule to transactions and generate a report for each month."""
+    """Apply 50/30/20 budgeting rule to transactions and generate a report for each month.
+
+    If months (e.g. ["2025-06"]) is given, only those months are recomputed and
+    merged into the reports already saved at output_path.
+
+    With by_user, transactions are partitioned by their user_id column and
+    every user's months are budgeted in the same grouped pass; the result
+    (and the saved file) is then {user_id: {month: report}}, and months may
+    also hold (user_id, month) pairs.
+    """
     try:
         # Load cleaned transactions
-        df = pd.read_json(clean_input_path)
+        columns = ["date", "amount", "category"] + (["user_id"] if by_user else [])
+        df = load_transactions(clean_input_path, columns=columns)
         print("Generating budget report for all months...")
 
-        # Convert date to datetime and extract unique months
-        df["date"] = pd.to_datetime(df["date"], format="%Y-%m-%d")
-        unique_months = df["date"].dt.to_period("M").unique()
-
-        reports = {}
-
-        for month in unique_months:
-            month_str = month.strftime("%Y-%m")
-            df_month = df[df["date"].dt.to_period("M") == month]
+        incomes = estimate_monthly_income(raw_input_path, by_user=by_user)
+        reports = budget_reports(
+            df, incomes, default_income, custom_savings_goal, months, by_user
+        )
+        set_rows(rows_in=len(df), rows_out=len(reports))
+        if by_user:
+            users = {user for user, _ in reports}
+            print(f"Budgeted {len(reports)} months for {len(users)} users")
+        else:
+            for report in reports.values():
+                print_budget_report(report)
 
-            # Estimate income for the month
-            estimated_income = estimate_income("data/transactions.json", month)
-            income = (
-                estimated_income
-                if estimated_income and estimated_income >= 100.0
-                else default_income
-            )
-            income_source = (
-                "estimated"
-                if income == estimated_income and estimated_income >= 100.0
-                else "default"
-            )
-
-            # Define category mappings
-            needs_categories = ["Bills", "Transportation", "Food"]
-            wants_categories = ["Shopping", "Entertainment", "Travel"]
-            savings_debt_categories = ["Other"]
-
-            # Allocate spending
-            needs_spending = df_month[
-                df_month["category"].isin(needs_categories) & (df_month["amount"] > 0)
-            ]["amount"].sum()
-            wants_spending = df_month[
-                df_month["category"].isin(wants_categories) & (df_month["amount"] > 0)
-            ]["amount"].sum()
-            savings_debt_spending = df_month[
-                df_month["category"].isin(savings_debt_categories)
-                & (df_month["amount"] > 0)
-            ]["amount"].sum()
-
-            # Calculate percentages
-            needs_percentage = (needs_spending / income) * 100 if income > 0 else 0
-            wants_percentage = (wants_spending / income) * 100 if income > 0 else 0
-            savings_debt_percentage = (
-                (savings_debt_spending / income) * 100 if income > 0 else 0
-            )
-
-            # Determine status
-            def get_status(actual, target):
-                if actual > target:
-                    return "Over"
-                elif actual < target:
-                    return "Under"
-                return "Meets"
-
-            # Custom savings goal handling
-            if custom_savings_goal is None:
-                custom_savings_goal = income * 0.20  # Default to 20% if not set
-            savings_status = get_status(savings_debt_spending, custom_savings_goal)
-
-            # Create monthly report
-            report = {
-                "month": month_str,
-                "income": income,
-                "income_source": income_source,
-                "estimated_income": estimated_income or 0.0,
-                "needs": {
-                    "amount": needs_spending,
-                    "percentage": needs_percentage,
-                    "target_percentage": 50.0,
-                    "status": get_status(needs_percentage, 50.0),
-                },
-                "wants": {
-                    "amount": wants_spending,
-                    "percentage": wants_percentage,
-                    "target_percentage": 30.0,
-                    "status": get_status(wants_percentage, 30.0),
-                },
-                "savings_debt": {
-                    "amount": savings_debt_spending,
-                    "percentage": savings_debt_percentage,
-                    "target_percentage": 20.0,
-                    "status": savings_status,
-                    "custom_goal": custom_savings_goal,
+        # Merge recomputed months into the saved reports, dropping months
+        # that no longer have transactions
+        if months is not None and os.path.exists(output_path):
+            with open(output_path, "r") as f:
+                saved_reports = json.load(f)
+            if not by_user:
+                saved_reports = {DEFAULT_USER: saved_reports}
+            kept = {
+                (user, month.strftime("%Y-%m"))
+                for user, month in user_months(df, by_user)
+            }
+            reports = {
+                **{
+                    (user, month): report
+                    for user, user_reports in saved_reports.items()
+                    for month, report in user_reports.items()
+                    if (user, month) in kept
                 },
+                **reports,
             }
 
-            reports[month_str] = report
-            print(f"Budget Report for {month_str}:")
-            print(f"Income: €{income:.2f}")
-            print(
-                f"Needs: €{needs_spending:.2f} ({needs_percentage:.1f}%, {report['needs']['status'].lower()} 50%)"
-            )
-            print(
-                f"Wants: €{wants_spending:.2f} ({wants_percentage:.1f}%, {report['wants']['status'].lower()} 30%)"
-            )
-            print(
-                f"Savings/Debt: €{savings_debt_spending:.2f} ({savings_debt_percentage:.1f}%, {report['savings_debt']['status'].lower()} 20%, Goal: €{custom_savings_goal:.2f})"
-            )
+        reports = nest_by_user(reports)
+        if not by_user:
+            reports = reports.get(DEFAULT_USER, {})
 
         # Save all reports
         os.makedirs(os.path.dirname(output_path), exist_ok=True)
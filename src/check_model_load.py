@@ -1,42 +1,28 @@
-from transformers import AutoModelForCausalLM, AutoTokenizer
-from peft import PeftModel
-from accelerate import init_empty_weights, load_checkpoint_and_dispatch
-import torch
-from dotenv import load_dotenv
-import os
+# src/check_model_load.py
+from src.model_loader import ModelConfig, hf_token, load_model
 
-# Load environment variables from .env file
-load_dotenv()
+# The adapter was trained on Llama-3-8B; bfloat16 halves the CPU merge's
+# memory where float16 matmuls are slow or unsupported on CPU
+CONFIG = ModelConfig(
+    base_model="meta-llama/Meta-Llama-3-8B",
+    adapter="FinGPT/fingpt-mt_llama3-8b_lora",
+    dtype="bfloat16",
+)
 
-try:
-    # Load tokenizer with authentication
-    token = os.getenv("HF_TOKEN")
-    if not token:
-        raise ValueError("HF_TOKEN not found in .env file. Please set it.")
-    base_model = "meta-llama/CodeLlama-7b-hf"
-    tokenizer = AutoTokenizer.from_pretrained(base_model, token=token)
-    tokenizer.pad_token = tokenizer.eos_token
 
-    # Initialize model with empty weights
-    with init_empty_weights():
-        model = AutoModelForCausalLM.from_pretrained(
-            base_model,
-            torch_dtype=torch.float16
-        )
+def main(config=CONFIG):
+    """Check that the configured base model and LoRA adapter load together."""
+    if not hf_token():
+        print("Model loading failed: HF_TOKEN not found in .env file. Please set it.")
+        return False
+    try:
+        load_model(config)
+    except Exception as e:
+        print(f"Model loading failed: {e}")
+        return False
+    print("Model loaded successfully!")
+    return True
 
-    # Load and dispatch in chunks
-    model = load_checkpoint_and_dispatch(
-        model,
-        checkpoint=base_model,
-        device_map="auto",
-        offload_folder="offload",
-        offload_state_dict=True,
-        dtype=torch.float16,
-        token=token
-    )
 
-    # Apply LoRA adapters
-    model = PeftModel.from_pretrained(model, "FinGPT/fingpt-mt_llama3-8b_lora", token=token)
-    print("Model loaded successfully!")
-except Exception as e:
-    print(f"Model loading failed: {e}")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,9 @@
+import json
+import numpy as np
 import pandas as pd
 import os
+from src.instrumentation import instrumented, set_rows
+from src.storage import save_transactions
 
 # Category mapping based on personal_finance_category.primary or category
 CATEGORY_MAPPING = {
@@ -18,6 +22,115 @@ CATEGORY_MAPPING = {
 }
 
 
+def primary_category(personal_finance_category):
+    """Extract personal_finance_category.primary column-wise, NaN where absent."""
+    if personal_finance_category.dtype != object:
+        return pd.Series(pd.NA, index=personal_finance_category.index, dtype=object)
+    return personal_finance_category.str.get("primary")
+
+
+def clean_frame(df):
+    """Clean and standardize a DataFrame of raw transactions without any file I/O."""
+    # Select available columns matching API structure
+    available_columns = [
+        col
+        for col in [
+            "transaction_id",
+            "date",
+            "authorized_date",
+            "merchant_name",
+            "name",
+            "amount",
+            "personal_finance_category",
+            "category",
+            "account_id",
+            "user_id",
+        ]
+        if col in df.columns
+    ]
+    df = df[available_columns] if available_columns else df
+
+    # Define required fields and filter rows missing any
+    required_fields = [
+        "transaction_id",
+        "date",
+        "amount",
+        "personal_finance_category",
+    ]
+    df = df.dropna(subset=required_fields)
+
+    # Convert dates to datetime with explicit ISO format
+    df["date"] = pd.to_datetime(df["date"], errors="coerce", format="%Y-%m-%d")
+    if "authorized_date" in df.columns:
+        df["authorized_date"] = pd.to_datetime(
+            df["authorized_date"], errors="coerce", format="%Y-%m-%d"
+        )
+
+    # Adjust date based on authorized_date if present: a transaction posted
+    # on the 1st but authorized in the previous month keeps the authorized date
+    if "authorized_date" in df.columns:
+        use_authorized = (
+            df["authorized_date"].notna()
+            & (df["date"].dt.day == 1)
+            & (df["authorized_date"].dt.month == df["date"].dt.month - 1)
+        )
+        df["date"] = df["date"].mask(use_authorized, df["authorized_date"])
+
+    # Fill missing merchant_name with name
+    if "merchant_name" in df.columns and "name" in df.columns:
+        df["merchant_name"] = df["merchant_name"].fillna(df["name"])
+    elif "name" in df.columns:
+        df["merchant_name"] = df["name"]
+
+    # Category mapping based on API fields: personal_finance_category.primary,
+    # falling back to the first word of the legacy category list
+    category = primary_category(df["personal_finance_category"])
+    if "category" in df.columns:
+        is_list = df["category"].map(type).eq(list)
+        if is_list.any():
+            first_category = df.loc[is_list, "category"].str.get(0).astype("string")
+            category = category.fillna(first_category.str.split().str.get(0))
+    df["category"] = category.map(CATEGORY_MAPPING).fillna("Uncategorized")
+
+    # Drop rows with invalid dates
+    df = df.dropna(subset=["date"])
+    # Clean merchant names if present
+    if "merchant_name" in df.columns:
+        df["merchant_name"] = (
+            df["merchant_name"]
+            .str.lower()
+            .str.replace(r"\d+", "", regex=True)
+            .str.replace(r"\*\/\/", "", regex=True)
+            .str.strip()
+        )
+
+    # Deduplication based on transaction_id as primary key (API standard)
+    if "transaction_id" in df.columns:
+        df = df.drop_duplicates(subset=["transaction_id"], keep="first")
+    else:
+        df = df.drop_duplicates(
+            subset=["date", "amount", "merchant_name"], keep="first"
+        )
+
+    # Select final columns
+    final_columns = [
+        col
+        for col in [
+            "transaction_id",
+            "date",
+            "merchant_name",
+            "amount",
+            "category",
+            "account_id",
+            "user_id",
+        ]
+        if col in df.columns
+    ]
+    df = df[final_columns] if final_columns else df
+    return df
+
+
+@instrumented()
 def clean_transactions(transactions, output_path="data/transactions_cleaned.json"):
     """Clean and standardize transaction data based on API structure."""
     try:
@@ -30,126 +143,12 @@ def clean_transactions(transactions, output_path="data/transactions_cleaned.json
         else:
             df = transactions.copy()
         print("Loaded transactions for cleaning")
+        set_rows(rows_in=len(df))
 
-        # Select available columns matching API structure
-        available_columns = [
-            col
-            for col in [
-                "transaction_id",
-                "date",
-                "authorized_date",
-                "merchant_name",
-                "name",
-                "amount",
-                "personal_finance_category",
-                "category",
-                "account_id",
-            ]
-            if col in df.columns
-        ]
-        df = df[available_columns] if available_columns else df
-
-        # Define required fields and filter rows missing any
-        required_fields = [
-            "transaction_id",
-            "date",
-            "amount",
-            "personal_finance_category",
-        ]
-        df = df.dropna(subset=required_fields)
-
-        # Convert dates to datetime with explicit ISO format
-        df["date"] = pd.to_datetime(df["date"], errors="coerce", format="%Y-%m-%d")
-        if "authorized_date" in df.columns:
-            df["authorized_date"] = pd.to_datetime(
-                df["authorized_date"], errors="coerce", format="%Y-%m-%d"
-            )
-
-        # Adjust date based on authorized_date if present
-        if "authorized_date" in df.columns:
-
-            def adjust_date(row):
-                if pd.isna(row["authorized_date"]):
-                    return row["date"]
-                if (
-                    row["date"].day == 1
-                    and row["authorized_date"].month == row["date"].month - 1
-                ):
-                    return row["authorized_date"]
-                return row["date"]
-
-            df["date"] = df.apply(adjust_date, axis=1)
-
-        # Fill missing merchant_name with name
-        if "merchant_name" in df.columns and "name" in df.columns:
-            df["merchant_name"] = df["merchant_name"].fillna(df["name"])
-        elif "name" in df.columns:
-            df["merchant_name"] = df["name"]
-
-        # Category mapping based on API fields
-        def get_category(row):
-            if (
-                "personal_finance_category" in df.columns
-                and isinstance(row["personal_finance_category"], dict)
-                and "primary" in row["personal_finance_category"]
-            ):
-                return row["personal_finance_category"]["primary"]
-            if (
-                "category" in df.columns
-                and isinstance(row["category"], list)
-                and row["category"]
-            ):
-                return (
-                    row["category"][0].split()[0]
-                    if row["category"]
-                    else "Uncategorized"
-                )
-            return "Uncategorized"
-
-        df["category"] = (
-            df.apply(get_category, axis=1).map(CATEGORY_MAPPING).fillna("Uncategorized")
-        )
-
-        # Drop rows with invalid dates
-        df = df.dropna(subset=["date"])
-        # Clean merchant names if present
-        if "merchant_name" in df.columns:
-            df["merchant_name"] = (
-                df["merchant_name"]
-                .str.lower()
-                .str.replace(r"\d+", "", regex=True)
-                .str.replace(r"\*\/\/", "", regex=True)
-                .str.strip()
-            )
-
-        # Deduplication based on transaction_id as primary key (API standard)
-        if "transaction_id" in df.columns:
-            df = df.drop_duplicates(subset=["transaction_id"], keep="first")
-        else:
-            df = df.drop_duplicates(
-                subset=["date", "amount", "merchant_name"], keep="first"
-            )
-
-        # Select final columns
-        final_columns = [
-            col
-            for col in [
-                "transaction_id",
-                "date",
-                "merchant_name",
-                "amount",
-                "category",
-                "account_id",
-            ]
-            if col in df.columns
-        ]
-        df = df[final_columns] if final_columns else df
+        df = clean_frame(df)
 
-        # Save cleaned data
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
-        df.to_json(
-            output_path, orient="records", indent=2, date_format="iso"
-        )  # ISO format for consistency
+        # Save cleaned data (JSON export or a typed columnar file, by extension)
+        save_transactions(df, output_path)
         print(f"Cleaned transactions saved to {output_path}")
 
         return df
@@ -157,3 +156,128 @@ def clean_transactions(transactions, output_path="data/transactions_cleaned.json
     except Exception as e:
         print(f"Error cleaning transactions: {e}")
         return pd.DataFrame()
+
+
+def iter_json_records(input_path, block_size=1 << 20):
+    """Yield records from a JSON array or JSON Lines file without loading it whole."""
+    decoder = json.JSONDecoder()
+    with open(input_path, "r") as f:
+        buffer = f.read(block_size)
+        pos = len(buffer) - len(buffer.lstrip())
+        if buffer[pos : pos + 1] == "[":
+            pos += 1
+        # JSON Lines is parsed the same way: records separated by whitespace
+        while True:
+            while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                pos += 1
+            if pos == len(buffer):
+                buffer, pos = f.read(block_size), 0
+                if not buffer:
+                    return
+                continue
+            if buffer[pos] == "]":
+                return
+            try:
+                record, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                more = f.read(block_size)
+                if not more:
+                    raise
+                buffer, pos = buffer[pos:] + more, 0
+                continue
+            yield record
+            pos = end
+
+
+def iter_transaction_chunks(input_path, chunk_size=50_000):
+    """Yield lists of at most chunk_size raw transactions from input_path."""
+    chunk = []
+    for record in iter_json_records(input_path):
+        chunk.append(record)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class SeenTransactionIds:
+    """Compact set of transaction_id hashes, 8 bytes per id.
+
+    Hashes are kept in sorted uint64 runs that are merged like a binary
+    counter, so membership checks stay O(log n) per run with O(log n) runs.
+    """
+
+    def __init__(self):
+        self.runs = []
+
+    def __len__(self):
+        return sum(len(run) for run in self.runs)
+
+    def add_new(self, transaction_ids):
+        """Record transaction_ids and return a mask of the ones not seen before."""
+        hashes = pd.util.hash_pandas_object(
+            transaction_ids.astype(str), index=False
+        ).to_numpy()
+        seen = np.zeros(len(hashes), dtype=bool)
+        for run in self.runs:
+            idx = np.minimum(np.searchsorted(run, hashes), len(run) - 1)
+            seen |= run[idx] == hashes
+        new_hashes = np.unique(hashes[~seen])
+        if len(new_hashes):
+            self.runs.append(new_hashes)
+        while len(self.runs) > 1 and len(self.runs[-1]) >= len(self.runs[-2]):
+            newer, older = self.runs.pop(), self.runs.pop()
+            self.runs.append(np.union1d(older, newer))
+        return ~seen
+
+
+@instrumented()
+def clean_transactions_stream(
+    input_path, output_path="data/transactions_cleaned.json", chunk_size=50_000
+):
+    """Clean a large JSON array or JSON Lines file chunk by chunk.
+
+    Each chunk is cleaned with clean_frame, transaction_ids already written by
+    an earlier chunk are dropped, and the result is appended to output_path
+    (JSON Lines if it ends in .jsonl, otherwise a JSON array). Peak memory is
+    bounded by chunk_size rather than by the size of the input file.
+    """
+    lines = output_path.endswith(".jsonl")
+    tmp_path = f"{output_path}.tmp"
+    seen = SeenTransactionIds()
+    rows_in = rows_out = chunks = 0
+    try:
+        os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+        with open(tmp_path, "w") as out:
+            if not lines:
+                out.write("[")
+            for chunk in iter_transaction_chunks(input_path, chunk_size):
+                chunks += 1
+                rows_in += len(chunk)
+                df = clean_frame(pd.DataFrame(chunk))
+                df = df[seen.add_new(df["transaction_id"])]
+                if df.empty:
+                    continue
+                if lines:
+                    out.write(
+                        df.to_json(orient="records", lines=True, date_format="iso")
+                    )
+                    out.write("\n")
+                else:
+                    out.write("," if rows_out else "")
+                    out.write(df.to_json(orient="records", date_format="iso")[1:-1])
+                rows_out += len(df)
+                print(f"Cleaned chunk {chunks}: {rows_out} of {rows_in} rows kept")
+            if not lines:
+                out.write("]")
+        os.replace(tmp_path, output_path)
+        print(f"Cleaned transactions saved to {output_path}")
+        set_rows(rows_in=rows_in, rows_out=rows_out)
+        return {"rows_in": rows_in, "rows_out": rows_out, "chunks": chunks}
+
+    except Exception as e:
+        print(f"Error cleaning transactions: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return {}
@@ -1,10 +1,27 @@
 import streamlit as st
-import base64
 import os
 import json
 import pandas as pd
 import plotly.express as px
 from datetime import datetime
+from src.data_access import (
+    load_base64,
+    load_budget,
+    load_json,
+    load_spending_cube,
+    save_json,
+)
+from src.advisor import build_question_prompt, stream_generate, warm_up_in_background
+from src.debt import payoff_strategies
+from src.query_engine import answer_query
+from src.journal import (
+    JOURNAL_PATH,
+    journal_budget_amount,
+    journal_transaction,
+    maybe_compact,
+    replay_budget,
+    replay_transactions,
+)
 
 # Custom CSS for layout with green theme, 80rem max width, and 2rem top margin
 st.markdown(
@@ -91,10 +108,16 @@ st.markdown(
     unsafe_allow_html=True,
 )
 
+# Load the advisor model in the background while the page renders, so the
+# first question does not pay for the model load (once per process)
+warm_up_in_background()
+
 # File paths
 saving_path = "data/saving.json"
 budget_path = "data/budget_report.json"
 transactions_path = "data/transactions_cleaned.json"
+# Savings actions are appended to JOURNAL_PATH and periodically folded into these
+journal_snapshots = {transactions_path: replay_transactions, budget_path: replay_budget}
 
 # Initialize or load balance and single savings plan
 if "balance" not in st.session_state:
@@ -102,30 +125,33 @@ if "balance" not in st.session_state:
 if "savings_plan" not in st.session_state:
     st.session_state.savings_plan = {"name": "", "goal": 0.0, "saved": 0.0}
 
-# Load or initialize savings plan from JSON
+# Load or initialize savings plan from JSON (cached until the file changes)
 if os.path.exists(saving_path):
     try:
-        with open(saving_path, "r") as f:
-            saved_data = json.load(f)
-            if isinstance(saved_data, dict) and all(
-                key in saved_data for key in ["name", "goal", "saved"]
-            ):
-                st.session_state.savings_plan = saved_data
-            else:
-                st.error(
-                    "Invalid savings plan format in saving.json. Resetting to default."
-                )
-                st.session_state.savings_plan = {"name": "", "goal": 0.0, "saved": 0.0}
+        saved_data = load_json(saving_path)
+        if isinstance(saved_data, dict) and all(
+            key in saved_data for key in ["name", "goal", "saved"]
+        ):
+            st.session_state.savings_plan = saved_data
+        else:
+            st.error(
+                "Invalid savings plan format in saving.json. Resetting to default."
+            )
+            st.session_state.savings_plan = {"name": "", "goal": 0.0, "saved": 0.0}
     except json.JSONDecodeError:
         st.error("Invalid JSON format in saving.json. Resetting to default.")
         st.session_state.savings_plan = {"name": "", "goal": 0.0, "saved": 0.0}
 else:
     st.session_state.savings_plan = {"name": "", "goal": 0.0, "saved": 0.0}
 
-# Load or initialize budget and transactions data
+# Load or initialize budget data (snapshot plus journal); transactions are
+# read through the spending cube where they are shown
+budget_data = None
 if os.path.exists(budget_path):
-    with open(budget_path, "r") as f:
-        st.session_state.budget_data = json.load(f)
+    # Reports of a --by-user run are nested by user; this shows one user's
+    budget_data = load_budget(budget_path, JOURNAL_PATH)
+if budget_data:
+    st.session_state.budget_data = budget_data
 else:
     st.session_state.budget_data = {
         "2025-06": {
@@ -135,13 +161,6 @@ else:
             "income": 4000.0,
         }
     }
-if os.path.exists(transactions_path):
-    with open(transactions_path, "r") as f:
-        st.session_state.transactions_data = (
-            json.load(f) if os.path.getsize(transactions_path) > 0 else []
-        )
-else:
-    st.session_state.transactions_data = []
 
 # Wrap entire dashboard content in <div class="dashboard-container">
 # Note: Using .block-container in CSS, no explicit <div> needed
@@ -153,8 +172,7 @@ with col1:
     st.markdown('<div class="logo-area">', unsafe_allow_html=True)
     logo_path = "data/finagent_logo.jpg"
     if os.path.exists(logo_path):
-        with open(logo_path, "rb") as f:
-            logo_base64 = base64.b64encode(f.read()).decode()
+        logo_base64 = load_base64(logo_path)
         st.markdown(
             f'<img src="data:image/png;base64,{logo_base64}" '
             'style="display: block; max-height: 80px; margin: auto;" />',
@@ -214,16 +232,9 @@ with col2:
     st.markdown(
         '<h3 class="section-header">Spending Analysis</h3>', unsafe_allow_html=True
     )
-    transactions_df = pd.DataFrame(st.session_state.transactions_data)
-    transactions_df["date"] = pd.to_datetime(transactions_df["date"])
-    df_month = transactions_df[
-        (
-            transactions_df["date"].dt.to_period("M")
-            == pd.to_datetime(selected_month).to_period("M")
-        )
-        & (transactions_df["amount"] > 0)
-    ]
-    spending = df_month.groupby("category")["amount"].sum().to_dict()
+    # Month x category aggregates, rebuilt only when the data changes
+    spending_cube = load_spending_cube(transactions_path, JOURNAL_PATH)
+    spending = spending_cube.spending(str(pd.Period(selected_month, freq="M")))
     st.bar_chart(spending, color="#002a69")
     total_spending = sum(spending.values())
     income = budget.get("income", 4000.0)
@@ -240,11 +251,7 @@ with col2:
         if wants_spending > income * 0.30 or savings_debt_spending < income * 0.20
         else "Low"
     )
-    debt_strategy = (
-        f"Pay off €5000.0 in {5000.0 / max(income * 0.20 - savings_debt_spending, 1):.1f} months with €{max(income * 0.20 - savings_debt_spending, 0):.2f}/month"
-        if income * 0.20 - savings_debt_spending > 0
-        else "No payoff plan; increase savings or reduce debt spending"
-    )
+    debt_strategy = payoff_strategies(max(income * 0.20 - savings_debt_spending, 0))[0]
     st.write(f"**Risks**: {risks}")
     st.write(f"**Debt Strategy**: {debt_strategy}")
 st.markdown("</div>", unsafe_allow_html=True)
@@ -281,26 +288,27 @@ with col1:
                     # Update budget for the current month
                     current_month = "2025-06"
                     if current_month in st.session_state.budget_data:
-                        st.session_state.budget_data[current_month]["savings_debt"][
-                            "amount"
-                        ] += plan_goal
-                        with open(budget_path, "w") as f:
-                            json.dump(st.session_state.budget_data, f, indent=4)
-                    # Generate unique txnId and add transaction
-                    txn_id = f"txn_{int(datetime.now().timestamp())}"
+                        journal_budget_amount(
+                            current_month,
+                            "savings_debt",
+                            st.session_state.budget_data[current_month]["savings_debt"][
+                                "amount"
+                            ]
+                            + plan_goal,
+                        )
+                    # Generate unique txnId and journal the transaction
+                    txn_id = f"txn_{int(datetime.now().timestamp() * 1_000_000)}"
                     new_transaction = {
                         "txnId": txn_id,
                         "date": datetime.now().isoformat(),
                         "amount": plan_goal,
                         "category": "Savings",
                     }
-                    st.session_state.transactions_data.append(new_transaction)
-                    with open(transactions_path, "w") as f:
-                        json.dump(st.session_state.transactions_data, f, indent=4)
+                    journal_transaction(new_transaction)
+                    maybe_compact(journal_snapshots)
                     # Save the plan
                     try:
-                        with open(saving_path, "w") as f:
-                            json.dump(st.session_state.savings_plan, f, indent=4)
+                        save_json(saving_path, st.session_state.savings_plan)
                         st.success("Plan saved successfully!")
                     except PermissionError:
                         st.error(
@@ -341,26 +349,27 @@ with col1:
                     # Update budget for the current month
                     current_month = "2025-06"
                     if current_month in st.session_state.budget_data:
-                        st.session_state.budget_data[current_month]["savings_debt"][
-                            "amount"
-                        ] += amount
-                        with open(budget_path, "w") as f:
-                            json.dump(st.session_state.budget_data, f, indent=4)
-                    # Generate unique txnId and add transaction
-                    txn_id = f"txn_{int(datetime.now().timestamp())}"
+                        journal_budget_amount(
+                            current_month,
+                            "savings_debt",
+                            st.session_state.budget_data[current_month]["savings_debt"][
+                                "amount"
+                            ]
+                            + amount,
+                        )
+                    # Generate unique txnId and journal the transaction
+                    txn_id = f"txn_{int(datetime.now().timestamp() * 1_000_000)}"
                     new_transaction = {
                         "txnId": txn_id,
                         "date": datetime.now().isoformat(),
                         "amount": amount,
                         "category": "Savings",
                     }
-                    st.session_state.transactions_data.append(new_transaction)
-                    with open(transactions_path, "w") as f:
-                        json.dump(st.session_state.transactions_data, f, indent=4)
+                    journal_transaction(new_transaction)
+                    maybe_compact(journal_snapshots)
                     # Save the updated plan
                     try:
-                        with open(saving_path, "w") as f:
-                            json.dump(st.session_state.savings_plan, f, indent=4)
+                        save_json(saving_path, st.session_state.savings_plan)
                         st.success(
                             f"Added €{amount:.2f} to {st.session_state.savings_plan['name']}. New balance: €{st.session_state.balance:.2f}"
                         )
@@ -384,62 +393,16 @@ with col2:
     query = st.text_input("Ask your question", key="llm_query_input")
     if st.button("Get Response", key="get_response_button"):
         if query.strip():
-            # Convert transactions_data to DataFrame for filtering
-            transactions_df = pd.DataFrame(st.session_state.transactions_data or [])
-            transactions_df["date"] = pd.to_datetime(
-                transactions_df["date"], errors="coerce"
-            )
-
             # Parse query and generate response
             query_lower = query.lower()
-            response = "Sorry, I couldn’t understand your question. Try asking about savings, balance, or spending by category and month"
-
-            # Spending by category and month
-            if "spending on" in query_lower and "in" in query_lower:
-                # Extract category and month
-                parts = query_lower.split()
-                try:
-                    category_idx = parts.index("on") + 1
-                    month_idx = parts.index("in") + 1
-                    category = " ".join(
-                        parts[category_idx : month_idx - 1]
-                    ).capitalize()
-                    month_str = parts[month_idx]
-                    # Assume month is like "June" or "2025-06", convert to number
-                    month_num = (
-                        datetime.strptime(month_str, "%B").month
-                        if month_str
-                        in [
-                            "january",
-                            "february",
-                            "march",
-                            "april",
-                            "may",
-                            "june",
-                            "july",
-                            "august",
-                            "september",
-                            "october",
-                            "november",
-                            "december",
-                        ]
-                        else int(month_str.split("-")[1]) if "-" in month_str else 6
-                    )  # Default to June if unclear
-                    year = 2025
+            fallback = "Sorry, I couldn’t understand your question. Try asking about savings, balance, or spending by category and month"
+            response = fallback
 
-                    # Filter transactions
-                    month_transactions = transactions_df[
-                        (transactions_df["date"].dt.month == month_num)
-                        & (transactions_df["date"].dt.year == year)
-                        & (transactions_df["category"].str.lower() == category.lower())
-                    ]
-                    total_spending = month_transactions["amount"].sum()
-                    if not month_transactions.empty:
-                        response = f"Your spending on {category} in {month_str} {year} was €{total_spending:.2f}."
-                    else:
-                        response = f"No spending data found for {category} in {month_str} {year}."
-                except (ValueError, IndexError):
-                    response = "Please specify a valid category and month (e.g., 'What is my spending on transportation in June?')."
+            # Spending by category, month, range or merchant, answered from
+            # the precomputed month x category aggregates
+            spending_answer = answer_query(query, spending_cube)
+            if spending_answer is not None:
+                response = spending_answer
 
             # Savings progress or balance
             elif "savings progress" in query_lower or "balance" in query_lower:
@@ -459,9 +422,7 @@ with col2:
                 "how can i save more" in query_lower
                 or "reduce overspending" in query_lower
             ):
-                total_spending = (
-                    transactions_df["amount"].sum() if not transactions_df.empty else 0
-                )
+                total_spending = spending_cube.total(spending_cube.months())["net"]
                 income = st.session_state.budget_data.get("2025-06", {}).get(
                     "income", 4000.0
                 )
@@ -470,7 +431,25 @@ with col2:
                 else:
                     response = "You’re on track! Consider increasing savings by 10% of your income to build a stronger buffer."
 
-            st.write("**Response:**", response)
+            if response == fallback:
+                # Free-form question: stream the advisor's answer as it is generated
+                st.write("**Response:**")
+                spending_data = {
+                    "Needs": budget.get("needs", {}).get("amount", 0.0),
+                    "Wants": budget.get("wants", {}).get("amount", 0.0),
+                    "Savings/Debt": budget.get("savings_debt", {}).get("amount", 0.0),
+                }
+                try:
+                    st.write_stream(
+                        stream_generate(
+                            build_question_prompt(query, spending_data, risks)
+                        )
+                    )
+                except Exception as e:
+                    print(f"Error streaming advisor answer: {e}")
+                    st.write(fallback)
+            else:
+                st.write("**Response:**", response)
         else:
             st.warning("Please enter a question.")
 st.markdown("</div>", unsafe_allow_html=True)
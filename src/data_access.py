@@ -0,0 +1,197 @@
+# src/data_access.py
+import base64
+import copy
+import json
+import os
+import threading
+import pandas as pd
+from src.journal import (
+    atomic_write_json,
+    read_journal,
+    read_journal_from,
+    replay_budget,
+    replay_transactions,
+)
+from src.spending_cube import SpendingCube
+from src.tenancy import user_reports
+
+# (path, kind, depends_on) -> (file signatures, value); shared by every session
+_cache = {}
+_lock = threading.Lock()
+
+
+def file_signature(path):
+    """Return (inode, mtime_ns, size) for path, or None if it does not exist."""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+
+def cached(path, kind, loader, depends_on=()):
+    """Return loader(path), reusing the last result while the files are unchanged.
+
+    The result is reused until path or any file in depends_on changes, which
+    costs one os.stat per file. It is None if none of the files exist. Cached
+    values are shared by every session and must not be modified in place.
+    """
+    key = (path, kind, tuple(depends_on))
+    signature = tuple(file_signature(p) for p in (path, *depends_on))
+    with _lock:
+        entry = _cache.get(key)
+        if entry is not None and entry[0] == signature:
+            return entry[1]
+    value = None
+    if any(sig is not None for sig in signature):
+        value = loader(path)
+    with _lock:
+        _cache[key] = (signature, value)
+    return value
+
+
+def invalidate(path=None):
+    """Forget cached values for or depending on path, or everything if None."""
+    with _lock:
+        for key in list(_cache):
+            if path is None or key[0] == path or path in key[2]:
+                del _cache[key]
+
+
+def _read_json(path):
+    if os.path.getsize(path) == 0:
+        return None
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def load_json(path, default=None):
+    """Load a JSON file through the cache; default if it is missing or empty.
+
+    The result is a private copy, so callers may modify it: a change only
+    reaches the cache (and other sessions) once save_json has written it.
+    json.JSONDecodeError is raised, and nothing cached, for malformed files.
+    """
+    data = cached(path, "json", _read_json)
+    return default if data is None else copy.deepcopy(data)
+
+
+def transactions_frame(records):
+    """Build a transactions DataFrame with parsed dates from JSON records."""
+    df = pd.DataFrame(records)
+    for col in ["date", "amount", "category"]:
+        if col not in df.columns:
+            df[col] = pd.Series(dtype=object)
+    df["date"] = pd.to_datetime(df["date"], format="ISO8601", errors="coerce")
+    return df
+
+
+def load_journal(journal_path):
+    """Load the dashboard journal entries through the cache."""
+    return cached(journal_path, "journal", read_journal) or []
+
+
+def load_journaled(path, journal_path, replay, default=None):
+    """Load a snapshot JSON file with the journal replayed on top, through the cache.
+
+    The result is rebuilt only when the snapshot or the journal changes. It
+    is shared between sessions and must be treated as read-only.
+    """
+    return cached(
+        path,
+        replay.__name__,
+        lambda p: replay(load_json(p, default), load_journal(journal_path)),
+        depends_on=(journal_path,),
+    )
+
+
+def load_budget(path, journal_path):
+    """Load the journaled budget report as {month: report}, through the cache.
+
+    A report written with by_user ({user_id: {month: report}}) yields the
+    primary user's months, which are also the ones budget entries update.
+    Shared between sessions and must be treated as read-only.
+    """
+    return user_reports(load_journaled(path, journal_path, replay_budget))
+
+
+def load_transactions_frame(path, journal_path=None):
+    """Load transactions JSON as a DataFrame with parsed dates, through the cache.
+
+    With journal_path, journaled transactions are included. The frame is
+    shared between reruns and must be treated as read-only.
+    """
+    if journal_path is None:
+        df = cached(path, "frame", lambda p: transactions_frame(load_json(p, [])))
+    else:
+        df = cached(
+            path,
+            "frame",
+            lambda p: transactions_frame(
+                load_journaled(p, journal_path, replay_transactions, default=[])
+            ),
+            depends_on=(journal_path,),
+        )
+    return transactions_frame([]) if df is None else df
+
+
+def load_spending_cube(path, journal_path=None):
+    """Load the month x category SpendingCube for a transactions file, cached.
+
+    The snapshot cube is built once per snapshot change. The journaled cube
+    is cached with the journal offset it has read up to, so a journal
+    append only reads and adds the new entries (copying just the months
+    they touch). It is rebuilt from the snapshot cube when the snapshot
+    changes or the journal is rewritten by compaction.
+    """
+    snapshot = file_signature(path)
+    base = cached(
+        path,
+        "cube",
+        lambda p: SpendingCube.from_frame(transactions_frame(load_json(p, []))),
+    )
+    base = SpendingCube() if base is None else base
+    journal = None if journal_path is None else file_signature(journal_path)
+    if journal is None:
+        return base
+    key = (path, "journaled cube", (journal_path,))
+    # A rewritten journal is a new file (inode) and may be shorter
+    signature = (snapshot, journal[0])
+    with _lock:
+        entry = _cache.get(key)
+    offset, cube = 0, base
+    if entry is not None and entry[0] == signature and entry[1][0] <= journal[2]:
+        offset, cube = entry[1]
+    if offset < journal[2]:
+        entries, offset = read_journal_from(journal_path, offset)
+        added = replay_transactions([], entries)
+        if added:
+            cube = cube.with_frame(transactions_frame(added))
+        with _lock:
+            _cache[key] = (signature, (offset, cube))
+    return cube
+
+
+def _read_base64(path):
+    with open(path, "rb") as f:
+        return base64.b64encode(f.read()).decode()
+
+
+def load_base64(path):
+    """Load a binary file such as the logo as base64 text, through the cache."""
+    return cached(path, "base64", _read_base64)
+
+
+def save_json(path, data, indent=4):
+    """Atomically write data as JSON and refresh the cache for path.
+
+    The parsed value is stored against the new file signature, so the next
+    rerun neither rereads nor reparses the file; derived entries such as the
+    transactions DataFrame are rebuilt on their next load.
+    """
+    try:
+        atomic_write_json(path, data, indent=indent)
+    finally:
+        invalidate(path)
+    with _lock:
+        _cache[(path, "json", ())] = ((file_signature(path),), copy.deepcopy(data))
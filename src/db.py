@@ -0,0 +1,80 @@
+# src/db.py
+import os
+import sqlite3
+from src.tenancy import DEFAULT_USER
+
+DB_PATH = "data/finagent.db"
+
+MONTHLY_REPORTS_SCHEMA = """CREATE TABLE IF NOT EXISTS monthly_reports
+    (user_id TEXT NOT NULL DEFAULT 'default', month TEXT NOT NULL, income REAL,
+    needs_amount REAL, wants_amount REAL, savings_debt_amount REAL,
+    total_spending REAL, avg_spending REAL, risks TEXT, debt_strategy TEXT,
+    PRIMARY KEY (user_id, month))"""
+
+
+def connect(db_path=DB_PATH):
+    """Open a SQLite connection tuned for one pipeline writer and dashboard readers.
+
+    WAL lets readers keep working while the pipeline writes, and
+    synchronous=NORMAL only fsyncs at checkpoints instead of every commit.
+    """
+    os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=30.0)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA foreign_keys=ON")
+    return conn
+
+
+def table_columns(conn, table):
+    """Return the column names of table, empty if it does not exist."""
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+
+
+def migrate_to_user_keys(conn, table, schema):
+    """Create table from schema, first upgrading a single-user version of it.
+
+    Tables from before multi-tenancy lack user_id; they are rebuilt with the
+    composite (user_id, ...) key in one transaction and their rows assigned
+    to DEFAULT_USER.
+    """
+    columns = table_columns(conn, table)
+    with conn:
+        if columns and "user_id" not in columns:
+            print(f"Migrating {table} to per-user keys...")
+            conn.execute(f"ALTER TABLE {table} RENAME TO {table}_single_user")
+            conn.execute(schema)
+            names = ", ".join(columns)
+            conn.execute(
+                f"""INSERT INTO {table} (user_id, {names})
+                    SELECT ?, {names} FROM {table}_single_user""",
+                (DEFAULT_USER,),
+            )
+            conn.execute(f"DROP TABLE {table}_single_user")
+        else:
+            conn.execute(schema)
+
+
+def init_schema(conn):
+    """Create the pipeline tables if they do not exist yet."""
+    migrate_to_user_keys(conn, "monthly_reports", MONTHLY_REPORTS_SCHEMA)
+
+
+def save_monthly_reports(conn, rows, user_id=DEFAULT_USER):
+    """Upsert monthly report rows in a single transaction.
+
+    rows are (month, income, ...) tuples of user_id, or, with user_id=None,
+    (user_id, month, income, ...) tuples for any number of users.
+    """
+    if user_id is not None:
+        rows = [(user_id, *row) for row in rows]
+    with conn:
+        conn.executemany(
+            """INSERT OR REPLACE INTO monthly_reports
+                (user_id, month, income, needs_amount, wants_amount,
+                savings_debt_amount, total_spending, avg_spending, risks,
+                debt_strategy)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            rows,
+        )
@@ -0,0 +1,231 @@
+# src/debt.py
+import numpy as np
+import pandas as pd
+
+AVALANCHE = "avalanche"  # highest interest rate first
+SNOWBALL = "snowball"  # smallest balance first
+STRATEGIES = [AVALANCHE, SNOWBALL]
+# The debt spending analysis plans for, repaid from each month's spare savings
+DEBT_BALANCE = 5000.0
+DEBT_INTEREST_RATE = 12.5  # annual %, a typical credit card
+# Slack for exact payoff months that come out a hair above an integer
+MONTH_TOLERANCE = 1e-9
+SCHEDULE_COLUMNS = ["month", "debt", "payment", "interest", "principal", "balance"]
+
+
+def monthly_rate(interest_rate):
+    """Convert an annual interest rate in percent to a monthly rate."""
+    return np.asarray(interest_rate, dtype=float) / 12 / 100
+
+
+def months_to_payoff(balance, interest_rate, payment):
+    """Exact (fractional) months for a level payment to repay balance.
+
+    n = -ln(1 - r * balance / payment) / ln(1 + r) with monthly rate r, or
+    balance / payment without interest; inf where the payment does not cover
+    the first month's interest. Arguments broadcast like NumPy arrays.
+    """
+    balance = np.asarray(balance, dtype=float)
+    payment = np.asarray(payment, dtype=float)
+    r = monthly_rate(interest_rate)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        months = np.where(
+            r > 0,
+            -np.log1p(-r * balance / payment) / np.log1p(r),
+            balance / payment,
+        )
+    months = np.where(payment > r * balance, months, np.inf)
+    return np.where(balance <= 0, 0.0, months)
+
+
+def balance_after(balance, interest_rate, payment, months):
+    """Balance left after months level payments; negative once overpaid."""
+    r = monthly_rate(interest_rate)
+    growth = np.expm1(months * np.log1p(r))  # (1 + r)^months - 1, accurately
+    with np.errstate(divide="ignore", invalid="ignore"):
+        paid = np.where(r > 0, payment * growth / np.where(r > 0, r, 1.0), 0.0)
+    return balance * (1 + growth) - np.where(r > 0, paid, payment * months)
+
+
+def payoff(balance, interest_rate, payment):
+    """Months and total interest to repay balance with a level monthly payment.
+
+    Closed form of a month-by-month simulation in which interest accrues
+    first and the last payment only covers what is left. Returns
+    (months, total_interest) arrays, inf where the payment never covers the
+    interest. Arguments broadcast, so thousands of payments take one call.
+    """
+    balance = np.asarray(balance, dtype=float)
+    payment = np.asarray(payment, dtype=float)
+    exact = months_to_payoff(balance, interest_rate, payment)
+    finite = np.isfinite(exact)
+    months = np.where(finite, np.ceil(exact - MONTH_TOLERANCE), np.inf)
+    full = np.where(finite, np.maximum(months - 1, 0.0), 0.0)
+    last = balance_after(balance, interest_rate, payment, full) * (
+        1 + monthly_rate(interest_rate)
+    )
+    interest = np.where(finite, payment * full + last - balance, np.inf)
+    return months, interest
+
+
+def payoff_strategies(
+    monthly_saving, balance=DEBT_BALANCE, interest_rate=DEBT_INTEREST_RATE
+):
+    """Describe repaying balance from each monthly saving, as reports show it."""
+    monthly_saving = np.asarray(monthly_saving, dtype=float)
+    months, interest = payoff(balance, interest_rate, monthly_saving)
+    return [
+        (
+            f"Pay off €{balance:.2f} in {n:.0f} months with €{saving:.2f}/month "
+            f"(€{paid:.2f} interest)"
+            if saving > 0 and np.isfinite(n)
+            else "No payoff plan; increase savings or reduce debt spending"
+        )
+        for n, paid, saving in zip(
+            months.ravel().tolist(),
+            interest.ravel().tolist(),
+            np.broadcast_to(monthly_saving, months.shape).ravel().tolist(),
+        )
+    ]
+
+
+def strategy_order(debts, strategy):
+    """Return the indices of debts in the order strategy pays them off."""
+    if strategy == AVALANCHE:
+        return np.argsort(-debts["interest_rate"].to_numpy(dtype=float), kind="stable")
+    if strategy == SNOWBALL:
+        return np.argsort(debts["balance"].to_numpy(dtype=float), kind="stable")
+    raise ValueError(f"Unknown debt strategy: {strategy}")
+
+
+def segment_schedule(
+    start, months, balance, interest_rate, payment, active, done, names
+):
+    """Month-by-month rows of one stretch of level payments."""
+    t = np.arange(1, months + 1, dtype=float)[:, None]
+    balances = balance_after(balance, interest_rate, payment, t)
+    before = np.vstack([balance, balances[:-1]])
+    interest = before * monthly_rate(interest_rate)
+    payments = np.broadcast_to(payment, balances.shape).copy()
+    # The debt repaid in this stretch only pays what is left in its last month
+    payments[-1, done] = before[-1, done] + interest[-1, done]
+    balances[-1, done] = 0.0
+    month, debt = np.nonzero(np.broadcast_to(active, balances.shape))
+    return pd.DataFrame(
+        {
+            "month": start + month + 1,
+            "debt": names[debt],
+            "payment": payments[month, debt],
+            "interest": interest[month, debt],
+            "principal": payments[month, debt] - interest[month, debt],
+            "balance": balances[month, debt],
+        }
+    )
+
+
+def payoff_plan(debts, extra_payment=0.0, strategy=AVALANCHE, schedule=False):
+    """Repay several debts with their minimum payments plus extra_payment a month.
+
+    debts has balance, interest_rate (annual %) and minimum_payment columns
+    and optionally name (a DataFrame or anything DataFrame() accepts). The
+    extra goes to the first unpaid debt in strategy order, and a repaid
+    debt's payment rolls over to it from the next month. Payments are level
+    between payoffs, so each stretch is solved as an annuity in closed form:
+    the work grows with the number of debts, not months. extra_payment may
+    be an array of scenarios.
+
+    Returns {"strategy", "order", "months", "total_interest",
+    "payoff_months"}: months and total_interest have extra_payment's shape
+    (inf where the payments never cover the interest) and payoff_months adds
+    a last axis with each debt's payoff month. schedule=True (scalar
+    extra_payment only) adds "schedule", a DataFrame with one row per debt
+    and month: month, debt, payment, interest, principal and balance.
+    """
+    debts = pd.DataFrame(debts).reset_index(drop=True)
+    if "name" not in debts.columns:
+        debts["name"] = [f"Debt {i + 1}" for i in range(len(debts))]
+    order = strategy_order(debts, strategy)
+    names = debts["name"].to_numpy(dtype=object)[order]
+    interest_rate = debts["interest_rate"].to_numpy(dtype=float)[order]
+    rate = monthly_rate(interest_rate)
+    minimum = debts["minimum_payment"].to_numpy(dtype=float)[order]
+    extra = np.asarray(extra_payment, dtype=float)
+    if schedule and extra.ndim:
+        raise ValueError("Schedules need a single extra_payment")
+
+    scenarios = extra.size
+    rows = np.arange(scenarios)
+    budget = minimum.sum() + extra.reshape(-1)
+    balance = np.tile(debts["balance"].to_numpy(dtype=float)[order], (scenarios, 1))
+    active = balance > 0
+    elapsed = np.zeros(scenarios)
+    interest = np.zeros(scenarios)
+    payoff_months = np.where(active, np.inf, 0.0)
+    segments = []
+    for _ in range(len(debts)):
+        running = active.any(axis=1)
+        if not running.any():
+            break
+        # Minimums everywhere, the rest of the budget to the first unpaid debt
+        payment = np.where(active, minimum, 0.0)
+        first = active.argmax(axis=1)
+        payment[rows, first] += np.where(running, budget - payment.sum(axis=1), 0.0)
+        exact = months_to_payoff(balance, interest_rate, payment)
+        months = np.where(active, np.ceil(exact - MONTH_TOLERANCE), np.inf)
+        step = months.min(axis=1)
+        stuck = running & ~np.isfinite(step)
+        elapsed[stuck] = interest[stuck] = np.inf
+        active[stuck] = False
+        running &= ~stuck
+        k = np.where(running, step, 0.0)[:, None]
+        done = active & (months == k)
+        after = balance_after(balance, interest_rate, payment, k)
+        last = balance_after(balance, interest_rate, payment, k - 1) * (1 + rate)
+        paid = np.where(done, payment * (k - 1) + last, payment * k)
+        remaining = np.where(done, 0.0, after)
+        interest += np.where(active, paid - balance + remaining, 0.0).sum(axis=1)
+        if schedule and running[0]:
+            segments.append(
+                segment_schedule(
+                    elapsed[0],
+                    int(k[0, 0]),
+                    balance[0],
+                    interest_rate,
+                    payment[0],
+                    active[0],
+                    done[0],
+                    names,
+                )
+            )
+        balance = np.where(active, remaining, balance)
+        elapsed += np.where(running, step, 0.0)
+        payoff_months = np.where(done, elapsed[:, None], payoff_months)
+        active &= ~done
+
+    # Back to the caller's debt order and extra_payment's shape
+    payoff_months = payoff_months[:, np.argsort(order)]
+    plan = {
+        "strategy": strategy,
+        "order": names.tolist(),
+        "months": elapsed.reshape(extra.shape),
+        "total_interest": interest.reshape(extra.shape),
+        "payoff_months": payoff_months.reshape(extra.shape + (len(debts),)),
+    }
+    if not extra.ndim:
+        plan["months"] = plan["months"].item()
+        plan["total_interest"] = plan["total_interest"].item()
+    if schedule:
+        plan["schedule"] = (
+            pd.concat(segments, ignore_index=True)
+            if segments
+            else pd.DataFrame(columns=SCHEDULE_COLUMNS)
+        )
+    return plan
+
+
+def compare_strategies(debts, extra_payment=0.0, schedule=False):
+    """Return {strategy: payoff_plan} for avalanche and snowball."""
+    return {
+        strategy: payoff_plan(debts, extra_payment, strategy, schedule)
+        for strategy in STRATEGIES
+    }
@@ -0,0 +1,153 @@
+# src/incremental.py
+import hashlib
+import numpy as np
+import pandas as pd
+from src.db import init_schema, migrate_to_user_keys
+from src.tenancy import DEFAULT_USER, user_ids
+
+FINGERPRINT_COLUMNS = [
+    "transaction_id",
+    "date",
+    "merchant_name",
+    "amount",
+    "category",
+    "account_id",
+]
+
+# income_month of changed_months: each user's latest month
+LATEST_MONTH = "latest"
+
+MONTH_FINGERPRINTS_SCHEMA = """CREATE TABLE IF NOT EXISTS month_fingerprints
+    (user_id TEXT NOT NULL DEFAULT 'default', month TEXT NOT NULL,
+    fingerprint TEXT, updated_at TEXT, PRIMARY KEY (user_id, month))"""
+
+
+def month_fingerprints(df, by_user=False):
+    """Return {month: content hash} for cleaned transactions.
+
+    Each row is hashed column-wise with pandas, then the sorted row hashes of a
+    month are digested together, so the fingerprint ignores row order but
+    changes whenever a transaction in that month is added, edited or removed.
+    With by_user the keys are (user_id, month) and each user's months are
+    hashed separately.
+    """
+    columns = [col for col in FINGERPRINT_COLUMNS if col in df.columns]
+    if df.empty:
+        return {}
+    row_hashes = pd.util.hash_pandas_object(df[columns], index=False).to_numpy()
+    months = df["date"].dt.strftime("%Y-%m").to_numpy()
+    users = user_ids(df, by_user).to_numpy()
+    order = np.lexsort((row_hashes, months, users))
+    users, months, row_hashes = users[order], months[order], row_hashes[order]
+    boundaries = (
+        np.flatnonzero((months[1:] != months[:-1]) | (users[1:] != users[:-1])) + 1
+    )
+    starts = np.concatenate(([0], boundaries))
+    ends = np.concatenate((boundaries, [len(months)]))
+    return {
+        (users[start], months[start]) if by_user else months[start]: hashlib.sha256(
+            row_hashes[start:end].tobytes()
+        ).hexdigest()
+        for start, end in zip(starts, ends)
+    }
+
+
+def init_fingerprint_table(conn):
+    """Create the month_fingerprints table if it does not exist yet."""
+    migrate_to_user_keys(conn, "month_fingerprints", MONTH_FINGERPRINTS_SCHEMA)
+
+
+def load_fingerprints(conn, by_user=False):
+    """Load the stored {month: fingerprint} map (of DEFAULT_USER).
+
+    With by_user, every user's fingerprints are loaded, keyed (user_id, month).
+    """
+    init_fingerprint_table(conn)
+    if by_user:
+        rows = conn.execute(
+            "SELECT user_id, month, fingerprint FROM month_fingerprints"
+        )
+        return {(user, month): fingerprint for user, month, fingerprint in rows}
+    return dict(
+        conn.execute(
+            "SELECT month, fingerprint FROM month_fingerprints WHERE user_id = ?",
+            (DEFAULT_USER,),
+        )
+    )
+
+
+def anchor_months(keys, by_user=False, income_month=None):
+    """Return {user: (first month, income month)} of fingerprint keys.
+
+    income_month is the "YYYY-MM" month whose income the analysis uses,
+    LATEST_MONTH for each user's latest month, or None if there is none.
+    """
+    months = {}
+    for key in keys:
+        user, month = key if by_user else (DEFAULT_USER, key)
+        months.setdefault(user, []).append(month)
+    return {
+        user: (
+            min(user_months),
+            max(user_months) if income_month == LATEST_MONTH else income_month,
+        )
+        for user, user_months in months.items()
+    }
+
+
+def changed_months(conn, fingerprints, by_user=False, income_month=None):
+    """Return the sorted months that are new, edited or no longer have transactions.
+
+    Every month's default savings goal comes from the user's first month,
+    and the analysis measures every month against the income of
+    income_month (see anchor_months). If either month is changed, or is no
+    longer the same month, all of that user's months are returned.
+
+    With by_user, fingerprints and the result are keyed (user_id, month).
+    """
+    stored = load_fingerprints(conn, by_user)
+    changed = {
+        month
+        for month, fingerprint in fingerprints.items()
+        if stored.get(month) != fingerprint
+    } | (stored.keys() - fingerprints.keys())
+    before = anchor_months(stored, by_user, income_month)
+    after = anchor_months(fingerprints, by_user, income_month)
+    for user, anchors in after.items():
+        keys = [(user, month) if by_user else month for month in anchors]
+        if anchors != before.get(user) or changed.intersection(keys):
+            changed.update(key for key in fingerprints if not by_user or key[0] == user)
+    return sorted(changed)
+
+
+def save_fingerprints(conn, fingerprints, by_user=False):
+    """Store fingerprints and forget months that no longer have transactions.
+
+    Without by_user only DEFAULT_USER's months are stored and pruned; with
+    by_user, fingerprints are keyed (user_id, month) and cover every user.
+    """
+    init_fingerprint_table(conn)
+    init_schema(conn)
+    keys = list(fingerprints) if by_user else [(DEFAULT_USER, m) for m in fingerprints]
+    with conn:
+        conn.executemany(
+            """INSERT OR REPLACE INTO month_fingerprints
+                (user_id, month, fingerprint, updated_at)
+                VALUES (?, ?, ?, datetime('now'))""",
+            [
+                (*key, fingerprint)
+                for key, fingerprint in zip(keys, fingerprints.values())
+            ],
+        )
+        conn.execute(
+            "CREATE TEMP TABLE IF NOT EXISTS current_months (user_id TEXT, month TEXT)"
+        )
+        conn.execute("DELETE FROM current_months")
+        conn.executemany("INSERT INTO current_months VALUES (?, ?)", keys)
+        scope = "1" if by_user else "user_id = ?"
+        for table in ["month_fingerprints", "monthly_reports"]:
+            conn.execute(
+                f"""DELETE FROM {table} WHERE {scope} AND (user_id, month) NOT IN
+                    (SELECT user_id, month FROM current_months)""",
+                () if by_user else (DEFAULT_USER,),
+            )
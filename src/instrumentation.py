@@ -0,0 +1,269 @@
+# src/instrumentation.py
+import collections
+import contextvars
+import functools
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+# Write the run's stage metrics to this path (.json or Prometheus .prom)
+METRICS_ENV = "FINAGENT_METRICS"
+# Profile the run: "cprofile", "pyinstrument" or "tracemalloc"
+PROFILE_ENV = "FINAGENT_PROFILE"
+PROFILE_DIR = "data/profiles"
+PROFILERS = ["cprofile", "pyinstrument", "tracemalloc"]
+METRIC_PREFIX = "finagent_stage"
+
+# Finished stage records kept, so long-lived processes such as the
+# dashboard do not grow them without bound; older records are dropped
+MAX_RECORDS = 10_000
+# Finished stage records of this process, in completion order
+_records = collections.deque(maxlen=MAX_RECORDS)
+_records_lock = threading.Lock()
+# Innermost running stage; nested stages are named parent/child
+_current = contextvars.ContextVar("finagent_stage", default=None)
+
+
+def max_rss_bytes():
+    """Return this process's peak resident memory so far, or None if unknown."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024  # Linux reports KiB
+
+
+@contextmanager
+def stage(name, rows_in=None):
+    """Record wall time, CPU time, rows and peak memory of a block of work.
+
+    Yields the stage's record, whose rows_in/rows_out the block may fill in
+    (see set_rows). CPU time is the whole process's, so it includes worker
+    threads. max_rss_bytes is the process's lifetime high-water mark at the
+    end of the stage, so it is the same for every stage after the biggest
+    one; rss_growth_bytes is how far the stage raised it. python_peak_bytes,
+    the peak of Python allocations within the stage, is only measured while
+    tracemalloc is tracing.
+    """
+    parent = _current.get()
+    record = {
+        "stage": f"{parent['stage']}/{name}" if parent else name,
+        "rows_in": rows_in,
+        "rows_out": None,
+    }
+    tracing = tracemalloc.is_tracing()
+    if tracing:
+        # The parent's peak so far would be lost by reset_peak; keep it
+        outer_peak = tracemalloc.get_traced_memory()[1]
+        if parent is not None:
+            parent["_peak"] = max(parent.get("_peak", 0), outer_peak)
+        tracemalloc.reset_peak()
+    token = _current.set(record)
+    start_rss = max_rss_bytes()
+    start_wall, start_cpu = time.perf_counter(), time.process_time()
+    try:
+        yield record
+    finally:
+        record["wall_seconds"] = time.perf_counter() - start_wall
+        record["cpu_seconds"] = time.process_time() - start_cpu
+        record["max_rss_bytes"] = max_rss_bytes()
+        record["rss_growth_bytes"] = (
+            None if start_rss is None else record["max_rss_bytes"] - start_rss
+        )
+        record["python_peak_bytes"] = None
+        if tracing and tracemalloc.is_tracing():
+            peak = max(tracemalloc.get_traced_memory()[1], record.pop("_peak", 0))
+            record["python_peak_bytes"] = peak
+            if parent is not None:
+                parent["_peak"] = max(parent.get("_peak", 0), peak)
+        _current.reset(token)
+        with _records_lock:
+            _records.append(record)
+
+
+def set_rows(rows_in=None, rows_out=None):
+    """Set rows in/out of the innermost running stage, if there is one."""
+    record = _current.get()
+    if record is None:
+        return
+    if rows_in is not None:
+        record["rows_in"] = rows_in
+    if rows_out is not None:
+        record["rows_out"] = rows_out
+
+
+def instrumented(name=None):
+    """Decorate a function to run as a stage named name (default: its name).
+
+    Unless the function calls set_rows, rows_out is the length of its
+    result when it has one.
+    """
+
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(name or func.__name__) as record:
+                result = func(*args, **kwargs)
+                if record["rows_out"] is None and hasattr(result, "__len__"):
+                    record["rows_out"] = len(result)
+                return result
+
+        return wrapper
+
+    return decorate
+
+
+def stage_records():
+    """Return a copy of the finished stage records (the last MAX_RECORDS)."""
+    with _records_lock:
+        return [dict(record) for record in _records]
+
+
+def reset_records():
+    """Forget the finished stage records."""
+    with _records_lock:
+        _records.clear()
+
+
+def to_prometheus(records):
+    """Format records as Prometheus text exposition (textfile collector) metrics.
+
+    Records of the same stage are combined: times and rows are summed,
+    memory is the maximum, and _calls counts them.
+    """
+    metrics = {
+        "calls": ("Number of times the stage ran.", None),
+        "wall_seconds": ("Wall-clock time spent in the stage.", "sum"),
+        "cpu_seconds": ("Process CPU time spent in the stage.", "sum"),
+        "rows_in": ("Rows the stage read.", "sum"),
+        "rows_out": ("Rows the stage produced.", "sum"),
+        "max_rss_bytes": (
+            "Process lifetime peak resident memory when the stage ended.",
+            "max",
+        ),
+        "rss_growth_bytes": (
+            "How far the stage raised the process peak resident memory.",
+            "max",
+        ),
+        "python_peak_bytes": ("Peak traced Python memory in the stage.", "max"),
+    }
+    stages = {}
+    for record in records:
+        combined = stages.setdefault(record["stage"], {"calls": 0})
+        combined["calls"] += 1
+        for field, (_, how) in metrics.items():
+            value = record.get(field)
+            if how is None or value is None:
+                continue
+            previous = combined.get(field)
+            if previous is None:
+                combined[field] = value
+            else:
+                combined[field] = (
+                    previous + value if how == "sum" else max(previous, value)
+                )
+    lines = []
+    for field, (help_text, _) in metrics.items():
+        name = f"{METRIC_PREFIX}_{field}"
+        values = [(s, v[field]) for s, v in stages.items() if v.get(field) is not None]
+        if not values:
+            continue
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} gauge")
+        for stage_name, value in values:
+            label = stage_name.replace("\\", "\\\\").replace('"', '\\"')
+            lines.append(f'{name}{{stage="{label}"}} {value}')
+    return "\n".join(lines) + "\n"
+
+
+def write_metrics(path, records=None):
+    """Write stage records to path as JSON, or Prometheus text if it ends in .prom.
+
+    The file is replaced atomically, so collectors never read a partial file.
+    Returns path, or None on error.
+    """
+    records = stage_records() if records is None else records
+    tmp_path = f"{path}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(tmp_path, "w") as f:
+            if path.endswith(".prom"):
+                f.write(to_prometheus(records))
+            else:
+                json.dump({"created_at": time.time(), "stages": records}, f, indent=2)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        print(f"Error writing metrics to {path}: {e}")
+        return None
+    print(f"Stage metrics written to {path}")
+    return path
+
+
+def write_metrics_from_env():
+    """Write the stage metrics to $FINAGENT_METRICS if it is set."""
+    path = os.getenv(METRICS_ENV)
+    return write_metrics(path) if path else None
+
+
+@contextmanager
+def profile_run(name="run", profiler=None, output_dir=PROFILE_DIR):
+    """Profile the block with the profiler named by $FINAGENT_PROFILE, if any.
+
+    cprofile dumps a .prof file (for pstats or snakeviz), pyinstrument an
+    HTML report, both to output_dir; tracemalloc turns on the
+    python_peak_bytes of stages. Without a profiler the block runs as is.
+    """
+    profiler = (profiler or os.getenv(PROFILE_ENV) or "").lower()
+    if not profiler:
+        yield
+        return
+    if profiler not in PROFILERS:
+        print(f"Unknown profiler '{profiler}'; expected one of {', '.join(PROFILERS)}")
+        yield
+        return
+    path = os.path.join(output_dir, f"{name}-{time.strftime('%Y%m%d-%H%M%S')}")
+    if profiler == "tracemalloc":
+        started = not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start()
+        try:
+            yield
+        finally:
+            if started:
+                tracemalloc.stop()
+        return
+    if profiler == "pyinstrument":
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            print("pyinstrument is not installed; running without profiling")
+            yield
+            return
+        active = Profiler()
+        path += ".html"
+    else:
+        import cProfile
+
+        active = cProfile.Profile()
+        path += ".prof"
+    if profiler == "pyinstrument":
+        active.start()
+    else:
+        active.enable()
+    try:
+        yield
+    finally:
+        os.makedirs(output_dir, exist_ok=True)
+        if profiler == "pyinstrument":
+            active.stop()
+            with open(path, "w") as f:
+                f.write(active.output_html())
+        else:
+            active.disable()
+            active.dump_stats(path)
+        print(f"Profile written to {path}")
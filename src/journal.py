@@ -0,0 +1,227 @@
+# src/journal.py
+import json
+import os
+import threading
+import uuid
+from src.tenancy import is_by_user, primary_user
+
+JOURNAL_PATH = "data/dashboard_journal.jsonl"
+COMPACT_EVERY = 100  # journal entries folded into the snapshots at a time
+
+# Serializes appends and compaction between dashboard sessions (threads)
+_lock = threading.Lock()
+
+
+def atomic_write(path, write):
+    """Call write(f) on a new temp file, fsync it and rename it over path.
+
+    Readers and crashes only ever see the old or the new complete file.
+    Every call gets its own temp file, so concurrent writers of the same
+    path cannot interleave; the last rename wins.
+    """
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    # Created like any other file (not 0600 like tempfile's)
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    try:
+        with open(tmp_path, "x") as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    _fsync_directory(directory)
+
+
+def atomic_write_json(path, data, indent=4):
+    """Atomically replace path with data as JSON (an empty file for None)."""
+
+    def write(f):
+        if data is not None:
+            json.dump(data, f, indent=indent)
+
+    atomic_write(path, write)
+
+
+def _fsync_directory(directory):
+    # Persist the rename itself; not supported on every platform
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def append_entry(entry, journal_path=JOURNAL_PATH):
+    """Append one entry as a JSON line and fsync it, independent of history size."""
+    os.makedirs(os.path.dirname(journal_path) or ".", exist_ok=True)
+    line = (json.dumps(entry) + "\n").encode()
+    with _lock:
+        with open(journal_path, "ab+") as f:
+            # Start on a fresh line if a crash left the last entry torn
+            if f.seek(0, os.SEEK_END) > 0:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    line = b"\n" + line
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+
+
+def journal_transaction(transaction, journal_path=JOURNAL_PATH):
+    """Record a new transaction; it needs a unique txnId."""
+    append_entry({"type": "transaction", "transaction": transaction}, journal_path)
+
+
+def journal_budget_amount(month, bucket, amount, journal_path=JOURNAL_PATH):
+    """Record the new amount of a month's budget bucket, e.g. savings_debt."""
+    append_entry(
+        {"type": "budget", "month": month, "bucket": bucket, "amount": amount},
+        journal_path,
+    )
+
+
+def read_journal(journal_path=JOURNAL_PATH):
+    """Return the journal entries in order, skipping lines torn by a crash."""
+    if not os.path.exists(journal_path):
+        return []
+    entries = []
+    with open(journal_path, "r") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                entries.append(json.loads(line))
+            except json.JSONDecodeError:
+                print(f"Skipping incomplete entry in {journal_path}")
+    return entries
+
+
+def read_journal_from(journal_path, offset=0):
+    """Return (entries, offset) for the complete lines after byte offset.
+
+    The returned offset is where the next read continues; a line still
+    being appended is left for that read. Lines torn by a crash are
+    skipped as in read_journal.
+    """
+    with open(journal_path, "rb") as f:
+        f.seek(offset)
+        data = f.read()
+    end = data.rfind(b"\n") + 1
+    entries = []
+    for line in data[:end].splitlines():
+        if not line.strip():
+            continue
+        try:
+            entries.append(json.loads(line))
+        except json.JSONDecodeError:
+            print(f"Skipping incomplete entry in {journal_path}")
+    return entries, offset + end
+
+
+def replay_transactions(transactions, entries):
+    """Return the snapshot transaction list with journaled transactions added.
+
+    Transactions already in the snapshot (same txnId) are skipped, so entries
+    can safely be replayed onto a snapshot they were compacted into. The
+    snapshot itself is returned unchanged if there is nothing to add.
+    """
+    added = [e["transaction"] for e in entries if e["type"] == "transaction"]
+    if not added:
+        return transactions
+    transactions = transactions if transactions is not None else []
+    seen = {t.get("txnId") for t in transactions if isinstance(t, dict)}
+    new = [t for t in added if t["txnId"] not in seen]
+    return transactions + new if new else transactions
+
+
+def replay_budget(budget, entries):
+    """Return the snapshot budget report with journaled bucket amounts applied.
+
+    Entries store absolute amounts rather than deltas, so replaying them
+    more than once gives the same result. They only hold for the report
+    they were made against: whoever regenerates the report must drop them
+    with discard_entries("budget"). In a report nested by user_id they apply
+    to the primary_user the dashboard shows.
+    """
+    updates = [e for e in entries if e["type"] == "budget"]
+    if not updates:
+        return budget
+    if budget and is_by_user(budget):
+        user = primary_user(budget)
+        return {**budget, user: replay_budget(budget.get(user, {}), updates)}
+    budget = dict(budget or {})
+    for e in updates:
+        month = dict(budget.get(e["month"], {}))
+        month[e["bucket"]] = {**month.get(e["bucket"], {}), "amount": e["amount"]}
+        budget[e["month"]] = month
+    return budget
+
+
+def _read_snapshot(path):
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return None
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def discard_entries(entry_type, journal_path=JOURNAL_PATH):
+    """Drop the journal entries of entry_type; return how many were dropped.
+
+    Used when the snapshot they apply to is regenerated from scratch, such
+    as budget entries once the pipeline rewrites the budget report.
+    """
+    with _lock:
+        entries = read_journal(journal_path)
+        kept = [e for e in entries if e["type"] != entry_type]
+        if len(kept) == len(entries):
+            return 0
+        atomic_write(
+            journal_path,
+            lambda f: f.writelines(json.dumps(e) + "\n" for e in kept),
+        )
+    print(
+        f"Discarded {len(entries) - len(kept)} {entry_type} entries from {journal_path}"
+    )
+    return len(entries) - len(kept)
+
+
+def _truncate(journal_path):
+    atomic_write_json(journal_path, None)
+
+
+def compact_journal(snapshots, journal_path=JOURNAL_PATH):
+    """Fold the journal into its snapshot files and start a new, empty journal.
+
+    snapshots maps each snapshot path to the replay function for it. Each
+    snapshot is replaced atomically before the journal is cleared; since
+    replay is idempotent, a crash in between only means the same entries
+    are folded in again next time. Returns the number of entries compacted.
+    """
+    with _lock:
+        entries = read_journal(journal_path)
+        if not entries:
+            return 0
+        for path, replay in snapshots.items():
+            data = _read_snapshot(path)
+            compacted = replay(data, entries)
+            if compacted is not data:
+                atomic_write_json(path, compacted)
+        _truncate(journal_path)
+    print(f"Compacted {len(entries)} journal entries into {', '.join(snapshots)}")
+    return len(entries)
+
+
+def maybe_compact(snapshots, journal_path=JOURNAL_PATH, every=COMPACT_EVERY):
+    """Compact once the journal holds at least every entries; return entries folded."""
+    if len(read_journal(journal_path)) < every:
+        return 0
+    return compact_journal(snapshots, journal_path)
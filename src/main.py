@@ -1,24 +1,121 @@
 # src/main.py
+import argparse
+import json
 import os
+from contextlib import closing
 from src.sample_data import generate_sample_transactions
 from src.clean_transactions import clean_transactions
 from src.budgeting import apply_50_30_20_rule  # Will be used later
 from src.analysis import analyze_spending  # Will be used later
+from src.storage import save_transactions
+from src.db import connect
+from src.incremental import (
+    LATEST_MONTH,
+    changed_months,
+    month_fingerprints,
+    save_fingerprints,
+)
+from src.journal import discard_entries
+from src.instrumentation import (
+    instrumented,
+    profile_run,
+    reset_records,
+    stage,
+    write_metrics_from_env,
+)
 
+# Cleaned transactions: typed columnar file for the pipeline, JSON export for the dashboard
+CLEANED_PATH = "data/transactions_cleaned.parquet"
+CLEANED_EXPORT_PATH = "data/transactions_cleaned.json"
+RAW_PATH = "data/transactions.json"
+# Month whose budgeted income the analysis uses (each user's latest with by_user)
+ANALYSIS_INCOME_MONTH = "2025-06"
 
-def main():
-    """Main function to run the FinAgent transaction pipeline."""
+
+def main(incremental=False, by_user=False):
+    """Main function to run the FinAgent transaction pipeline.
+
+    In incremental mode the existing raw transactions are reused and only
+    months whose cleaned transactions changed since the last run are
+    rebudgeted and reanalyzed. With by_user every stage partitions the
+    transactions by user_id and handles all users in one pass.
+
+    Every stage's wall/CPU time, rows and peak memory are recorded and, if
+    FINAGENT_METRICS names a .json or .prom file, written there after the
+    run. FINAGENT_PROFILE=cprofile|pyinstrument|tracemalloc profiles it.
+    """
+    reset_records()
+    try:
+        with profile_run("pipeline"):
+            run_pipeline(incremental, by_user)
+    finally:
+        write_metrics_from_env()
+
+
+@instrumented("pipeline")
+def run_pipeline(incremental=False, by_user=False):
     print("Starting FinAgent transaction pipeline...")
-    sample_transactions = generate_sample_transactions(
-        600
-    )  # Generate and save 600 transactions
-    print(f"Generated {len(sample_transactions)} sample transactions")
+    with stage("load") as record:
+        if incremental and os.path.exists(RAW_PATH):
+            with open(RAW_PATH, "r") as f:
+                sample_transactions = json.load(f)
+            print(f"Loaded {len(sample_transactions)} transactions from {RAW_PATH}")
+        else:
+            sample_transactions = generate_sample_transactions(
+                600
+            )  # Generate and save 600 transactions
+            print(f"Generated {len(sample_transactions)} sample transactions")
+        record["rows_out"] = len(sample_transactions)
     print("Cleaning transactions...")
-    cleaned_df = clean_transactions(sample_transactions)
-    print("Generating budget reports...")
-    budget_reports = apply_50_30_20_rule()
-    print("Analyzing spending...")
-    analysis_reports = analyze_spending(budget_reports["2025-06"]["income"])
+    cleaned_df = clean_transactions(sample_transactions, output_path=CLEANED_PATH)
+    with stage("export", rows_in=len(cleaned_df)):
+        save_transactions(cleaned_df, CLEANED_EXPORT_PATH)
+
+    with closing(connect()) as conn:
+        months = None
+        if incremental:
+            with stage("fingerprints", rows_in=len(cleaned_df)) as record:
+                fingerprints = month_fingerprints(cleaned_df, by_user)
+                months = changed_months(
+                    conn,
+                    fingerprints,
+                    by_user,
+                    LATEST_MONTH if by_user else ANALYSIS_INCOME_MONTH,
+                )
+                record["rows_out"] = len(months)
+            if not months:
+                print("No months changed since the last run; reports are up to date.")
+                return
+            print(
+                f"Recomputing {len(months)} changed month(s): "
+                f"{', '.join('/'.join(m) if by_user else m for m in months)}"
+            )
+        print("Generating budget reports...")
+        budget_reports = apply_50_30_20_rule(
+            clean_input_path=CLEANED_PATH, months=months, by_user=by_user
+        )
+        if budget_reports:
+            # The dashboard's journaled bucket amounts were made against the
+            # old report; replaying them would overwrite the fresh amounts
+            discard_entries("budget")
+        if by_user:
+            # Each user's income as budgeted for their latest month
+            income = {
+                user: reports[max(reports)]["income"]
+                for user, reports in budget_reports.items()
+            }
+        else:
+            income = budget_reports[ANALYSIS_INCOME_MONTH]["income"]
+        print("Analyzing spending...")
+        analysis_reports = analyze_spending(
+            income,
+            clean_input_path=CLEANED_PATH,
+            conn=conn,
+            months=months,
+            by_user=by_user,
+        )
+        if incremental and budget_reports and analysis_reports:
+            save_fingerprints(conn, fingerprints, by_user)
     # Further processing (dashboard, etc.) to be added in subsequent steps
     print(
         "Pipeline completed (initial setup with sample data, cleaning, budgeting, and analysis)."
@@ -26,4 +123,16 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Run the FinAgent pipeline.")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="only recompute months whose transactions changed",
+    )
+    parser.add_argument(
+        "--by-user",
+        action="store_true",
+        help="partition every stage by the transactions' user_id",
+    )
+    args = parser.parse_args()
+    main(incremental=args.incremental, by_user=args.by_user)
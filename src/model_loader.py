@@ -0,0 +1,264 @@
+# src/model_loader.py
+import argparse
+import hashlib
+import os
+import re
+import shutil
+import threading
+import time
+from dataclasses import dataclass, field
+import psutil
+from dotenv import load_dotenv
+
+BASE_MODEL = "meta-llama/Llama-2-7b-hf"
+LORA_ADAPTER = "FinGPT/fingpt-mt_llama2-7b_lora"
+MODEL_CACHE_DIR = "models"
+MERGED_DIR = "models/fingpt-llama2-7b-merged"
+QUANTIZATION_MODES = [None, "int8", "4bit"]
+
+# Models already loaded in this process, by ModelConfig
+_models = {}
+_models_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class ModelConfig:
+    """What to load: a base model, an optional LoRA adapter, dtype and quantization.
+
+    base_model, adapter and dtype decide the merged checkpoint cached under
+    cache_dir; quantization is applied at load time on top of it.
+    """
+
+    base_model: str = BASE_MODEL
+    adapter: str = LORA_ADAPTER
+    dtype: str = "float32"
+    quantization: str = None
+    cache_dir: str = MODEL_CACHE_DIR
+    token: str = field(default=None, repr=False, compare=False)
+
+
+def checkpoint_dir(config):
+    """Return the cache directory for a config's merged checkpoint.
+
+    The name keeps the model ids readable and ends in a hash of
+    base model + adapter + dtype, so each combination gets its own entry.
+    """
+    key = f"{config.base_model}|{config.adapter or ''}|{config.dtype}"
+    digest = hashlib.sha256(key.encode()).hexdigest()[:12]
+    parts = [config.base_model, config.adapter or "base", config.dtype]
+    slug = "--".join(re.sub(r"[^A-Za-z0-9._-]+", "_", part) for part in parts)
+    return os.path.join(config.cache_dir, f"{slug}-{digest}")
+
+
+def is_complete_checkpoint(path):
+    """Return True if path holds a fully written safetensors checkpoint."""
+    return os.path.exists(os.path.join(path, "config.json")) and any(
+        name.endswith(".safetensors") for name in os.listdir(path)
+    )
+
+
+def rss_mb():
+    """Resident memory of this process in MB."""
+    return psutil.Process().memory_info().rss / 1e6
+
+
+def hf_token():
+    """Return HF_TOKEN from the environment or .env, if set."""
+    load_dotenv()
+    return os.getenv("HF_TOKEN")
+
+
+def merge_lora(
+    base_model=BASE_MODEL,
+    adapter=LORA_ADAPTER,
+    output_dir=MERGED_DIR,
+    token=None,
+    overwrite=False,
+    dtype="float32",
+):
+    """Merge a LoRA adapter into its base model once and save the result.
+
+    The merged checkpoint (safetensors, plus the tokenizer) loads as a
+    plain model, with no peft wrapper or disk offload at inference time.
+    With adapter=None the base model is only converted to safetensors.
+    It is written to a temporary directory and renamed into place, and an
+    existing checkpoint is reused unless overwrite is set.
+    """
+    import torch
+    from transformers import AutoModelForCausalLM, AutoTokenizer
+
+    if not overwrite and os.path.isdir(output_dir):
+        if is_complete_checkpoint(output_dir):
+            print(f"Reusing merged model in {output_dir}")
+            return output_dir
+    token = token or hf_token()
+    start = time.perf_counter()
+    model = AutoModelForCausalLM.from_pretrained(
+        base_model,
+        torch_dtype=getattr(torch, dtype),
+        low_cpu_mem_usage=True,
+        token=token,
+    )
+    if adapter:
+        from peft import PeftModel
+
+        model = PeftModel.from_pretrained(model, adapter, token=token)
+        model = model.merge_and_unload()
+    tmp_dir = f"{output_dir}.tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    model.save_pretrained(tmp_dir, safe_serialization=True)
+    AutoTokenizer.from_pretrained(base_model, token=token).save_pretrained(tmp_dir)
+    shutil.rmtree(output_dir, ignore_errors=True)
+    os.replace(tmp_dir, output_dir)
+    print(
+        f"Saved {adapter or 'no adapter'} + {base_model} to {output_dir} "
+        f"in {time.perf_counter() - start:.1f}s"
+    )
+    return output_dir
+
+
+def quantize_int8(model):
+    """Apply PyTorch dynamic int8 quantization to every Linear layer (CPU)."""
+    import torch
+
+    return torch.ao.quantization.quantize_dynamic(
+        model, {torch.nn.Linear}, dtype=torch.qint8
+    )
+
+
+def load_for_inference(model_dir=MERGED_DIR, quantization=None, dtype="float32"):
+    """Load a merged checkpoint for inference, optionally quantized.
+
+    quantization is None (dtype weights), "int8" (dynamic quantization on
+    CPU) or "4bit" (bitsandbytes NF4, which needs a CUDA device). The
+    safetensors weights are memory-mapped rather than copied and merged.
+    Returns (model, tokenizer, stats) with load seconds and resident memory.
+    """
+    import torch
+    from transformers import AutoModelForCausalLM, AutoTokenizer
+
+    if quantization not in QUANTIZATION_MODES:
+        raise ValueError(f"Unknown quantization mode: {quantization}")
+    rss_before = rss_mb()
+    start = time.perf_counter()
+    kwargs = {"torch_dtype": getattr(torch, dtype), "low_cpu_mem_usage": True}
+    if quantization == "4bit":
+        if not torch.cuda.is_available():
+            raise ValueError("4-bit quantization needs bitsandbytes with a CUDA GPU")
+        from transformers import BitsAndBytesConfig
+
+        kwargs = {
+            "quantization_config": BitsAndBytesConfig(
+                load_in_4bit=True,
+                bnb_4bit_quant_type="nf4",
+                bnb_4bit_compute_dtype=torch.float16,
+            ),
+            "device_map": "auto",
+        }
+    model = AutoModelForCausalLM.from_pretrained(model_dir, **kwargs)
+    if quantization == "int8":
+        model = quantize_int8(model)
+    model.eval()
+    tokenizer = AutoTokenizer.from_pretrained(model_dir)
+    if tokenizer.pad_token is None:
+        tokenizer.pad_token = tokenizer.eos_token
+    stats = {
+        "quantization": quantization or dtype,
+        "load_seconds": time.perf_counter() - start,
+        "rss_mb": rss_mb(),
+        "rss_delta_mb": rss_mb() - rss_before,
+    }
+    return model, tokenizer, stats
+
+
+def load_model(config=None):
+    """Load the model described by config, merging and caching it on first use.
+
+    The first start merges (or converts) into checkpoint_dir(config); later
+    starts memory-map that checkpoint, and later calls in the same process
+    return the already loaded (model, tokenizer).
+    """
+    config = config or ModelConfig()
+    loaded = _models.get(config)
+    if loaded is None:
+        with _models_lock:
+            loaded = _models.get(config)
+            if loaded is None:
+                path = merge_lora(
+                    config.base_model,
+                    config.adapter,
+                    checkpoint_dir(config),
+                    token=config.token,
+                    dtype=config.dtype,
+                )
+                model, tokenizer, stats = load_for_inference(
+                    path, config.quantization, config.dtype
+                )
+                print(
+                    f"Loaded {path} in {stats['load_seconds']:.1f}s, "
+                    f"RSS {stats['rss_mb']:.0f} MB"
+                )
+                loaded = _models[config] = (model, tokenizer)
+    return loaded
+
+
+def unload_models():
+    """Forget every model loaded by load_model in this process."""
+    with _models_lock:
+        _models.clear()
+
+
+def tokens_per_second(
+    model, tokenizer, prompt="Hello, how are you?", max_new_tokens=32
+):
+    """Greedily generate max_new_tokens and return the generation rate."""
+    import torch
+
+    inputs = tokenizer(prompt, return_tensors="pt").to(model.device)
+    with torch.inference_mode():
+        start = time.perf_counter()
+        outputs = model.generate(
+            **inputs,
+            max_new_tokens=max_new_tokens,
+            min_new_tokens=max_new_tokens,
+            do_sample=False,
+            pad_token_id=tokenizer.pad_token_id,
+        )
+        elapsed = time.perf_counter() - start
+    generated = outputs.shape[1] - inputs["input_ids"].shape[1]
+    return generated / elapsed
+
+
+def benchmark(model_dir=MERGED_DIR, quantization=None, max_new_tokens=32):
+    """Load a model and report load time, resident memory and tokens/sec."""
+    try:
+        model, tokenizer, stats = load_for_inference(model_dir, quantization)
+        stats["tokens_per_second"] = tokens_per_second(
+            model, tokenizer, max_new_tokens=max_new_tokens
+        )
+    except Exception as e:
+        print(f"Error benchmarking {model_dir} ({quantization or 'float32'}): {e}")
+        return {}
+    print(
+        f"{stats['quantization']:<8} load {stats['load_seconds']:.1f}s, "
+        f"RSS {stats['rss_mb']:.0f} MB (+{stats['rss_delta_mb']:.0f} MB), "
+        f"{stats['tokens_per_second']:.1f} tokens/s"
+    )
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Merge the FinGPT LoRA and benchmark low-memory CPU inference."
+    )
+    parser.add_argument("--base", default=BASE_MODEL)
+    parser.add_argument("--adapter", default=LORA_ADAPTER)
+    parser.add_argument("--model-dir", default=MERGED_DIR)
+    parser.add_argument(
+        "--quantization", choices=["none", "int8", "4bit"], nargs="+", default=["int8"]
+    )
+    parser.add_argument("--max-new-tokens", type=int, default=32)
+    args = parser.parse_args()
+    merge_lora(args.base, args.adapter, args.model_dir)
+    for mode in args.quantization:
+        benchmark(args.model_dir, None if mode == "none" else mode, args.max_new_tokens)
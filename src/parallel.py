@@ -0,0 +1,258 @@
+# src/parallel.py
+import argparse
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import closing
+import numpy as np
+from src.analysis import spending_reports
+from src.budgeting import budget_reports, income_by_month, prepare_raw_transactions
+from src.clean_transactions import clean_frame
+from src.db import connect, init_schema, save_monthly_reports
+from src.sample_data import END_DATE, START_DATE, sample_frame, to_arrow_table
+from src.storage import read_arrow_table, save_transactions
+from src.tenancy import nest_by_user
+
+# Load-test output is kept apart from the live app's data files
+OUTPUT_DIR = "data/loadtest"
+CLEANED_PATH = os.path.join(OUTPUT_DIR, "transactions_cleaned.parquet")
+BUDGET_REPORT_PATH = os.path.join(OUTPUT_DIR, "budget_report.json")
+DB_PATH = os.path.join(OUTPUT_DIR, "finagent.db")
+# Shards are fixed units of work independent of the worker count, so every
+# worker count produces the same transactions and reports
+DEFAULT_SHARDS = 64
+# Shard outputs go to RAM-backed shared memory where available
+SHARED_MEMORY_DIR = "/dev/shm"
+# Plaid fields read by the clean and income stages
+RAW_COLUMNS = [
+    "transaction_id",
+    "date",
+    "authorized_date",
+    "merchant_name",
+    "name",
+    "amount",
+    "personal_finance_category",
+    "category",
+    "account_id",
+    "user_id",
+]
+STAGES = ["generate", "clean", "budget", "analyze"]
+
+
+def plan_shards(count, users, shards=DEFAULT_SHARDS):
+    """Split users into contiguous shards and count transactions in proportion.
+
+    Returns [(first_user, shard_users, first_id, shard_count)], with
+    transaction ids contiguous across shards so they never collide.
+    """
+    bounds = np.linspace(0, users, min(shards, users) + 1).round().astype(int)
+    plan = []
+    for start, end in zip(bounds[:-1].tolist(), bounds[1:].tolist()):
+        first_id, last_id = count * start // users, count * end // users
+        plan.append((start, end - start, first_id, last_id - first_id))
+    return plan
+
+
+def init_worker():
+    # One Arrow thread per process; the pool provides the parallelism
+    import pyarrow as pa
+
+    pa.set_cpu_count(1)
+    pa.set_io_thread_count(1)
+
+
+def run_shard(shard):
+    """Run generate -> clean -> budget -> analyze for one shard of users.
+
+    Stages hand DataFrames to each other in memory. The cleaned transactions
+    are written to shard["path"] as an Arrow IPC file for the parent to
+    memory-map; the reports are returned with per-stage seconds.
+    """
+    seconds = {}
+    start = time.perf_counter()
+    rng = np.random.default_rng([shard["seed"], shard["index"] + 1])
+    flat = sample_frame(
+        rng,
+        shard["count"],
+        shard["first_id"],
+        shard["user_scale"],
+        shard["accounts_per_user"],
+        shard["start_date"],
+        shard["end_date"],
+        shard["first_user"],
+    )
+    raw = to_arrow_table(flat).select(RAW_COLUMNS).to_pandas()
+    seconds["generate"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    cleaned = clean_frame(raw)
+    save_transactions(cleaned, shard["path"])
+    seconds["clean"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    incomes = income_by_month(prepare_raw_transactions(raw), by_user=True)
+    budgets = budget_reports(cleaned, incomes, by_user=True)
+    seconds["budget"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    # Each user's income as budgeted for their latest month, like main()
+    income = {
+        user: reports[max(reports)]["income"]
+        for user, reports in nest_by_user(budgets).items()
+    }
+    rows, _ = spending_reports(cleaned, income, by_user=True)
+    seconds["analyze"] = time.perf_counter() - start
+    return {
+        "index": shard["index"],
+        "path": shard["path"],
+        "transactions": len(cleaned),
+        "budgets": budgets,
+        "rows": rows,
+        "seconds": seconds,
+    }
+
+
+def merge_cleaned(paths, output_path):
+    """Concatenate shard Arrow files, in shard order, into one Parquet file."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    tables = []
+    for path in paths:
+        table = read_arrow_table(path)
+        # pandas picks the smallest index type per shard; widen them to match
+        schema = pa.schema(
+            [
+                (
+                    field.with_type(pa.dictionary(pa.int32(), field.type.value_type))
+                    if pa.types.is_dictionary(field.type)
+                    else field
+                )
+                for field in table.schema
+            ],
+            metadata=table.schema.metadata,
+        )
+        tables.append(table.cast(schema))
+    table = pa.concat_tables(tables).unify_dictionaries()
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    tmp_path = f"{output_path}.tmp"
+    pq.write_table(table, tmp_path, compression="zstd")
+    os.replace(tmp_path, output_path)
+    return table.num_rows
+
+
+def run_parallel(
+    count,
+    users,
+    workers=None,
+    shards=DEFAULT_SHARDS,
+    accounts_per_user=3,
+    seed=0,
+    cleaned_path=CLEANED_PATH,
+    budget_path=BUDGET_REPORT_PATH,
+    db_path=DB_PATH,
+    start_date=START_DATE,
+    end_date=END_DATE,
+):
+    """Run the multi-user pipeline with shards of users fanned out to processes.
+
+    Each worker process generates, cleans, budgets and analyzes whole users,
+    so no stage needs another shard's data. Cleaned shards come back as
+    Arrow IPC files in shared memory and are merged into cleaned_path; the
+    reports are merged in (user, month) order, budget_path gets
+    {user_id: {month: report}} and monthly_reports is written in one
+    transaction. Output does not depend on workers (one process per CPU if
+    None; 1 runs in this process). Returns {"transactions", "users",
+    "months", "workers", "seconds", "stage_seconds"}, or {} on error.
+    """
+    workers = workers or os.cpu_count() or 1
+    start = time.perf_counter()
+    try:
+        user_scale = np.random.default_rng(seed).lognormal(0.0, 0.3, users)
+        shm_dir = SHARED_MEMORY_DIR if os.path.isdir(SHARED_MEMORY_DIR) else None
+        with tempfile.TemporaryDirectory(prefix="finagent-", dir=shm_dir) as tmpdir:
+            tasks = [
+                {
+                    "index": index,
+                    "seed": seed,
+                    "first_user": first_user,
+                    "user_scale": user_scale[first_user : first_user + shard_users],
+                    "first_id": first_id,
+                    "count": shard_count,
+                    "accounts_per_user": accounts_per_user,
+                    "start_date": start_date,
+                    "end_date": end_date,
+                    "path": os.path.join(tmpdir, f"shard-{index:05d}.arrow"),
+                }
+                for index, (first_user, shard_users, first_id, shard_count) in (
+                    enumerate(plan_shards(count, users, shards))
+                )
+            ]
+            if workers == 1:
+                init_worker()
+                results = [run_shard(task) for task in tasks]
+            else:
+                with ProcessPoolExecutor(workers, initializer=init_worker) as pool:
+                    # map yields results in task order, whichever shard finishes first
+                    results = list(pool.map(run_shard, tasks))
+            transactions = merge_cleaned([r["path"] for r in results], cleaned_path)
+
+        budgets = {}
+        rows = []
+        for result in results:
+            budgets.update(result["budgets"])
+            rows.extend(result["rows"])
+        budgets = nest_by_user(dict(sorted(budgets.items())))
+        rows.sort(key=lambda row: (row[0], row[1]))
+        os.makedirs(os.path.dirname(budget_path) or ".", exist_ok=True)
+        with open(budget_path, "w") as f:
+            json.dump(budgets, f, indent=2)
+        with closing(connect(db_path)) as conn:
+            init_schema(conn)
+            save_monthly_reports(conn, rows, user_id=None)
+    except Exception as e:
+        print(f"Error running parallel pipeline: {e}")
+        return {}
+    seconds = time.perf_counter() - start
+    stage_seconds = {
+        stage: sum(r["seconds"][stage] for r in results) for stage in STAGES
+    }
+    print(
+        f"Processed {transactions} transactions for {len(budgets)} users "
+        f"({len(rows)} user-months) with {workers} worker(s) in {seconds:.1f}s"
+    )
+    return {
+        "transactions": transactions,
+        "users": len(budgets),
+        "months": len(rows),
+        "workers": workers,
+        "seconds": seconds,
+        "stage_seconds": stage_seconds,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Run the multi-user FinAgent pipeline on a process pool."
+    )
+    parser.add_argument("--count", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--shards", type=int, default=DEFAULT_SHARDS)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--cleaned-path", default=CLEANED_PATH)
+    parser.add_argument("--budget-path", default=BUDGET_REPORT_PATH)
+    parser.add_argument("--db-path", default=DB_PATH)
+    args = parser.parse_args()
+    run_parallel(
+        args.count,
+        args.users,
+        args.workers,
+        args.shards,
+        seed=args.seed,
+        cleaned_path=args.cleaned_path,
+        budget_path=args.budget_path,
+        db_path=args.db_path,
+    )
@@ -0,0 +1,206 @@
+# src/plaid_sync.py
+import hashlib
+import json
+from contextlib import closing
+from datetime import date, datetime
+from src.db import DB_PATH, connect
+
+SYNC_SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS sync_cursors
+        (item_id TEXT PRIMARY KEY, cursor TEXT, updated_at TEXT)""",
+    """CREATE TABLE IF NOT EXISTS synced_transactions
+        (transaction_id TEXT PRIMARY KEY, item_id TEXT, account_id TEXT, date TEXT,
+        payload TEXT)""",
+    """CREATE INDEX IF NOT EXISTS synced_transactions_item
+        ON synced_transactions (item_id)""",
+]
+
+# Plaid asks clients to restart pagination from the original cursor on this error
+MUTATION_DURING_PAGINATION = "TRANSACTIONS_SYNC_MUTATION_DURING_PAGINATION"
+
+
+def item_key(access_token):
+    """Derive a stable item id from an access token without storing the token."""
+    return hashlib.sha256(access_token.encode()).hexdigest()[:16]
+
+
+def build_sync_request(access_token, cursor=None, count=500):
+    """Build a /transactions/sync request, resuming from cursor if given."""
+    from plaid.model.transactions_sync_request import TransactionsSyncRequest
+
+    if cursor:
+        return TransactionsSyncRequest(
+            access_token=access_token, cursor=cursor, count=count
+        )
+    return TransactionsSyncRequest(access_token=access_token, count=count)
+
+
+def plaid_error_field(error, field):
+    """Extract a field such as error_code from a Plaid API exception, if any."""
+    body = getattr(error, "body", None)
+    if isinstance(body, (str, bytes)):
+        try:
+            return json.loads(body).get(field)
+        except (ValueError, AttributeError):
+            return None
+    return getattr(error, field, None)
+
+
+def plaid_error_code(error):
+    """Extract the Plaid error_code from an API exception, if any."""
+    return plaid_error_field(error, "error_code")
+
+
+def to_record(transaction):
+    """Convert a Plaid transaction model or dict into JSON-safe plain data."""
+    data = transaction.to_dict() if hasattr(transaction, "to_dict") else transaction
+
+    def default(obj):
+        if isinstance(obj, (date, datetime)):
+            return obj.isoformat()
+        return str(obj)
+
+    return json.loads(json.dumps(data, default=default))
+
+
+def fetch_updates(
+    client,
+    access_token,
+    cursor=None,
+    request_factory=build_sync_request,
+    max_restarts=3,
+):
+    """Page through /transactions/sync from cursor until has_more is false.
+
+    Returns the added, modified and removed transactions of every page along
+    with the cursor to resume from next time.
+    """
+    for attempt in range(max_restarts + 1):
+        added, modified, removed = [], [], []
+        next_cursor = cursor
+        try:
+            while True:
+                response = client.transactions_sync(
+                    request_factory(access_token, next_cursor)
+                )
+                added.extend(response["added"])
+                modified.extend(response["modified"])
+                removed.extend(
+                    removed_tx["transaction_id"] for removed_tx in response["removed"]
+                )
+                next_cursor = response["next_cursor"]
+                if not response["has_more"]:
+                    break
+        except Exception as e:
+            if (
+                plaid_error_code(e) == MUTATION_DURING_PAGINATION
+                and attempt < max_restarts
+            ):
+                print("Transactions changed during pagination; restarting sync")
+                continue
+            raise
+        return {
+            "added": added,
+            "modified": modified,
+            "removed": removed,
+            "next_cursor": next_cursor,
+        }
+
+
+def init_sync_schema(conn):
+    """Create the sync cursor and synced transaction tables if needed."""
+    with conn:
+        for statement in SYNC_SCHEMA:
+            conn.execute(statement)
+
+
+def load_cursor(conn, item_id):
+    """Return the saved cursor for item_id, or None before the first sync."""
+    row = conn.execute(
+        "SELECT cursor FROM sync_cursors WHERE item_id = ?", (item_id,)
+    ).fetchone()
+    return row[0] if row else None
+
+
+def apply_updates(conn, item_id, updates):
+    """Upsert added/modified transactions, delete removed ones and save the cursor.
+
+    Everything happens in one transaction, so the cursor only advances
+    together with the data it describes.
+    """
+    rows = []
+    for transaction in updates["added"] + updates["modified"]:
+        record = to_record(transaction)
+        rows.append(
+            (
+                record["transaction_id"],
+                item_id,
+                record.get("account_id"),
+                record.get("date"),
+                json.dumps(record),
+            )
+        )
+    with conn:
+        conn.executemany(
+            """INSERT OR REPLACE INTO synced_transactions
+                (transaction_id, item_id, account_id, date, payload)
+                VALUES (?, ?, ?, ?, ?)""",
+            rows,
+        )
+        conn.executemany(
+            "DELETE FROM synced_transactions WHERE transaction_id = ?",
+            [(transaction_id,) for transaction_id in updates["removed"]],
+        )
+        conn.execute(
+            """INSERT OR REPLACE INTO sync_cursors (item_id, cursor, updated_at)
+                VALUES (?, ?, datetime('now'))""",
+            (item_id, updates["next_cursor"]),
+        )
+
+
+def sync_item(
+    client,
+    access_token,
+    item_id=None,
+    db_path=DB_PATH,
+    conn=None,
+    request_factory=build_sync_request,
+):
+    """Incrementally sync one Plaid item into the local transaction store."""
+    item_id = item_id or item_key(access_token)
+    if conn is None:
+        with closing(connect(db_path)) as own_conn:
+            return sync_item(
+                client,
+                access_token,
+                item_id,
+                conn=own_conn,
+                request_factory=request_factory,
+            )
+    init_sync_schema(conn)
+    updates = fetch_updates(
+        client, access_token, load_cursor(conn, item_id), request_factory
+    )
+    apply_updates(conn, item_id, updates)
+    summary = {
+        "item_id": item_id,
+        "added": len(updates["added"]),
+        "modified": len(updates["modified"]),
+        "removed": len(updates["removed"]),
+    }
+    print(f"Synced item {item_id}: {summary}")
+    return summary
+
+
+def load_synced_transactions(db_path=DB_PATH, conn=None):
+    """Return every synced transaction as a Plaid-shaped dict."""
+    if conn is None:
+        with closing(connect(db_path)) as own_conn:
+            return load_synced_transactions(conn=own_conn)
+    init_sync_schema(conn)
+    return [
+        json.loads(payload)
+        for (payload,) in conn.execute(
+            "SELECT payload FROM synced_transactions ORDER BY date, transaction_id"
+        )
+    ]
@@ -0,0 +1,352 @@
+# src/query_engine.py
+import re
+
+# "jan" .. "dec" -> month number; full names and common abbreviations match
+MONTH_NUMBERS = {
+    name: i + 1
+    for i, name in enumerate("jan feb mar apr may jun jul aug sep oct nov dec".split())
+}
+MONTH_LABELS = [
+    "January",
+    "February",
+    "March",
+    "April",
+    "May",
+    "June",
+    "July",
+    "August",
+    "September",
+    "October",
+    "November",
+    "December",
+]
+DEFAULT_TOP_N = 5
+
+# Grammar. A month reference is a month name with an optional year, YYYY-MM,
+# MM/YYYY, this/last month or a bare year; periods are one reference or a
+# from/between/since range of them.
+MONTH = (
+    r"(?:jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?"
+    r"|aug(?:ust)?|sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)"
+)
+REF = (
+    rf"(?:{MONTH}(?:\s+\d{{4}})?|\d{{4}}-\d{{1,2}}|\d{{1,2}}/\d{{4}}"
+    r"|(?:this|last|previous)\s+month|\d{4})"
+)
+REF_RE = re.compile(rf"\b{REF}\b")
+REF_PARTS_RE = re.compile(
+    rf"^(?:(?P<name>{MONTH})(?:\s+(?P<name_year>\d{{4}}))?"
+    r"|(?P<iso_year>\d{4})-(?P<iso_month>\d{1,2})"
+    r"|(?P<slash_month>\d{1,2})/(?P<slash_year>\d{4})"
+    r"|(?P<relative>this|last|previous)\s+month"
+    r"|(?P<year>\d{4}))$"
+)
+RANGE_RE = re.compile(
+    rf"\b(?:(?:from|between)\s+(?P<start>{REF})\s+(?:to|and|until|through)"
+    rf"\s+(?P<end>{REF})|since\s+(?P<since>{REF}))\b"
+)
+TOP_RE = re.compile(
+    r"\b(?:top|biggest|largest)\s*(?P<n>\d+)?\s+(?:merchants?|stores?|shops?|payees?)\b"
+    r"|\bwhere\s+(?:did|do)\s+i\s+spend\s+(?:the\s+)?most\b"
+)
+CATEGORY_RE = re.compile(
+    r"\b(?:spending|spend|spent|expenses?|expenditure)\s+"
+    r"(?:(?:more|less|the\s+most|most)\s+)?(?:on|for)\s+"
+    r"(?P<category>[a-z][a-z&/ -]*?)"
+    r"(?=\s+(?:in|during|for|from|between|since|this|last|over|vs\.?|versus"
+    r"|compared|than)\b|\s*[?.!,]|\s*$)"
+)
+COMPARE_RE = re.compile(r"\b(?:vs\.?|versus|compared?|compares|than)\b")
+SPENDING_RE = re.compile(r"\b(?:spending|spend|spent|expenses?|expenditure)\b")
+CATEGORY_SPLIT_RE = re.compile(r"\s*(?:,|\band\b|&)\s*")
+
+
+def month_key(year, month):
+    return f"{year:04d}-{month:02d}"
+
+
+def month_label(key):
+    year, month = key.split("-")
+    return f"{MONTH_LABELS[int(month) - 1]} {year}"
+
+
+def add_months(key, offset):
+    """Return the "YYYY-MM" key offset months after key."""
+    year, month = map(int, key.split("-"))
+    index = year * 12 + month - 1 + offset
+    return month_key(index // 12, index % 12 + 1)
+
+
+def month_range(start, end):
+    """Return the "YYYY-MM" keys from start to end inclusive."""
+    months = [start]
+    while months[-1] < end:
+        months.append(add_months(months[-1], 1))
+    return months
+
+
+def default_year(month, available, year_hint=None):
+    """Pick the year for a month named without one.
+
+    An explicit year elsewhere in the question wins; otherwise the latest
+    year with data for that month, then the latest year with any data.
+    """
+    if year_hint is not None:
+        return year_hint
+    years = [int(key[:4]) for key in available if int(key[5:7]) == month]
+    if years:
+        return max(years)
+    return int(max(available)[:4]) if available else None
+
+
+def ref_year(ref):
+    """Return the explicit year in a month reference, if any."""
+    match = re.search(r"\d{4}", ref)
+    return int(match.group()) if match else None
+
+
+def resolve_ref(ref, available, year_hint=None):
+    """Resolve one month reference to (first month, last month), or None.
+
+    this/last month are relative to the latest month with data.
+    """
+    parts = REF_PARTS_RE.match(ref)
+    if parts is None:
+        return None
+    if parts["year"]:
+        year = int(parts["year"])
+        return month_key(year, 1), month_key(year, 12)
+    if parts["relative"]:
+        if not available:
+            return None
+        latest = max(available)
+        key = latest if parts["relative"] == "this" else add_months(latest, -1)
+        return key, key
+    if parts["name"]:
+        month = MONTH_NUMBERS[parts["name"][:3]]
+        year = parts["name_year"]
+        year = int(year) if year else default_year(month, available, year_hint)
+    elif parts["iso_year"]:
+        month, year = int(parts["iso_month"]), int(parts["iso_year"])
+    else:
+        month, year = int(parts["slash_month"]), int(parts["slash_year"])
+    if year is None or not 1 <= month <= 12:
+        return None
+    return month_key(year, month), month_key(year, month)
+
+
+def period(first, last):
+    """Build a {months, label, phrase} period from its first and last month keys.
+
+    phrase is the label with its preposition, e.g. "in June 2025".
+    """
+    if first == last:
+        label = month_label(first)
+    elif first.endswith("-01") and last == f"{first[:4]}-12":
+        label = first[:4]
+    else:
+        label = f"{month_label(first)} to {month_label(last)}"
+        return {
+            "months": month_range(first, last),
+            "label": label,
+            "phrase": f"from {label}",
+        }
+    return {"months": month_range(first, last), "label": label, "phrase": f"in {label}"}
+
+
+def parse_periods(text, available=()):
+    """Return the periods named in text, in order of appearance."""
+    available = sorted(available)
+    match = RANGE_RE.search(text)
+    if match and match["since"]:
+        start = resolve_ref(match["since"], available)
+        if start is None or not available:
+            return []
+        return [period(start[0], max(start[0], max(available)))]
+    if match:
+        end = resolve_ref(match["end"], available)
+        start_year = ref_year(match["start"])
+        hint = None
+        if start_year is None and end is not None and ref_year(match["end"]):
+            hint = int(end[0][:4])
+        start = resolve_ref(match["start"], available, hint)
+        if start is None or end is None:
+            return []
+        if start[0] > end[1] and start_year is None:
+            # "from November to February 2025" starts the year before
+            start = (add_months(start[0], -12), add_months(start[1], -12))
+        return [period(start[0], end[1])] if start[0] <= end[1] else []
+    refs = [m.group() for m in REF_RE.finditer(text)]
+    hint = last_year(refs)
+    periods = []
+    for ref in refs:
+        resolved = resolve_ref(ref, available, hint)
+        if resolved is not None:
+            periods.append(period(*resolved))
+    return periods
+
+
+def last_year(refs):
+    """Return the last explicit year among month references, if any."""
+    years = [ref_year(ref) for ref in refs if ref_year(ref) is not None]
+    return years[-1] if years else None
+
+
+def unresolved_ref(text, available=()):
+    """Return the first time reference in text that names no valid period.
+
+    E.g. "13/2025" or "from June to March 2024"; None if every reference
+    resolves. this/last month and since ranges only fail without data and
+    are not reported.
+    """
+    available = sorted(available)
+    match = RANGE_RE.search(text)
+    if match and match["since"] and not available:
+        return None
+    if match:
+        return None if parse_periods(text, available) else match.group()
+    refs = [m.group() for m in REF_RE.finditer(text)]
+    hint = last_year(refs)
+    for ref in refs:
+        relative = REF_PARTS_RE.match(ref)["relative"]
+        if not relative and resolve_ref(ref, available, hint) is None:
+            return ref
+    return None
+
+
+def resolve_categories(text, categories):
+    """Map a category phrase to known categories, or None if one is unknown.
+
+    The whole phrase is tried first (for names like "Food & Drink"), then
+    its comma/and-separated parts; plurals match singular category names.
+    """
+    names = {}
+    for category in categories:
+        names[category.lower()] = category
+        names.setdefault(category.lower().rstrip("s"), category)
+
+    def lookup(phrase):
+        phrase = phrase.strip()
+        return names.get(phrase) or names.get(phrase.rstrip("s"))
+
+    whole = lookup(text)
+    if whole is not None:
+        return [whole]
+    found = [lookup(part) for part in CATEGORY_SPLIT_RE.split(text) if part.strip()]
+    if not found or None in found:
+        return None
+    return list(dict.fromkeys(found))
+
+
+def parse_query(query, available=(), categories=()):
+    """Parse a question into an intent dict, or None if no intent matches.
+
+    available are the "YYYY-MM" months with data and categories the known
+    category names. Intents are "top_merchants" (with n), "compare" (two
+    periods) and "spending" (one period). Each has categories (None for all
+    categories) and, if the category phrase was not recognised,
+    unknown_category. A time reference that names no valid month is given
+    as invalid_period; only questions without any time reference default
+    to the latest month.
+    """
+    text = " ".join(query.lower().replace("’", "'").split())
+    available = sorted(available)
+    periods = parse_periods(text, available)
+    invalid = unresolved_ref(text, available)
+    if not periods and invalid is None and available:
+        periods = [period(available[-1], available[-1])]
+    top = TOP_RE.search(text)
+    if top:
+        intent = {
+            "intent": "top_merchants",
+            "n": int(top["n"] or DEFAULT_TOP_N),
+            "categories": None,
+            "periods": periods[:1],
+        }
+        if invalid is not None:
+            intent["invalid_period"] = invalid
+        return intent
+    category = CATEGORY_RE.search(text)
+    if category is None and not (SPENDING_RE.search(text) and REF_RE.search(text)):
+        return None
+    intent = {"intent": "spending", "categories": None, "periods": periods[:1]}
+    if invalid is not None:
+        intent["invalid_period"] = invalid
+    if category:
+        phrase = category["category"].strip()
+        intent["categories"] = resolve_categories(phrase, categories)
+        if intent["categories"] is None:
+            intent["unknown_category"] = phrase
+    if COMPARE_RE.search(text) and len(periods) >= 2:
+        intent["intent"] = "compare"
+        intent["periods"] = periods[:2]
+    return intent
+
+
+def category_label(categories):
+    if categories is None:
+        return "total spending"
+    return "spending on " + " and ".join(categories)
+
+
+def total_spending(cube, months, categories):
+    if categories is None:
+        return cube.total(months)
+    totals = [cube.total(months, category) for category in categories]
+    return {field: sum(t[field] for t in totals) for field in totals[0]}
+
+
+def answer_query(query, cube):
+    """Answer a spending question from a SpendingCube's aggregates.
+
+    Returns the response text, or None if the question is not one the
+    grammar understands (the dashboard then asks the advisor model).
+    """
+    intent = parse_query(query, cube.months(), cube.categories())
+    if intent is None:
+        return None
+    if "unknown_category" in intent:
+        return (
+            f"I couldn't find a category called '{intent['unknown_category']}'. "
+            f"Known categories: {', '.join(cube.categories())}."
+        )
+    if "invalid_period" in intent:
+        return (
+            f"I couldn't understand the time period '{intent['invalid_period']}'. "
+            "Try a month like 'June 2025', '2025-06' or '06/2025'."
+        )
+    if not intent["periods"]:
+        return "No transaction data available yet."
+    first = intent["periods"][0]
+    if intent["intent"] == "top_merchants":
+        top = cube.top_merchants(first["months"], intent["n"])
+        if not top:
+            return f"No merchant spending found {first['phrase']}."
+        listed = ", ".join(f"{merchant} (€{spend:.2f})" for merchant, spend in top)
+        return f"Your top {len(top)} merchants {first['phrase']}: {listed}."
+    label = category_label(intent["categories"])
+    totals = [
+        total_spending(cube, p["months"], intent["categories"])
+        for p in intent["periods"]
+    ]
+    if intent["intent"] == "compare":
+        second = intent["periods"][1]
+        available = set(cube.months())
+        for p in (first, second):
+            if available.isdisjoint(p["months"]):
+                return f"No transaction data {p['phrase']}."
+        a, b = totals[0]["spend"], totals[1]["spend"]
+        if a == b:
+            return (
+                f"Your {label} was €{a:.2f} in both {first['label']} and "
+                f"{second['label']}."
+            )
+        percent = f", {(a - b) / b * 100:+.1f}%" if b else ""
+        return (
+            f"Your {label} was €{a:.2f} in {first['label']} and €{b:.2f} in "
+            f"{second['label']} (€{abs(a - b):.2f} {'more' if a > b else 'less'}"
+            f"{percent})."
+        )
+    if totals[0]["n"] == 0:
+        return f"No {label} found {first['phrase']}."
+    return f"Your {label} {first['phrase']} was €{totals[0]['spend']:.2f}."
@@ -1,12 +1,34 @@
 # src/sample_data.py
+import argparse
 import json
 import random
+import time
 from datetime import datetime, timedelta
+from itertools import repeat
 import os
+import numpy as np
+import pandas as pd
 from src.clean_transactions import (
     CATEGORY_MAPPING,
 )  # Import category mapping from clean_transactions.py
 
+# Category probabilities based on Lufthansa project manager lifestyle
+CATEGORY_WEIGHTS = {
+    "TRAVEL": 0.30,  # Frequent airline travel
+    "FOOD_AND_DRINK": 0.20,  # Coffee and meals
+    "SHOPPING": 0.15,  # Shopping
+    "TRANSFER": 0.10,  # Rent
+    "LOAN_PAYMENTS": 0.10,  # Credit payments
+    "TRANSPORTATION": 0.10,  # Local transport
+    "INCOME": 0.04,  # Weekly income
+    "ENTERTAINMENT": 0.01,  # Occasional entertainment
+}
+WEEKLY_INCOME = 4000.0 / 4.33  # Approx weekly income (€4000 / 4.33 weeks/month)
+# generate_sample_transactions(count) adds int(count * 0.04) weekly income rows
+WEEKLY_INCOME_SHARE = 0.04 / 1.04
+START_DATE = "2024-01-01"
+END_DATE = "2025-12-31"
+
 
 def generate_sample_transactions(count=600):
     """Generate 500-600 sample transactions for a Lufthansa project manager (2024-2025)."""
@@ -17,7 +39,7 @@ def generate_sample_transactions(count=600):
 
     # Simulate €4000 monthly income (weekly payments)
     income_weeks = [start_date + timedelta(days=i * 7) for i in range(total_days // 7)]
-    income_amount = 4000.0 / 4.33  # Approx weekly income (€4000 / 4.33 weeks/month)
+    income_amount = WEEKLY_INCOME
 
     for i in range(count):
         # Random date within the range
@@ -26,19 +48,8 @@ def generate_sample_transactions(count=600):
             "%Y-%m-%d"
         )  # Using ISO format for simplicity and compatibility
 
-        # Define category probabilities based on Lufthansa project manager lifestyle
-        category_weights = {
-            "TRAVEL": 0.30,  # Frequent airline travel
-            "FOOD_AND_DRINK": 0.20,  # Coffee and meals
-            "SHOPPING": 0.15,  # Shopping
-            "TRANSFER": 0.10,  # Rent
-            "LOAN_PAYMENTS": 0.10,  # Credit payments
-            "TRANSPORTATION": 0.10,  # Local transport
-            "INCOME": 0.04,  # Weekly income
-            "ENTERTAINMENT": 0.01,  # Occasional entertainment
-        }
         category_key = random.choices(
-            list(category_weights.keys()), weights=category_weights.values(), k=1
+            list(CATEGORY_WEIGHTS.keys()), weights=CATEGORY_WEIGHTS.values(), k=1
         )[0]
 
         # Amount generation
@@ -162,3 +173,363 @@ def generate_sample_transactions(count=600):
     )
 
     return transactions
+
+
+def _labels(prefix, values):
+    """Format integer ids as prefix + id, formatting each distinct id once."""
+    unique, inverse = np.unique(values, return_inverse=True)
+    return np.array([f"{prefix}{value}" for value in unique], dtype=object)[inverse]
+
+
+def sample_frame(
+    rng,
+    count,
+    first_id=0,
+    user_scale=(1.0,),
+    accounts_per_user=3,
+    start_date=START_DATE,
+    end_date=END_DATE,
+    first_user=0,
+):
+    """Draw count transactions as a flat DataFrame, one NumPy call per column.
+
+    Follows the same distributions as generate_sample_transactions,
+    including its extra weekly income: the last WEEKLY_INCOME_SHARE of the
+    rows are INCOME paid on consecutive weeks from start_date, continuing
+    from first_id's position so batches do not repeat the same weeks.
+    transaction_ids are sequential from first_id, so they never collide;
+    each row belongs to a random user (amounts scaled by user_scale) and one
+    of that user's accounts. Users are numbered from first_user + 1, so
+    separately drawn frames can cover disjoint users.
+    """
+    keys = np.array(list(CATEGORY_WEIGHTS), dtype=object)
+    weights = np.array(list(CATEGORY_WEIGHTS.values()))
+    category = keys[rng.choice(len(keys), count, p=weights / weights.sum())]
+    start = np.datetime64(start_date, "D")
+    days = (np.datetime64(end_date, "D") - start).astype(int)
+    day = rng.integers(0, days + 1, count)
+    first_week = round(first_id * WEEKLY_INCOME_SHARE)
+    weekly = round((first_id + count) * WEEKLY_INCOME_SHARE) - first_week
+    if weekly:
+        category[count - weekly :] = "INCOME"
+        weeks = np.arange(first_week, first_week + weekly) % max(days // 7, 1)
+        day[count - weekly :] = weeks * 7
+    travel = category == "TRAVEL"
+    dates = _labels("", start + day)
+    user = rng.integers(0, len(user_scale), count)
+    account = (first_user + user) * accounts_per_user + rng.integers(
+        0, accounts_per_user, count
+    )
+
+    amount = rng.uniform(5.0, 200.0, count)  # General expenses
+    loan = category == "LOAN_PAYMENTS"
+    amount[loan] = rng.uniform(100.0, 300.0, loan.sum())
+    amount[category == "INCOME"] = WEEKLY_INCOME
+    # 5% chance of refund for travel/shopping, of 10-50% of the amount
+    refund = (travel | (category == "SHOPPING")) & (rng.random(count) < 0.05)
+    amount[refund] *= -rng.uniform(0.1, 0.5, refund.sum())
+    amount *= np.asarray(user_scale)[user]
+
+    store_number = _labels("", rng.integers(1000, 10000, count))
+    store_number[travel] = None
+    return pd.DataFrame(
+        {
+            "transaction_id": np.array(
+                [f"tx{i}" for i in range(first_id, first_id + count)], dtype=object
+            ),
+            "user_id": _labels("user", first_user + user + 1),
+            "account_id": _labels("acc", account + 1),
+            "date": dates,
+            "amount": amount.round(2),
+            "category": category,
+            "merchant_name": np.where(
+                travel, "Lufthansa", _labels("Store_", rng.integers(1, 11, count))
+            ),
+            "counterparty_name": np.where(
+                travel, "Lufthansa", _labels("Merchant_", rng.integers(1, 11, count))
+            ),
+            "entity_id": _labels("ent", rng.integers(1000, 10000, count)),
+            "merchant_entity_id": _labels("mer", rng.integers(1000, 10000, count)),
+            "store_number": store_number,
+            "name": _labels("Transaction_", rng.integers(1, 11, count)),
+            "payment_channel": np.where(
+                np.isin(category, ["SHOPPING", "ENTERTAINMENT"]), "online", "in store"
+            ),
+        }
+    )
+
+
+def plaid_layout(flat):
+    """Lay out a sample_frame's columns as a Plaid transaction record.
+
+    Arrays are per-row values, dicts nested objects, one-element lists
+    single-item arrays and anything else a constant. user_id is added at the
+    end so multi-user runs can be told apart.
+    """
+    travel = (flat["category"] == "TRAVEL").to_numpy()
+    website = np.where(travel, "lufthansa.com", None)
+    logo_url = np.where(travel, "https://lufthansa-logo.com", None)
+    column = {name: values.to_numpy() for name, values in flat.items()}
+    return {
+        "account_id": column["account_id"],
+        "account_owner": None,
+        "amount": column["amount"],
+        "authorized_date": column["date"],
+        "authorized_datetime": None,
+        "category": None,
+        "category_id": None,
+        "check_number": None,
+        "counterparties": [
+            {
+                "name": column["counterparty_name"],
+                "type": "merchant",
+                "website": website,
+                "logo_url": logo_url,
+                "confidence_level": "VERY_HIGH",
+                "entity_id": column["entity_id"],
+                "phone_number": None,
+            }
+        ],
+        "date": column["date"],
+        "datetime": None,
+        "iso_currency_code": "EUR",
+        "location": {
+            "address": None,
+            "city": None,
+            "region": None,
+            "postal_code": None,
+            "country": None,
+            "lat": None,
+            "lon": None,
+            "store_number": column["store_number"],
+        },
+        "logo_url": logo_url,
+        "merchant_entity_id": column["merchant_entity_id"],
+        "merchant_name": column["merchant_name"],
+        "name": column["name"],
+        "payment_channel": column["payment_channel"],
+        "payment_meta": {
+            "reference_number": None,
+            "ppd_id": None,
+            "payee": None,
+            "by_order_of": None,
+            "payer": None,
+            "payment_method": None,
+            "payment_processor": None,
+            "reason": None,
+        },
+        "pending": False,
+        "pending_transaction_id": None,
+        "personal_finance_category": {
+            "confidence_level": "VERY_HIGH",
+            "detailed": (flat["category"] + "_DETAILED").to_numpy(),
+            "primary": column["category"],
+        },
+        "transaction_code": None,
+        "transaction_id": column["transaction_id"],
+        "transaction_type": "place",
+        "unofficial_currency_code": None,
+        "website": website,
+        "user_id": column["user_id"],
+    }
+
+
+def _json_parts(layout, parts):
+    # Append the layout as JSON text: literal strings, arrays for per-row values
+    if isinstance(layout, dict):
+        parts.append("{")
+        for i, (key, value) in enumerate(layout.items()):
+            parts.append(("," if i else "") + json.dumps(key) + ":")
+            _json_parts(value, parts)
+        parts.append("}")
+    elif isinstance(layout, list):
+        parts.append("[")
+        for i, value in enumerate(layout):
+            parts.append("," if i else "")
+            _json_parts(value, parts)
+        parts.append("]")
+    elif isinstance(layout, np.ndarray):
+        parts.append(layout)
+    else:
+        parts.append(json.dumps(layout))
+
+
+def _json_literals(values):
+    # Generated strings never need escaping, so quoting them is enough
+    if values.dtype.kind == "f":
+        return list(map(repr, values.tolist()))
+    return ["null" if value is None else f'"{value}"' for value in values]
+
+
+def to_json_lines(flat):
+    """Render a sample_frame as Plaid JSON Lines text.
+
+    The record layout is turned into runs of constant JSON text and columns
+    of pre-rendered JSON values, and each line is one join over them,
+    instead of building and serializing a dict per transaction.
+    """
+    parts = []
+    _json_parts(plaid_layout(flat), parts)
+    parts.append("\n")
+    pieces = []
+    for part in parts:
+        if isinstance(part, str) and pieces and isinstance(pieces[-1], str):
+            pieces[-1] += part
+        else:
+            pieces.append(part)
+    columns = [
+        repeat(piece) if isinstance(piece, str) else _json_literals(piece)
+        for piece in pieces
+    ]
+    return "".join(map("".join, zip(*columns)))
+
+
+def _arrow_array(layout, count):
+    import pyarrow as pa
+
+    if isinstance(layout, dict):
+        children = [_arrow_array(v, count) for v in layout.values()]
+        return pa.StructArray.from_arrays(children, names=list(layout))
+    if isinstance(layout, list):
+        offsets = np.arange(0, count * len(layout) + 1, len(layout), dtype=np.int32)
+        if len(layout) != 1:
+            raise ValueError("Only single-item arrays are supported")
+        return pa.ListArray.from_arrays(offsets, _arrow_array(layout[0], count))
+    if isinstance(layout, np.ndarray):
+        # Object columns are strings even when a batch holds only None
+        return pa.array(layout, type=pa.string() if layout.dtype == object else None)
+    if layout is None:
+        return pa.nulls(count)
+    return pa.repeat(layout, count)
+
+
+def to_arrow_table(flat):
+    """Build a Plaid-shaped pyarrow Table from a sample_frame, column by column."""
+    import pyarrow as pa
+
+    layout = plaid_layout(flat)
+    return pa.Table.from_arrays(
+        [_arrow_array(value, len(flat)) for value in layout.values()],
+        names=list(layout),
+    )
+
+
+def iter_sample_batches(
+    count,
+    users=1,
+    accounts_per_user=3,
+    seed=0,
+    batch_size=100_000,
+    start_date=START_DATE,
+    end_date=END_DATE,
+):
+    """Yield flat sample_frames of at most batch_size rows, count rows in total.
+
+    Every batch has its own generator derived from seed, so the output is
+    reproducible for the same arguments and memory stays bounded by
+    batch_size. User spending levels are drawn once for the whole run.
+    """
+    user_scale = np.random.default_rng(seed).lognormal(0.0, 0.3, users)
+    for index, first_id in enumerate(range(0, count, batch_size)):
+        rng = np.random.default_rng([seed, index + 1])
+        yield sample_frame(
+            rng,
+            min(batch_size, count - first_id),
+            first_id,
+            user_scale,
+            accounts_per_user,
+            start_date,
+            end_date,
+        )
+
+
+def _write_jsonl(batches, out):
+    for flat in batches:
+        out.write(to_json_lines(flat))
+        yield len(flat)
+
+
+def _write_parquet(batches, path):
+    import pyarrow.parquet as pq
+
+    writer = None
+    try:
+        for flat in batches:
+            table = to_arrow_table(flat)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema, compression="zstd")
+            writer.write_table(table)
+            yield len(flat)
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def write_sample_transactions(
+    output_path,
+    count,
+    users=1,
+    accounts_per_user=3,
+    seed=0,
+    batch_size=100_000,
+    start_date=START_DATE,
+    end_date=END_DATE,
+):
+    """Stream count generated Plaid transactions to a JSON Lines or Parquet file.
+
+    The format follows the extension (.jsonl or .parquet; Parquet gets one
+    row group per batch). Batches are written as they are generated to a
+    temporary file that replaces output_path at the end. Returns
+    {"rows", "batches", "seconds"}, or {} on error.
+    """
+    extension = os.path.splitext(output_path)[1].lower()
+    tmp_path = f"{output_path}.tmp"
+    batches = iter_sample_batches(
+        count, users, accounts_per_user, seed, batch_size, start_date, end_date
+    )
+    start = time.perf_counter()
+    rows = written = 0
+    try:
+        if extension not in (".jsonl", ".parquet"):
+            raise ValueError(f"Unsupported sample data format '{extension}'")
+        os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+        if extension == ".jsonl":
+            with open(tmp_path, "w") as out:
+                for n in _write_jsonl(batches, out):
+                    rows, written = rows + n, written + 1
+        else:
+            for n in _write_parquet(batches, tmp_path):
+                rows, written = rows + n, written + 1
+        os.replace(tmp_path, output_path)
+    except Exception as e:
+        print(f"Error generating sample transactions: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return {}
+    seconds = time.perf_counter() - start
+    print(
+        f"Generated {rows} transactions for {users} users in {seconds:.1f}s "
+        f"({rows / max(seconds, 1e-9):,.0f} rows/s) to {output_path}"
+    )
+    return {"rows": rows, "batches": written, "seconds": seconds}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Generate Plaid-shaped sample transactions for load testing."
+    )
+    parser.add_argument("output", help="output file, .jsonl or .parquet")
+    parser.add_argument("--count", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--accounts-per-user", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--batch-size", type=int, default=100_000)
+    args = parser.parse_args()
+    write_sample_transactions(
+        args.output,
+        args.count,
+        args.users,
+        args.accounts_per_user,
+        args.seed,
+        args.batch_size,
+    )
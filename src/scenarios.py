@@ -0,0 +1,218 @@
+# src/scenarios.py
+import itertools
+import numpy as np
+import pandas as pd
+from src.budgeting import BUDGET_BUCKETS, bucket_statuses
+from src.debt import DEBT_BALANCE, DEBT_INTEREST_RATE, payoff
+
+DEFAULT_INCOME = 4000.0
+BUCKETS = ["needs", "wants", "savings_debt"]
+MULTIPLIER_SUFFIX = " multiplier"  # scenario column scaling one category
+
+
+def monthly_aggregates(df, income=DEFAULT_INCOME):
+    """Precompute month x category spending of cleaned transactions for scenarios.
+
+    spend only counts positive amounts, as in the 50/30/20 budget; net is
+    the signed total, which the risk flag and debt payoff use for the
+    savings/debt bucket as the analysis does. income is one monthly income
+    or {"YYYY-MM": income}, e.g. from the budget reports; months missing
+    from it get DEFAULT_INCOME. Returns {"months", "categories", "spend"
+    and "net" (months x categories), "income" (per month)}.
+    """
+    periods = df["date"].dt.to_period("M")
+    amount = df["amount"]
+    grouped = (
+        pd.DataFrame({"spend": amount.where(amount > 0, 0.0), "net": amount})
+        .groupby([periods, df["category"]], observed=True)
+        .sum()
+    )
+    index = pd.PeriodIndex(periods.dropna().unique()).sort_values()
+    spend, net = (
+        grouped[field].unstack(fill_value=0.0).reindex(index, fill_value=0.0)
+        for field in ("spend", "net")
+    )
+    months = [month.strftime("%Y-%m") for month in spend.index]
+    return build_aggregates(
+        months, list(spend.columns), spend.to_numpy(), net.to_numpy(), income
+    )
+
+
+def cube_aggregates(cube, income=DEFAULT_INCOME):
+    """monthly_aggregates from a SpendingCube's already aggregated cells."""
+    months, categories = cube.months(), cube.categories()
+    spend, net = (
+        np.array(
+            [
+                [
+                    cube.cells[month].get(category, [0.0, 0, 0.0])[field]
+                    for category in categories
+                ]
+                for month in months
+            ],
+            dtype=float,
+        ).reshape(len(months), len(categories))
+        for field in (0, 2)
+    )
+    return build_aggregates(months, categories, spend, net, income)
+
+
+def build_aggregates(months, categories, spend, net, income):
+    if not isinstance(income, dict):
+        income = dict.fromkeys(months, income)
+    return {
+        "months": months,
+        "categories": categories,
+        "spend": np.asarray(spend, dtype=float),
+        "net": np.asarray(net, dtype=float),
+        "income": np.array(
+            [income.get(month, DEFAULT_INCOME) for month in months], dtype=float
+        ),
+    }
+
+
+def scenario_grid(
+    income=(None,),
+    savings_goal=(None,),
+    multipliers=None,
+    debt_balance=(DEBT_BALANCE,),
+    debt_interest_rate=(DEBT_INTEREST_RATE,),
+):
+    """Build one scenario per combination of the given adjustments.
+
+    income and savings_goal of None keep each month's income and the
+    budget's default goal (20% of the first month's income). multipliers
+    maps categories to spending factors, e.g. {"Travel": [1.0, 0.8]} for
+    "what if I cut Travel by 20%". Returns a DataFrame with one row per
+    scenario for evaluate_scenarios.
+    """
+    columns = {
+        "income": income,
+        "savings_goal": savings_goal,
+        **{
+            f"{category}{MULTIPLIER_SUFFIX}": values
+            for category, values in (multipliers or {}).items()
+        },
+        "debt_balance": debt_balance,
+        "debt_interest_rate": debt_interest_rate,
+    }
+    rows = itertools.product(
+        *([np.nan if v is None else v for v in values] for values in columns.values())
+    )
+    return pd.DataFrame(list(rows), columns=list(columns), dtype=float)
+
+
+def evaluate_scenarios(aggregates, scenarios, months=None):
+    """Evaluate every scenario on every month in one batched array computation.
+
+    Scaled category spending is summed into budget buckets with a single
+    einsum over (scenario, month, category), then statuses, risks and the
+    debt payoff are computed on the resulting (scenario, month) arrays;
+    risks and debt use the signed net savings/debt total.
+    scenarios is a scenario_grid-style DataFrame (missing columns keep the
+    defaults); months restricts the evaluation to some "YYYY-MM" months.
+    Returns one row per scenario and month with the bucket amounts,
+    budget statuses, risks and debt payoff months and interest.
+    """
+    categories = aggregates["categories"]
+    select = np.arange(len(aggregates["months"]))
+    if months is not None:
+        select = np.flatnonzero(np.isin(aggregates["months"], list(months)))
+    spend = aggregates["spend"][select]
+    net = aggregates["net"][select]
+    count = len(scenarios)
+
+    def column(name, default):
+        if name not in scenarios.columns:
+            return np.full(count, default, dtype=float)
+        return scenarios[name].to_numpy(dtype=float)
+
+    unknown = [
+        name[: -len(MULTIPLIER_SUFFIX)]
+        for name in scenarios.columns
+        if name.endswith(MULTIPLIER_SUFFIX)
+        and name[: -len(MULTIPLIER_SUFFIX)] not in categories
+    ]
+    if unknown:
+        raise ValueError(f"Unknown categories in scenarios: {', '.join(unknown)}")
+    multiplier = np.column_stack(
+        [column(f"{category}{MULTIPLIER_SUFFIX}", 1.0) for category in categories]
+    ).reshape(count, len(categories))
+    in_bucket = np.array(
+        [
+            [BUDGET_BUCKETS.get(category) == b for b in BUCKETS]
+            for category in categories
+        ],
+        dtype=float,
+    ).reshape(len(categories), len(BUCKETS))
+    totals = np.einsum("mc,sc,cb->smb", spend, multiplier, in_bucket)
+    needs, wants, savings_debt = totals[..., 0], totals[..., 1], totals[..., 2]
+    # Risks and debt use the signed savings/debt total, so income and
+    # refunds booked as "Other" count against it as in the analysis
+    net_savings_debt = np.einsum("mc,sc,c->sm", net, multiplier, in_bucket[:, 2])
+
+    # The default goal is 20% of the first month's income, selected or not
+    scenario_income = column("income", np.nan)[:, None]
+    income = np.where(
+        np.isnan(scenario_income), aggregates["income"], scenario_income
+    ).reshape(count, len(aggregates["months"]))
+    goal = column("savings_goal", np.nan)
+    first_income = income[:, 0] if income.shape[1] else np.zeros(count)
+    goal = np.where(np.isnan(goal), first_income * 0.20, goal)[:, None]
+    income = income[:, select]
+    has_income = income > 0
+    needs_pct, wants_pct = (
+        np.divide(amount, income, out=np.zeros_like(income), where=has_income) * 100
+        for amount in (needs, wants)
+    )
+    risks = np.where(
+        (wants > income * 0.30) | (net_savings_debt < income * 0.20), "High", "Low"
+    )
+    debt_months, debt_interest = payoff(
+        column("debt_balance", DEBT_BALANCE)[:, None],
+        column("debt_interest_rate", DEBT_INTEREST_RATE)[:, None],
+        np.maximum(income * 0.20 - net_savings_debt, 0),
+    )
+    shape = income.shape
+    return pd.DataFrame(
+        {
+            "scenario": np.repeat(scenarios.index.to_numpy(), shape[1]),
+            "month": np.tile(np.asarray(aggregates["months"])[select], count),
+            "income": income.ravel(),
+            "needs": needs.ravel(),
+            "wants": wants.ravel(),
+            "savings_debt": savings_debt.ravel(),
+            "needs_status": bucket_statuses(needs_pct, 50.0).ravel(),
+            "wants_status": bucket_statuses(wants_pct, 30.0).ravel(),
+            "savings_status": bucket_statuses(
+                savings_debt, np.broadcast_to(goal, shape)
+            ).ravel(),
+            "risks": risks.ravel(),
+            "debt_months": np.broadcast_to(debt_months, shape).ravel(),
+            "debt_interest": np.broadcast_to(debt_interest, shape).ravel(),
+        }
+    )
+
+
+def summarize_scenarios(scenarios, outcomes):
+    """Count each scenario's high-risk and over/under-budget months.
+
+    Returns scenarios with high_risk_months, wants_over_months,
+    savings_under_months and the longest debt_months added.
+    """
+    flags = pd.DataFrame(
+        {
+            "scenario": outcomes["scenario"],
+            "high_risk_months": outcomes["risks"] == "High",
+            "wants_over_months": outcomes["wants_status"] == "Over",
+            "savings_under_months": outcomes["savings_status"] == "Under",
+            "debt_months": outcomes["debt_months"],
+        }
+    )
+    summary = flags.groupby("scenario").agg(
+        high_risk_months=("high_risk_months", "sum"),
+        wants_over_months=("wants_over_months", "sum"),
+        savings_under_months=("savings_under_months", "sum"),
+        debt_months=("debt_months", "max"),
+    )
+    return scenarios.join(summary)
@@ -0,0 +1,145 @@
+# src/spending_cube.py
+import pandas as pd
+
+# Per (month, category) cell: positive spend, its count, net amount, all rows
+FIELDS = ["spend", "count", "net", "n"]
+
+
+class SpendingCube:
+    """Month x category aggregates of transactions for O(categories) lookups.
+
+    cells maps "YYYY-MM" to {category: [spend, count, net, n]}, where spend
+    and count only cover positive amounts, like the Spending Analysis panel.
+    merchants maps "YYYY-MM" to {merchant_name: [spend, count]} for the same
+    positive amounts. The cube is built once per load with a single groupby
+    per dimension and then updated with just the newly appended transactions.
+    """
+
+    def __init__(self):
+        self.cells = {}
+        self.merchants = {}
+        self.txn_ids = set()  # dashboard txnIds already counted
+
+    @classmethod
+    def from_frame(cls, df):
+        cube = cls()
+        cube.add_frame(df)
+        return cube
+
+    def add_frame(self, df):
+        """Add the transactions in df (date, amount, category columns) in place."""
+        if df.empty:
+            return
+        if "txnId" in df.columns:
+            df = df[~df["txnId"].isin(self.txn_ids)]
+            self.txn_ids.update(df["txnId"].dropna())
+        amount = df["amount"].astype("float64")
+        positive = amount > 0
+        periods = df["date"].dt.to_period("M")
+        grouped = (
+            pd.DataFrame(
+                {
+                    "month": periods,
+                    "category": df["category"],
+                    "spend": amount.where(positive, 0.0),
+                    "count": positive.astype("int64"),
+                    "net": amount,
+                    "n": 1,
+                }
+            )
+            .groupby(["month", "category"], sort=False, observed=True)
+            .sum()
+        )
+        for (month, category), values in zip(grouped.index, grouped.to_numpy()):
+            cell = self.cells.setdefault(str(month), {}).setdefault(
+                category, [0.0, 0, 0.0, 0]
+            )
+            for i, value in enumerate(values):
+                cell[i] += value.item()
+        if "merchant_name" not in df.columns:
+            return
+        by_merchant = (
+            pd.DataFrame(
+                {
+                    "month": periods[positive],
+                    "merchant": df["merchant_name"][positive],
+                    "spend": amount[positive],
+                    "count": 1,
+                }
+            )
+            .groupby(["month", "merchant"], sort=False, observed=True)
+            .sum()
+        )
+        for (month, merchant), values in zip(by_merchant.index, by_merchant.to_numpy()):
+            cell = self.merchants.setdefault(str(month), {}).setdefault(
+                merchant, [0.0, 0]
+            )
+            cell[0] += values[0].item()
+            cell[1] += values[1].item()
+
+    def with_frame(self, df):
+        """Return a copy of the cube with the transactions in df added.
+
+        Only the months df touches are copied; the others are shared with
+        this cube, which is left unchanged.
+        """
+        touched = set(df["date"].dt.to_period("M").dropna().astype(str))
+        cube = SpendingCube()
+        cube.cells = {
+            month: (
+                {category: list(cell) for category, cell in categories.items()}
+                if month in touched
+                else categories
+            )
+            for month, categories in self.cells.items()
+        }
+        cube.merchants = {
+            month: (
+                {merchant: list(cell) for merchant, cell in merchants.items()}
+                if month in touched
+                else merchants
+            )
+            for month, merchants in self.merchants.items()
+        }
+        cube.txn_ids = set(self.txn_ids)
+        cube.add_frame(df)
+        return cube
+
+    def months(self):
+        """Return the months with transactions in ascending order."""
+        return sorted(self.cells)
+
+    def cell(self, month, category):
+        """Return {spend, count, net, n} for one month and category."""
+        values = self.cells.get(month, {}).get(category, [0.0, 0, 0.0, 0])
+        return dict(zip(FIELDS, values))
+
+    def spending(self, month):
+        """Return {category: positive spend} for month, sorted by category."""
+        return {
+            category: cell[0]
+            for category, cell in sorted(self.cells.get(month, {}).items())
+            if cell[1] > 0
+        }
+
+    def categories(self):
+        """Return every category with transactions, sorted."""
+        return sorted({c for categories in self.cells.values() for c in categories})
+
+    def total(self, months, category=None):
+        """Return {spend, count, net, n} summed over months, for one or all categories."""
+        totals = [0.0, 0, 0.0, 0]
+        for month in months:
+            for name, cell in self.cells.get(month, {}).items():
+                if category is None or name == category:
+                    for i, value in enumerate(cell):
+                        totals[i] += value
+        return dict(zip(FIELDS, totals))
+
+    def top_merchants(self, months, n=5):
+        """Return [(merchant, spend)] for the n biggest merchants over months."""
+        spend = {}
+        for month in months:
+            for merchant, cell in self.merchants.get(month, {}).items():
+                spend[merchant] = spend.get(merchant, 0.0) + cell[0]
+        return sorted(spend.items(), key=lambda item: (-item[1], item[0]))[:n]
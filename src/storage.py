@@ -0,0 +1,109 @@
+# src/storage.py
+import os
+import pandas as pd
+
+# Columns stored as pandas categoricals (dictionary-encoded in Parquet)
+CATEGORICAL_COLUMNS = ["category", "account_id", "user_id"]
+
+
+def to_storage_types(df):
+    """Cast cleaned transactions to the typed columns used by the storage layer."""
+    df = df.copy()
+    if "date" in df.columns:
+        df["date"] = pd.to_datetime(df["date"])
+    if "amount" in df.columns:
+        df["amount"] = df["amount"].astype("float64")
+    for col in CATEGORICAL_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype("category")
+    return df
+
+
+def save_json(df, path):
+    """Write records as indented JSON with ISO dates (the export format)."""
+    df.to_json(path, orient="records", indent=2, date_format="iso")
+
+
+def load_json(path, columns=None):
+    """Read a JSON records file, keeping only the requested columns."""
+    df = pd.read_json(path)
+    if columns is not None:
+        df = df[[col for col in columns if col in df.columns]]
+    if "date" in df.columns:
+        df["date"] = pd.to_datetime(df["date"])
+    return df
+
+
+def save_parquet(df, path):
+    """Write a typed, zstd-compressed Parquet file."""
+    to_storage_types(df).to_parquet(path, index=False, compression="zstd")
+
+
+def load_parquet(path, columns=None):
+    """Read a Parquet file, decoding only the requested columns it has."""
+    if columns is not None:
+        import pyarrow.parquet as pq
+
+        available = set(pq.read_schema(path).names)
+        columns = [col for col in columns if col in available]
+    return pd.read_parquet(path, columns=columns)
+
+
+def save_arrow(df, path):
+    """Write a typed, uncompressed Arrow IPC file for handing data between processes."""
+    import pyarrow as pa
+
+    table = pa.Table.from_pandas(to_storage_types(df), preserve_index=False)
+    with pa.OSFile(path, "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+
+def read_arrow_table(path, columns=None):
+    """Memory-map an Arrow IPC file as a pyarrow Table without copying its buffers."""
+    import pyarrow as pa
+
+    with pa.memory_map(path) as source:
+        table = pa.ipc.open_file(source).read_all()
+    if columns is not None:
+        table = table.select([col for col in columns if col in table.column_names])
+    return table
+
+
+def load_arrow(path, columns=None):
+    """Read an Arrow IPC file, decoding only the requested columns it has."""
+    return read_arrow_table(path, columns).to_pandas()
+
+
+# Storage backends by file extension: (loader, saver)
+BACKENDS = {
+    ".json": (load_json, save_json),
+    ".parquet": (load_parquet, save_parquet),
+    ".arrow": (load_arrow, save_arrow),
+}
+
+
+def register_backend(extension, loader, saver):
+    """Register a loader/saver pair for files ending in extension."""
+    BACKENDS[extension] = (loader, saver)
+
+
+def get_backend(path):
+    """Return the (loader, saver) pair for path based on its extension."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in BACKENDS:
+        raise ValueError(f"No storage backend registered for '{extension}' files")
+    return BACKENDS[extension]
+
+
+def save_transactions(df, path):
+    """Save cleaned transactions using the backend matching path."""
+    _, saver = get_backend(path)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    saver(df, path)
+
+
+def load_transactions(path, columns=None):
+    """Load cleaned transactions, optionally projecting to a subset of columns."""
+    loader, _ = get_backend(path)
+    return loader(path, columns=columns)
@@ -0,0 +1,176 @@
+# src/sync_orchestrator.py
+import argparse
+import os
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import closing
+import pandas as pd
+from src.clean_transactions import clean_frame, clean_transactions
+from src.db import DB_PATH, connect
+from src.plaid_sync import (
+    apply_updates,
+    build_sync_request,
+    fetch_updates,
+    init_sync_schema,
+    item_key,
+    load_cursor,
+    load_synced_transactions,
+    plaid_error_field,
+)
+from src.storage import save_transactions
+
+CLEANED_PATH = "data/transactions_cleaned.parquet"
+# Columns of a synced transaction, for the empty store once none are left
+SYNCED_COLUMNS = [
+    "transaction_id",
+    "date",
+    "merchant_name",
+    "name",
+    "amount",
+    "personal_finance_category",
+    "account_id",
+]
+RATE_LIMIT_STATUS = 429
+RATE_LIMIT_ERROR_TYPE = "RATE_LIMIT_EXCEEDED"
+
+
+def is_rate_limited(error):
+    """Return True if a Plaid API error asks us to slow down."""
+    return (
+        getattr(error, "status", None) == RATE_LIMIT_STATUS
+        or plaid_error_field(error, "error_type") == RATE_LIMIT_ERROR_TYPE
+    )
+
+
+class RetryingClient:
+    """Wrap a Plaid client so rate-limited transactions_sync calls are retried.
+
+    Delays grow exponentially from base_delay up to max_delay with full
+    jitter, so items that were throttled together do not retry in lockstep.
+    """
+
+    def __init__(
+        self, client, max_retries=5, base_delay=0.5, max_delay=30.0, sleep=time.sleep
+    ):
+        self.client = client
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.sleep = sleep
+        self.retries = 0
+
+    def transactions_sync(self, request):
+        for attempt in range(self.max_retries + 1):
+            try:
+                return self.client.transactions_sync(request)
+            except Exception as e:
+                if not is_rate_limited(e) or attempt == self.max_retries:
+                    raise
+                delay = random.uniform(
+                    0, min(self.max_delay, self.base_delay * 2**attempt)
+                )
+                print(f"Rate limited by Plaid; retrying in {delay:.2f}s")
+                self.retries += 1
+                self.sleep(delay)
+
+
+def sync_items(
+    client,
+    access_tokens,
+    db_path=DB_PATH,
+    conn=None,
+    max_workers=4,
+    cleaned_path=CLEANED_PATH,
+    request_factory=build_sync_request,
+    max_retries=5,
+    base_delay=0.5,
+    sleep=time.sleep,
+):
+    """Sync several Plaid items concurrently and merge them into the cleaned store.
+
+    Each item's /transactions/sync pagination runs on a bounded thread pool,
+    since the work is almost entirely network wait. Finished fetches are
+    applied one at a time on this thread's SQLite connection, so every item's
+    data and cursor still land in a single transaction. A failing item is
+    reported in its summary without affecting the others. If anything was
+    synced and cleaned_path is set, all synced transactions are recleaned to it.
+    """
+    if conn is None:
+        with closing(connect(db_path)) as own_conn:
+            return sync_items(
+                client,
+                access_tokens,
+                conn=own_conn,
+                max_workers=max_workers,
+                cleaned_path=cleaned_path,
+                request_factory=request_factory,
+                max_retries=max_retries,
+                base_delay=base_delay,
+                sleep=sleep,
+            )
+    init_sync_schema(conn)
+    tokens = {item_key(token): token for token in access_tokens}
+    if not tokens:
+        return []
+    summaries = {}
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(tokens))) as pool:
+        futures = {}
+        for item_id, token in tokens.items():
+            retrying = RetryingClient(
+                client, max_retries=max_retries, base_delay=base_delay, sleep=sleep
+            )
+            future = pool.submit(
+                fetch_updates,
+                retrying,
+                token,
+                load_cursor(conn, item_id),
+                request_factory,
+            )
+            futures[future] = (item_id, retrying)
+        for future in as_completed(futures):
+            item_id, retrying = futures[future]
+            try:
+                updates = future.result()
+                apply_updates(conn, item_id, updates)
+                summaries[item_id] = {
+                    "item_id": item_id,
+                    "added": len(updates["added"]),
+                    "modified": len(updates["modified"]),
+                    "removed": len(updates["removed"]),
+                    "retries": retrying.retries,
+                }
+                print(f"Synced item {item_id}: {summaries[item_id]}")
+            except Exception as e:
+                print(f"Error syncing item {item_id}: {e}")
+                summaries[item_id] = {"item_id": item_id, "error": str(e)}
+
+    if cleaned_path and any("error" not in s for s in summaries.values()):
+        synced = load_synced_transactions(conn=conn)
+        if synced:
+            clean_transactions(synced, cleaned_path)
+        else:
+            # Everything was removed upstream; clean_transactions writes
+            # nothing for no transactions, which would keep the old store
+            save_transactions(
+                clean_frame(pd.DataFrame(columns=SYNCED_COLUMNS)), cleaned_path
+            )
+            print(f"No synced transactions left; emptied {cleaned_path}")
+    return [summaries[item_id] for item_id in tokens]
+
+
+if __name__ == "__main__":
+    from src_old.plaid_client import initialize_plaid_client
+
+    parser = argparse.ArgumentParser(
+        description="Sync every Plaid item in PLAID_ACCESS_TOKENS concurrently."
+    )
+    parser.add_argument("--workers", type=int, default=4, help="maximum parallel items")
+    args = parser.parse_args()
+    client = initialize_plaid_client()  # also loads .env
+    access_tokens = [
+        token.strip()
+        for token in os.getenv("PLAID_ACCESS_TOKENS", "").split(",")
+        if token.strip()
+    ]
+    sync_items(client, access_tokens, max_workers=args.workers)
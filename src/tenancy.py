@@ -0,0 +1,58 @@
+# src/tenancy.py
+import re
+import pandas as pd
+
+# user_id of single-user runs and of data stored before user_id existed
+DEFAULT_USER = "default"
+MONTH_KEY_RE = re.compile(r"^\d{4}-\d{2}$")
+
+
+def user_ids(df, by_user=True):
+    """Return each row's user_id, or DEFAULT_USER unless by_user and present."""
+    if by_user and "user_id" in df.columns:
+        return df["user_id"].astype(object).fillna(DEFAULT_USER)
+    return pd.Series(DEFAULT_USER, index=df.index, dtype=object)
+
+
+def select_months(users, periods, months):
+    """Mask rows in the listed months.
+
+    months holds "YYYY-MM" strings, which select that month for every user,
+    and/or (user_id, "YYYY-MM") pairs, which select one user's month.
+    """
+    plain = [month for month in months if isinstance(month, str)]
+    pairs = [tuple(month) for month in months if not isinstance(month, str)]
+    mask = periods.isin(pd.PeriodIndex(plain, freq="M"))
+    if pairs:
+        keys = pd.MultiIndex.from_arrays([users, periods.dt.strftime("%Y-%m")])
+        mask |= keys.isin(pairs)
+    return mask
+
+
+def nest_by_user(items):
+    """Turn {(user_id, month): value} into {user_id: {month: value}}."""
+    nested = {}
+    for (user, month), value in items.items():
+        nested.setdefault(user, {})[month] = value
+    return nested
+
+
+def is_by_user(reports):
+    """Tell saved {user_id: {month: value}} from {month: value} by its keys."""
+    return any(not MONTH_KEY_RE.match(key) for key in reports)
+
+
+def primary_user(reports):
+    """Return the user single-user views show: DEFAULT_USER, else the first."""
+    return DEFAULT_USER if DEFAULT_USER in reports or not reports else min(reports)
+
+
+def user_reports(reports, user=None):
+    """Return one user's {month: value} from either form of saved reports.
+
+    Reports written with by_user are nested by user_id; user defaults to
+    primary_user. Single-user reports are returned as they are.
+    """
+    if not reports or not is_by_user(reports):
+        return reports
+    return reports.get(primary_user(reports) if user is None else user, {})
@@ -3,31 +3,22 @@ import sqlite3
 import os
 from datetime import datetime
 import math
+from src.debt import balance_after, payoff
 
 
 def calculate_debt_payoff(balance, interest_rate, minimum_payment, extra_payment=0):
-    """Simulate debt payoff timeline and interest for a single debt."""
-    monthly_rate = interest_rate / 12 / 100
-    months = 0
-    total_interest = 0
-    current_balance = balance
-
+    """Compute the debt payoff timeline and interest for a single debt."""
     print(
         f"Debt Payoff Inputs: Balance=${balance:.2f}, Interest Rate={interest_rate:.1f}%, Minimum Payment=${minimum_payment:.2f}, Extra Payment=${extra_payment:.2f}"
     )
-
-    while current_balance > 0 and months < 1000:  # Prevent infinite loop
-        interest = current_balance * monthly_rate
-        payment = min(minimum_payment + extra_payment, current_balance + interest)
-        principal = payment - interest
-        current_balance -= principal
-        total_interest += interest
-        months += 1
-
-        if current_balance < 0:
-            current_balance = 0
-
-    return months, total_interest
+    payment = minimum_payment + extra_payment
+    months, total_interest = payoff(balance, interest_rate, payment)
+    if not months <= 1000:  # Not repaid within 1000 months: report those
+        months = 1000
+        total_interest = payment * months - (
+            balance - balance_after(balance, interest_rate, payment, months)
+        )
+    return int(months), float(total_interest)
 
 
 def analyze_spending(
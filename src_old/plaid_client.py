@@ -8,8 +8,8 @@ from plaid.model.sandbox_public_token_create_request import (
 from plaid.model.item_public_token_exchange_request import (
     ItemPublicTokenExchangeRequest,
 )
-from plaid.model.transactions_sync_request import TransactionsSyncRequest
 from dotenv import load_dotenv
+from src.plaid_sync import fetch_updates
 
 
 def initialize_plaid_client():
@@ -52,11 +52,9 @@ def exchange_public_token(client, public_token):
         raise Exception(f"Error exchanging public token: {e}")
 
 
-def sync_transactions(client, access_token):
-    """Fetch the first batch of transactions using the sync endpoint."""
+def sync_transactions(client, access_token, cursor=None):
+    """Fetch every page of added transactions since cursor using the sync endpoint."""
     try:
-        request = TransactionsSyncRequest(access_token=access_token)
-        response = client.transactions_sync(request)
-        return response["added"]
+        return fetch_updates(client, access_token, cursor)["added"]
     except Exception as e:
         raise Exception(f"Error syncing transactions: {e}")
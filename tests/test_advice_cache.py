@@ -0,0 +1,156 @@
+import unittest
+from unittest.mock import patch
+import os
+import tempfile
+from contextlib import closing
+from src.advice_cache import (
+    LOOKUP_CHUNK_SIZE,
+    advice_key,
+    get_cached_advice,
+    init_advice_cache,
+    put_cached_advice,
+)
+from src.advisor import GENERATION_PARAMS, MODEL_ENV, get_advice, get_advice_for_months
+from src.db import connect, init_schema, save_monthly_reports
+from tests.test_advisor import BatchStubPipeline
+
+SPENDING = {"Needs": 1600.0, "Wants": 1200.0, "Savings/Debt": 800.0}
+
+
+def report_row(month, needs=1600.0, risks="Low"):
+    return (month, 4000.0, needs, 1200.0, 800.0, 3600.0, 30.0, risks, "")
+
+
+class TestAdviceKey(unittest.TestCase):
+    def test_key_covers_inputs_and_parameters(self):
+        """Test any change to the prompt inputs or parameters changes the key."""
+        base = advice_key(SPENDING, "Low", "gpt2", GENERATION_PARAMS)
+        self.assertEqual(
+            base, advice_key(dict(SPENDING), "Low", "gpt2", dict(GENERATION_PARAMS))
+        )
+        variants = [
+            advice_key({**SPENDING, "Wants": 1201.0}, "Low", "gpt2", GENERATION_PARAMS),
+            advice_key(SPENDING, "High", "gpt2", GENERATION_PARAMS),
+            advice_key(SPENDING, "Low", "distilgpt2", GENERATION_PARAMS),
+            advice_key(
+                SPENDING, "Low", "gpt2", {**GENERATION_PARAMS, "temperature": 0.9}
+            ),
+            advice_key(SPENDING, "Low", "gpt2", {**GENERATION_PARAMS, "seed": 1}),
+        ]
+        self.assertEqual(len({base, *variants}), 6)
+
+
+class TestAdviceCache(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmpdir.name, "finagent.db")
+        with closing(connect(self.db_path)) as conn:
+            init_schema(conn)
+            save_monthly_reports(
+                conn, [report_row("2025-05"), report_row("2025-06", needs=900.0)]
+            )
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_unchanged_report_is_served_from_cache(self):
+        """Test repeated views of a month generate advice only once."""
+        stub = BatchStubPipeline()
+        first = get_advice("2025-06", db_path=self.db_path, advisor=stub)
+        second = get_advice("2025-06", db_path=self.db_path, advisor=stub)
+        self.assertEqual(first, second)
+        self.assertEqual(len(stub.calls), 1)
+
+    def test_changed_report_or_model_misses(self):
+        """Test a new report row or another model id regenerates advice."""
+        stub = BatchStubPipeline()
+        get_advice("2025-06", db_path=self.db_path, advisor=stub)
+        with closing(connect(self.db_path)) as conn:
+            save_monthly_reports(conn, [report_row("2025-06", needs=950.0)])
+        self.assertIn(
+            "Needs=950.0", get_advice("2025-06", db_path=self.db_path, advisor=stub)
+        )
+        other = BatchStubPipeline("distilgpt2")
+        get_advice("2025-06", db_path=self.db_path, advisor=other)
+        self.assertEqual((len(stub.calls), len(other.calls)), (2, 1))
+
+    def test_key_uses_the_given_advisors_model(self):
+        """Test an explicit advisor is keyed on its own model, not the configured one."""
+        stub = BatchStubPipeline("tiny")
+        get_advice("2025-06", db_path=self.db_path, advisor=stub)
+        with patch.dict(os.environ, {MODEL_ENV: "distilgpt2"}):
+            get_advice("2025-06", db_path=self.db_path, advisor=stub)
+            # The configured model's own advice is not the stub's
+            with closing(connect(self.db_path)) as conn:
+                self.assertEqual(
+                    get_cached_advice(
+                        conn,
+                        [
+                            advice_key(
+                                {
+                                    "Needs": 900.0,
+                                    "Wants": 1200.0,
+                                    "Savings/Debt": 800.0,
+                                },
+                                "Low",
+                                "distilgpt2",
+                                {**GENERATION_PARAMS, "seed": None},
+                            )
+                        ],
+                    ),
+                    {},
+                )
+        self.assertEqual(len(stub.calls), 1)
+
+    def test_advisor_of_unknown_model_is_not_cached(self):
+        """Test advice from an advisor whose model cannot be told is never cached."""
+        stub = BatchStubPipeline()
+        del stub.model
+        for _ in range(2):
+            get_advice("2025-06", db_path=self.db_path, advisor=stub)
+        self.assertEqual(len(stub.calls), 2)
+
+    def test_large_lookups_are_chunked(self):
+        """Test lookups of more keys than SQLite binds at once still find them all."""
+        keys = [f"key{i}" for i in range(LOOKUP_CHUNK_SIZE * 2 + 1)]
+        with closing(connect(self.db_path)) as conn:
+            init_advice_cache(conn)
+            put_cached_advice(conn, {key: key.upper() for key in keys}, "gpt2")
+            with patch("src.advice_cache.LOOKUP_CHUNK_SIZE", 7):
+                found = get_cached_advice(conn, keys + ["missing"])
+            self.assertEqual(found, {key: key.upper() for key in keys})
+
+    def test_cache_disabled(self):
+        """Test cache=False always generates."""
+        stub = BatchStubPipeline()
+        for _ in range(2):
+            get_advice("2025-06", db_path=self.db_path, advisor=stub, cache=False)
+        self.assertEqual(len(stub.calls), 2)
+
+    def test_batch_only_generates_misses(self):
+        """Test a batched request only sends uncached months to the model."""
+        stub = BatchStubPipeline()
+        get_advice("2025-05", db_path=self.db_path, advisor=stub)
+        advice = get_advice_for_months(db_path=self.db_path, advisor=stub)
+        self.assertEqual(list(advice), ["2025-05", "2025-06"])
+        self.assertIn("Needs=900.0", stub.calls[-1][0])
+        self.assertIn("Needs=900.0", advice["2025-06"])
+        get_advice_for_months(db_path=self.db_path, advisor=stub)
+        self.assertEqual(len(stub.calls), 2)
+
+    def test_least_recently_used_entries_are_evicted(self):
+        """Test the cache keeps only the most recently used max_entries."""
+        with closing(connect(self.db_path)) as conn:
+            init_advice_cache(conn)
+            times = iter(range(100))
+            with patch("src.advice_cache.time.time", lambda: next(times)):
+                put_cached_advice(conn, {"a": "A", "b": "B"}, "gpt2", max_entries=2)
+                get_cached_advice(conn, ["a"])  # b is now least recently used
+                put_cached_advice(conn, {"c": "C"}, "gpt2", max_entries=2)
+            self.assertEqual(
+                get_cached_advice(conn, ["a", "b", "c"]), {"a": "A", "c": "C"}
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,359 @@
+import unittest
+from unittest.mock import patch
+import os
+import queue
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from contextlib import closing
+from types import SimpleNamespace
+from src import advisor as advisor_module
+from src.advisor import (
+    MODEL_ENV,
+    generate_advice_batch,
+    get_advice,
+    get_advice_for_months,
+    get_advisor,
+    get_rule_based_advice,
+    stream_advice,
+    stream_generate,
+    unload_advisor,
+    warm_up,
+    warm_up_in_background,
+)
+from src.db import connect, init_schema, save_monthly_reports
+
+
+class StubPipeline:
+    """Stands in for a transformers text-generation pipeline."""
+
+    def __init__(self, model_id):
+        self.model_id = model_id
+        # A pipeline's model knows the id it was loaded from
+        self.model = SimpleNamespace(name_or_path=model_id)
+        self.calls = []
+
+    def __call__(self, prompt, **kwargs):
+        self.calls.append((prompt, kwargs))
+        return [{"generated_text": f"{prompt} Here is your financial plan. "}]
+
+
+class StubTokenizer:
+    def __init__(self):
+        self.pad_token = None
+        self.pad_token_id = None
+        self.eos_token = "<|endoftext|>"
+        self.padding_side = "right"
+
+
+class BatchStubPipeline(StubPipeline):
+    """Accepts a list of prompts like a pipeline, recording each batch."""
+
+    def __init__(self, model_id="tiny"):
+        super().__init__(model_id)
+        self.tokenizer = StubTokenizer()
+        self.batches = []
+
+    def __call__(self, prompts, batch_size=1, **kwargs):
+        if isinstance(prompts, str):
+            return super().__call__(prompts, **kwargs)
+        self.calls.append((prompts, kwargs))
+        for start in range(0, len(prompts), batch_size):
+            self.batches.append(prompts[start : start + batch_size])
+        return [[{"generated_text": f"{prompt} plan "}] for prompt in prompts]
+
+
+class SlowFactory:
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.loads = []
+
+    def __call__(self, model_id):
+        self.loads.append(model_id)
+        time.sleep(self.delay)
+        return StubPipeline(model_id)
+
+
+class TestAdvisorService(unittest.TestCase):
+    def setUp(self):
+        unload_advisor()
+
+    def tearDown(self):
+        unload_advisor()
+
+    def test_import_does_not_load_transformers(self):
+        """Test importing the advisor is cheap and loads no model."""
+        code = "import sys, src.advisor; print('transformers' in sys.modules)"
+        result = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True
+        )
+        self.assertEqual(result.stdout.strip(), "False")
+
+    def test_concurrent_first_calls_load_once(self):
+        """Test many threads asking at once share a single loaded model."""
+        factory = SlowFactory()
+        results = []
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(get_advisor("tiny", factory))
+            )
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(factory.loads, ["tiny"])
+        self.assertTrue(all(result is results[0] for result in results))
+        self.assertIs(get_advisor("tiny", factory), results[0])
+
+    def test_model_id_from_env(self):
+        """Test the model id comes from the environment when not given."""
+        factory = SlowFactory(delay=0)
+        with patch.dict(os.environ, {MODEL_ENV: "sshleifer/tiny-gpt2"}):
+            self.assertEqual(
+                get_advisor(factory=factory).model_id, "sshleifer/tiny-gpt2"
+            )
+
+    def test_warm_up_loads_and_generates(self):
+        """Test warm_up loads the model and runs one short generation."""
+        factory = SlowFactory(delay=0)
+        self.assertIsNotNone(warm_up("tiny", factory))
+        self.assertEqual(get_advisor("tiny", factory).calls[0][1]["max_new_tokens"], 1)
+
+    def test_warm_up_reports_failure(self):
+        """Test a model that cannot load is reported instead of raised."""
+
+        def broken(model_id):
+            raise OSError("no such model")
+
+        self.assertIsNone(warm_up("missing", broken))
+
+    def test_warm_up_in_background_starts_once(self):
+        """Test repeated warm-up calls (one per dashboard rerun) load the model once."""
+        factory = SlowFactory()
+        threads = [warm_up_in_background("tiny", factory) for _ in range(3)]
+        for thread in threads:
+            thread.join()
+        self.assertTrue(all(thread is threads[0] for thread in threads))
+        self.assertEqual(factory.loads, ["tiny"])
+        self.assertEqual(len(get_advisor("tiny", factory).calls), 1)
+
+    def test_default_paths_do_not_depend_on_working_directory(self):
+        """Test the default data paths resolve from any working directory."""
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            os.chdir(tmpdir)
+            try:
+                self.assertTrue(os.path.isabs(advisor_module.DB_PATH))
+                self.assertIsInstance(get_rule_based_advice(), list)
+            finally:
+                os.chdir(cwd)
+
+    def test_get_advice_uses_shared_advisor(self):
+        """Test get_advice builds the prompt from the stored monthly report."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_path = os.path.join(tmpdir, "finagent.db")
+            with closing(connect(db_path)) as conn:
+                init_schema(conn)
+                save_monthly_reports(
+                    conn,
+                    [
+                        (
+                            "2025-06",
+                            4000.0,
+                            1600.0,
+                            1200.0,
+                            800.0,
+                            3600.0,
+                            30.0,
+                            "Low",
+                            "",
+                        )
+                    ],
+                )
+            stub = StubPipeline("tiny")
+            advice = get_advice("2025-06", db_path=db_path, advisor=stub)
+            self.assertIn("financial plan", advice.lower())
+            self.assertIn("Needs=1600.0", stub.calls[0][0])
+            self.assertEqual(
+                get_advice("2030-01", db_path=db_path, advisor=stub),
+                "No data available for advice.",
+            )
+
+    def test_default_advisor_is_lazy_singleton(self):
+        """Test generate_advice without an advisor uses the shared one."""
+        factory = SlowFactory(delay=0)
+        spending = {"Needs": 1.0, "Wants": 2.0, "Savings/Debt": 3.0}
+        with patch.object(advisor_module, "build_pipeline", factory), patch.dict(
+            os.environ, {MODEL_ENV: "tiny"}
+        ):
+            advisor_module.generate_advice(spending, "Low")
+            advisor_module.generate_advice(spending, "High")
+        self.assertEqual(factory.loads, ["tiny"])
+
+
+class TestBatchAdvice(unittest.TestCase):
+    def test_batches_in_order_with_left_padding(self):
+        """Test prompts go through in batches and results keep input order."""
+        stub = BatchStubPipeline()
+        items = [
+            ({"Needs": float(i), "Wants": 1.0, "Savings/Debt": 2.0}, "Low")
+            for i in range(12)
+        ]
+        advice = generate_advice_batch(items, batch_size=5, advisor=stub)
+        self.assertEqual(len(advice), 12)
+        for i, text in enumerate(advice):
+            self.assertIn(f"Needs={float(i)},", text)
+        self.assertEqual([len(batch) for batch in stub.batches], [5, 5, 2])
+        self.assertEqual(len(stub.calls), 1)
+        self.assertEqual(stub.tokenizer.pad_token, stub.tokenizer.eos_token)
+        self.assertEqual(stub.tokenizer.padding_side, "left")
+
+    def test_empty_batch(self):
+        """Test no items means no generate call."""
+        stub = BatchStubPipeline()
+        self.assertEqual(generate_advice_batch([], advisor=stub), [])
+        self.assertEqual(stub.calls, [])
+
+    def test_advice_for_months(self):
+        """Test a year of stored reports is advised in one batched call."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_path = os.path.join(tmpdir, "finagent.db")
+            rows = [
+                (f"2025-{m:02d}", 4000.0, 100.0 * m, 50.0, 25.0, 0.0, 0.0, "Low", "")
+                for m in range(12, 0, -1)
+            ]
+            with closing(connect(db_path)) as conn:
+                init_schema(conn)
+                save_monthly_reports(conn, rows)
+            stub = BatchStubPipeline()
+            advice = get_advice_for_months(db_path=db_path, advisor=stub)
+            self.assertEqual(list(advice), [f"2025-{m:02d}" for m in range(1, 13)])
+            self.assertIn("Needs=300.0", advice["2025-03"])
+            subset = get_advice_for_months(["2025-02"], db_path=db_path, advisor=stub)
+            self.assertEqual(list(subset), ["2025-02"])
+
+    def test_advice_across_users(self):
+        """Test every user's months are advised together in one batched call."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_path = os.path.join(tmpdir, "finagent.db")
+            rows = [
+                (
+                    user,
+                    f"2025-{m:02d}",
+                    4000.0,
+                    needs * m,
+                    50.0,
+                    25.0,
+                    0.0,
+                    0.0,
+                    "Low",
+                    "",
+                )
+                for user, needs in [("alice", 100.0), ("bob", 7.0), ("carol", 1.0)]
+                for m in range(1, 4)
+            ]
+            with closing(connect(db_path)) as conn:
+                init_schema(conn)
+                save_monthly_reports(conn, rows, user_id=None)
+            stub = BatchStubPipeline()
+            advice = get_advice_for_months(
+                db_path=db_path, advisor=stub, batch_size=4, cache=False, user_id=None
+            )
+            self.assertEqual(list(advice), ["alice", "bob", "carol"])
+            self.assertEqual(list(advice["bob"]), ["2025-01", "2025-02", "2025-03"])
+            self.assertIn("Needs=14.0", advice["bob"]["2025-02"])
+            self.assertIn("Needs=300.0", advice["alice"]["2025-03"])
+            self.assertEqual(len(stub.calls), 1)
+            self.assertEqual([len(batch) for batch in stub.batches], [4, 4, 1])
+
+            some = get_advice_for_months(
+                ["2025-01", ("carol", "2025-03")],
+                db_path=db_path,
+                advisor=stub,
+                cache=False,
+                user_id=["bob", "carol"],
+            )
+            self.assertEqual(
+                {user: list(months) for user, months in some.items()},
+                {"bob": ["2025-01"], "carol": ["2025-01", "2025-03"]},
+            )
+            self.assertEqual(
+                get_advice_for_months(db_path=db_path, advisor=stub, user_id=[]), {}
+            )
+
+
+class QueueStreamer:
+    """Minimal TextIteratorStreamer: the producer puts text, iteration drains it."""
+
+    def __init__(self, tokenizer):
+        self.queue = queue.Queue()
+
+    def put_text(self, text):
+        self.queue.put(text)
+
+    def end(self):
+        self.queue.put(None)
+
+    def __iter__(self):
+        while (text := self.queue.get(timeout=5)) is not None:
+            yield text
+
+
+class StreamingStubPipeline:
+    """Emits one word per delay seconds to the streamer, like model.generate."""
+
+    def __init__(self, words, delay=0.0, fail_after=None):
+        self.tokenizer = StubTokenizer()
+        self.words = words
+        self.delay = delay
+        self.fail_after = fail_after
+
+    def __call__(self, prompt, streamer=None, **kwargs):
+        for i, word in enumerate(self.words):
+            if i == self.fail_after:
+                raise RuntimeError("generation failed")
+            time.sleep(self.delay)
+            streamer.put_text(word)
+        streamer.end()
+        return [{"generated_text": prompt + "".join(self.words)}]
+
+
+class TestStreamingAdvice(unittest.TestCase):
+    def test_first_token_arrives_before_generation_finishes(self):
+        """Test text is yielded while the model is still generating."""
+        stub = StreamingStubPipeline(["Save ", "more ", "each ", "month."], 0.05)
+        start = time.perf_counter()
+        stream = stream_generate("prompt", stub, streamer_factory=QueueStreamer)
+        first = next(stream)
+        time_to_first_token = time.perf_counter() - start
+        rest = list(stream)
+        total = time.perf_counter() - start
+        self.assertEqual(first + "".join(rest), "Save more each month.")
+        self.assertLess(time_to_first_token, total / 2)
+
+    def test_generation_error_is_raised(self):
+        """Test a failure in the generation thread reaches the consumer."""
+        stub = StreamingStubPipeline(["Save ", "more."], fail_after=1)
+        stream = stream_generate("prompt", stub, streamer_factory=QueueStreamer)
+        self.assertEqual(next(stream), "Save ")
+        with self.assertRaises(RuntimeError):
+            list(stream)
+
+    def test_stream_advice_uses_advice_prompt(self):
+        """Test stream_advice streams an answer for the month's spending."""
+        stub = StreamingStubPipeline(["Cut ", "wants."])
+        with patch("src.advisor.text_streamer", QueueStreamer):
+            text = "".join(
+                stream_advice(
+                    {"Needs": 1.0, "Wants": 2.0, "Savings/Debt": 3.0}, "High", stub
+                )
+            )
+        self.assertEqual(text, "Cut wants.")
+
+
+if __name__ == "__main__":
+    unittest.main()
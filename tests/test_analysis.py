@@ -0,0 +1,77 @@
+import unittest
+from unittest.mock import patch
+import os
+import sqlite3
+import tempfile
+import pandas as pd
+from src.analysis import analyze_spending
+from src.db import connect
+from src.storage import save_transactions
+
+
+class TestAnalyzeSpending(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmpdir.name, "finagent.db")
+        self.clean_path = os.path.join(self.tmpdir.name, "transactions_cleaned.json")
+        save_transactions(
+            pd.DataFrame(
+                {
+                    "date": pd.to_datetime(
+                        ["2025-04-02", "2025-04-10", "2025-05-03", "2025-06-07"]
+                    ),
+                    "amount": [100.0, 1500.0, 40.0, 900.0],
+                    "category": ["Food", "Travel", "Other", "Other"],
+                }
+            ),
+            self.clean_path,
+        )
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_reports_saved_with_one_connection(self):
+        """Test all months are written through a single connection."""
+        with patch("src.db.sqlite3.connect", wraps=sqlite3.connect) as mock_connect:
+            reports = analyze_spending(4000.0, self.clean_path, db_path=self.db_path)
+        mock_connect.assert_called_once()
+        self.assertEqual(sorted(reports), ["2025-04", "2025-05", "2025-06"])
+        with sqlite3.connect(self.db_path) as conn:
+            rows = conn.execute(
+                "SELECT month, needs_amount, wants_amount, risks FROM monthly_reports ORDER BY month"
+            ).fetchall()
+        self.assertEqual(
+            rows,
+            [
+                ("2025-04", 100.0, 1500.0, "High"),
+                ("2025-05", 0.0, 0.0, "High"),
+                ("2025-06", 0.0, 0.0, "Low"),
+            ],
+        )
+
+    def test_reuses_given_connection(self):
+        """Test a caller-provided connection is used and left open."""
+        conn = connect(self.db_path)
+        try:
+            with patch("src.db.sqlite3.connect") as mock_connect:
+                analyze_spending(4000.0, self.clean_path, conn=conn)
+            mock_connect.assert_not_called()
+            count = conn.execute("SELECT COUNT(*) FROM monthly_reports").fetchone()[0]
+            self.assertEqual(count, 3)
+        finally:
+            conn.close()
+
+    def test_connection_uses_wal(self):
+        """Test connections enable WAL so readers are not blocked by the writer."""
+        conn = connect(self.db_path)
+        try:
+            mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+            synchronous = conn.execute("PRAGMA synchronous").fetchone()[0]
+        finally:
+            conn.close()
+        self.assertEqual(mode, "wal")
+        self.assertEqual(synchronous, 1)  # NORMAL
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,318 @@
+import unittest
+from unittest.mock import patch
+import os
+import json
+import random
+import tempfile
+import pandas as pd
+from src.budgeting import (
+    apply_50_30_20_rule,
+    estimate_income,
+    estimate_monthly_income,
+    load_raw_transactions,
+    monthly_bucket_totals,
+)
+
+
+def legacy_apply_50_30_20_rule(
+    clean_input_path, estimate_income, default_income=4000.0, custom_savings_goal=None
+):
+    """Reference copy of the original per-month masking loop."""
+    df = pd.read_json(clean_input_path)
+    df["date"] = pd.to_datetime(df["date"], format="%Y-%m-%d")
+    unique_months = df["date"].dt.to_period("M").unique()
+    reports = {}
+    for month in unique_months:
+        month_str = month.strftime("%Y-%m")
+        df_month = df[df["date"].dt.to_period("M") == month]
+        estimated_income = estimate_income("data/transactions.json", month)
+        income = (
+            estimated_income
+            if estimated_income and estimated_income >= 100.0
+            else default_income
+        )
+        income_source = (
+            "estimated"
+            if income == estimated_income and estimated_income >= 100.0
+            else "default"
+        )
+        needs_spending = df_month[
+            df_month["category"].isin(["Bills", "Transportation", "Food"])
+            & (df_month["amount"] > 0)
+        ]["amount"].sum()
+        wants_spending = df_month[
+            df_month["category"].isin(["Shopping", "Entertainment", "Travel"])
+            & (df_month["amount"] > 0)
+        ]["amount"].sum()
+        savings_debt_spending = df_month[
+            df_month["category"].isin(["Other"]) & (df_month["amount"] > 0)
+        ]["amount"].sum()
+        needs_percentage = (needs_spending / income) * 100 if income > 0 else 0
+        wants_percentage = (wants_spending / income) * 100 if income > 0 else 0
+        savings_debt_percentage = (
+            (savings_debt_spending / income) * 100 if income > 0 else 0
+        )
+
+        def get_status(actual, target):
+            if actual > target:
+                return "Over"
+            elif actual < target:
+                return "Under"
+            return "Meets"
+
+        if custom_savings_goal is None:
+            custom_savings_goal = income * 0.20
+        reports[month_str] = {
+            "month": month_str,
+            "income": income,
+            "income_source": income_source,
+            "estimated_income": estimated_income or 0.0,
+            "needs": {
+                "amount": needs_spending,
+                "percentage": needs_percentage,
+                "target_percentage": 50.0,
+                "status": get_status(needs_percentage, 50.0),
+            },
+            "wants": {
+                "amount": wants_spending,
+                "percentage": wants_percentage,
+                "target_percentage": 30.0,
+                "status": get_status(wants_percentage, 30.0),
+            },
+            "savings_debt": {
+                "amount": savings_debt_spending,
+                "percentage": savings_debt_percentage,
+                "target_percentage": 20.0,
+                "status": get_status(savings_debt_spending, custom_savings_goal),
+                "custom_goal": custom_savings_goal,
+            },
+        }
+    return reports
+
+
+def fake_estimate_income(raw_input_path, month):
+    """Deterministic per-month income covering estimated, too-low and missing cases."""
+    if month.month % 3 == 0:
+        return None
+    if month.month % 3 == 1:
+        return 50.0
+    return 3000.0 + month.month * 10
+
+
+# Batch equivalent of fake_estimate_income for every month in the fixtures
+FAKE_MONTHLY_INCOME = {
+    month: fake_estimate_income(None, month)
+    for month in pd.period_range("2024-01", "2025-12", freq="M")
+    if fake_estimate_income(None, month) is not None
+}
+
+
+class TestBudgetEngine(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.output_path = os.path.join(self.tmpdir.name, "budget_report.json")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def write_cleaned(self, records):
+        path = os.path.join(self.tmpdir.name, "transactions_cleaned.json")
+        with open(path, "w") as f:
+            json.dump(records, f)
+        return path
+
+    def assertReportsEqual(self, actual, expected):
+        self.assertEqual(list(actual.keys()), list(expected.keys()))
+        for month, report in expected.items():
+            for key, value in report.items():
+                if isinstance(value, dict):
+                    for field, field_value in value.items():
+                        if isinstance(field_value, str):
+                            self.assertEqual(actual[month][key][field], field_value)
+                        else:
+                            self.assertAlmostEqual(
+                                actual[month][key][field], field_value, places=9
+                            )
+                elif isinstance(value, str):
+                    self.assertEqual(actual[month][key], value)
+                else:
+                    self.assertAlmostEqual(actual[month][key], value, places=9)
+
+    def test_matches_legacy_loop(self):
+        """Test the groupby engine reproduces the per-month loop on mixed data."""
+        records = [
+            {"date": "2025-03-02", "amount": 120.5, "category": "Food"},
+            {"date": "2025-03-15", "amount": 80.0, "category": "Travel"},
+            {"date": "2025-03-20", "amount": -40.0, "category": "Shopping"},
+            {"date": "2025-03-28", "amount": 900.0, "category": "Other"},
+            {"date": "2024-12-01", "amount": 60.0, "category": "Bills"},
+            {"date": "2024-12-09", "amount": 10.0, "category": "Uncategorized"},
+            {"date": "2025-01-05", "amount": 15.0, "category": "Uncategorized"},
+            {"date": "2025-02-11", "amount": 300.0, "category": "Entertainment"},
+            {"date": "2025-02-12", "amount": 45.25, "category": "Transportation"},
+            {"date": "2025-03-30", "amount": 5.0, "category": "Bills"},
+        ]
+        path = self.write_cleaned(records)
+        with patch(
+            "src.budgeting.estimate_monthly_income", return_value=FAKE_MONTHLY_INCOME
+        ):
+            actual = apply_50_30_20_rule(path, self.output_path)
+        expected = legacy_apply_50_30_20_rule(path, fake_estimate_income)
+        self.assertReportsEqual(actual, expected)
+        with open(self.output_path) as f:
+            self.assertReportsEqual(json.load(f), expected)
+
+    def test_matches_legacy_loop_on_random_history(self):
+        """Test the groupby engine reproduces the per-month loop over two years."""
+        rng = random.Random(42)
+        categories = ["Food", "Bills", "Travel", "Shopping", "Other", "Uncategorized"]
+        records = [
+            {
+                "date": f"{rng.choice([2024, 2025])}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+                "amount": round(rng.uniform(-50.0, 400.0), 2),
+                "category": rng.choice(categories),
+            }
+            for _ in range(2000)
+        ]
+        path = self.write_cleaned(records)
+        with patch(
+            "src.budgeting.estimate_monthly_income", return_value=FAKE_MONTHLY_INCOME
+        ):
+            actual = apply_50_30_20_rule(path, self.output_path)
+        expected = legacy_apply_50_30_20_rule(path, fake_estimate_income)
+        self.assertEqual(len(expected), 24)
+        self.assertReportsEqual(actual, expected)
+
+    def test_custom_savings_goal(self):
+        """Test an explicit savings goal is applied to every month."""
+        path = self.write_cleaned(
+            [
+                {"date": "2025-05-03", "amount": 500.0, "category": "Other"},
+                {"date": "2025-06-03", "amount": 700.0, "category": "Other"},
+            ]
+        )
+        with patch("src.budgeting.estimate_monthly_income", return_value={}):
+            reports = apply_50_30_20_rule(
+                path, self.output_path, custom_savings_goal=600.0
+            )
+        self.assertEqual(reports["2025-05"]["savings_debt"]["status"], "Under")
+        self.assertEqual(reports["2025-06"]["savings_debt"]["status"], "Over")
+
+    def test_month_without_budget_spending(self):
+        """Test months with no bucketed spending still get zero totals."""
+        df = pd.DataFrame(
+            {
+                "date": pd.to_datetime(["2025-01-05", "2025-02-05"]),
+                "amount": [20.0, -5.0],
+                "category": ["Uncategorized", "Food"],
+            }
+        )
+        totals = monthly_bucket_totals(df)
+        self.assertEqual([str(month) for month in totals.index], ["2025-01", "2025-02"])
+        self.assertEqual(totals.to_numpy().sum(), 0.0)
+
+
+class TestIncomeEstimation(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.raw_path = os.path.join(self.tmpdir.name, "transactions.json")
+        records = [
+            {
+                "date": "2025-05-01",
+                "amount": -2000.0,
+                "merchant_name": "ACME Payroll",
+                "name": "Salary",
+                "personal_finance_category": {"primary": "TRANSFER"},
+            },
+            {
+                "date": "2025-05-15",
+                "amount": -1500.0,
+                "merchant_name": None,
+                "name": "Transfer",
+                "personal_finance_category": {"primary": "INCOME"},
+            },
+            {
+                "date": "2025-05-20",
+                "amount": 80.0,
+                "merchant_name": "Store",
+                "name": "Groceries",
+                "personal_finance_category": {"primary": "FOOD_AND_DRINK"},
+            },
+            {
+                "date": "2025-06-01",
+                "amount": -3100.0,
+                "merchant_name": None,
+                "name": "DIRECT DEPOSIT",
+                "personal_finance_category": None,
+            },
+            {
+                "date": "2025-06-03",
+                "amount": -25.0,
+                "merchant_name": "Store",
+                "name": "Refund",
+                "personal_finance_category": {"primary": "SHOPPING"},
+            },
+            {
+                "date": "2025-07-02",
+                "amount": 40.0,
+                "merchant_name": "Store",
+                "name": "Groceries",
+                "personal_finance_category": {"primary": "FOOD_AND_DRINK"},
+            },
+        ]
+        with open(self.raw_path, "w") as f:
+            json.dump(records, f)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_monthly_income_map(self):
+        """Test all months are estimated from a single read of the raw data."""
+        with patch("src.budgeting.pd.read_json", wraps=pd.read_json) as read_json:
+            incomes = estimate_monthly_income(self.raw_path)
+        read_json.assert_called_once()
+        self.assertEqual(
+            incomes,
+            {
+                pd.Period("2025-05", freq="M"): 3500.0,
+                pd.Period("2025-06", freq="M"): 3100.0,
+            },
+        )
+
+    def test_single_month_api(self):
+        """Test estimate_income still answers for one month, a month string or none."""
+        self.assertEqual(
+            estimate_income(self.raw_path, pd.Period("2025-05", freq="M")), 3500.0
+        )
+        self.assertEqual(estimate_income(self.raw_path, "2025-06"), 3100.0)
+        self.assertIsNone(estimate_income(self.raw_path, "2025-07"))
+        self.assertIsNone(estimate_income(self.raw_path))
+
+    def test_budget_reads_raw_data_once(self):
+        """Test the budget report consumes the batch estimate for every month."""
+        clean_path = os.path.join(self.tmpdir.name, "transactions_cleaned.json")
+        with open(clean_path, "w") as f:
+            json.dump(
+                [
+                    {"date": "2025-05-20", "amount": 80.0, "category": "Food"},
+                    {"date": "2025-06-20", "amount": 90.0, "category": "Food"},
+                    {"date": "2025-07-02", "amount": 40.0, "category": "Food"},
+                ],
+                f,
+            )
+        with patch(
+            "src.budgeting.load_raw_transactions", wraps=load_raw_transactions
+        ) as load:
+            reports = apply_50_30_20_rule(
+                clean_path,
+                os.path.join(self.tmpdir.name, "budget_report.json"),
+                raw_input_path=self.raw_path,
+            )
+        load.assert_called_once()
+        self.assertEqual(reports["2025-05"]["income"], 3500.0)
+        self.assertEqual(reports["2025-06"]["income_source"], "estimated")
+        self.assertEqual(reports["2025-07"]["income_source"], "default")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,138 @@
+import unittest
+from unittest.mock import patch
+import os
+import json
+import tempfile
+from src import data_access
+from src.data_access import (
+    invalidate,
+    load_budget,
+    load_json,
+    load_transactions_frame,
+    save_json,
+)
+from src.journal import compact_journal, journal_budget_amount, replay_budget
+
+
+class TestDataAccess(unittest.TestCase):
+    def setUp(self):
+        invalidate()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "transactions_cleaned.json")
+        self.write(
+            [
+                {"date": "2025-06-15T00:00:00.000", "amount": 50.0, "category": "Food"},
+                {"date": "2025-06-16", "amount": 30.0, "category": "Shopping"},
+            ]
+        )
+
+    def tearDown(self):
+        invalidate()
+        self.tmpdir.cleanup()
+
+    def write(self, data):
+        with open(self.path, "w") as f:
+            json.dump(data, f)
+
+    def test_unchanged_file_is_not_reread(self):
+        """Test a second load of an unchanged file does no file reads."""
+        first = load_json(self.path)
+        with patch("builtins.open", side_effect=AssertionError("file reread")):
+            second = load_json(self.path)
+        self.assertEqual(first, second)
+
+    def test_frame_is_built_once(self):
+        """Test the DataFrame and date parsing are reused across loads."""
+        with patch.object(
+            data_access, "transactions_frame", wraps=data_access.transactions_frame
+        ) as mock_frame:
+            df = load_transactions_frame(self.path)
+            self.assertIs(load_transactions_frame(self.path), df)
+        mock_frame.assert_called_once()
+        self.assertEqual(str(df["date"].dtype), "datetime64[ns]")
+        self.assertEqual(df["date"].dt.day.tolist(), [15, 16])
+
+    def test_external_change_is_picked_up(self):
+        """Test a file rewritten by another process is reloaded."""
+        load_transactions_frame(self.path)
+        self.write([{"date": "2025-07-01", "amount": 5.0, "category": "Food"}])
+        self.assertEqual(load_transactions_frame(self.path)["amount"].tolist(), [5.0])
+
+    def test_save_json_refreshes_cache(self):
+        """Test writes through save_json are visible without rereading the file."""
+        data = load_json(self.path)
+        data.append({"date": "2025-06-20", "amount": 10.0, "category": "Savings"})
+        save_json(self.path, data)
+        with patch("builtins.open", side_effect=AssertionError("file reread")):
+            self.assertEqual(len(load_json(self.path)), 3)
+        self.assertEqual(len(load_transactions_frame(self.path)), 3)
+
+    def test_loaded_value_is_a_private_copy(self):
+        """Test in-place edits of a loaded value never reach the cache unsaved."""
+        data = load_json(self.path)
+        data[0]["amount"] = 999.0
+        data.append({"date": "2025-06-20", "amount": 10.0, "category": "Savings"})
+        self.assertEqual(load_json(self.path)[0]["amount"], 50.0)
+        self.assertEqual(len(load_json(self.path)), 2)
+
+    def test_failed_save_leaves_cache_unchanged(self):
+        """Test a change whose save fails is not seen as persisted by later loads."""
+        plan = load_json(self.path)
+        plan[0]["amount"] = 999.0
+        with patch.object(
+            data_access, "atomic_write_json", side_effect=PermissionError("denied")
+        ):
+            with self.assertRaises(PermissionError):
+                save_json(self.path, plan)
+        self.assertEqual(load_json(self.path)[0]["amount"], 50.0)
+
+    def test_saved_value_is_copied_into_cache(self):
+        """Test editing a dict after saving it does not change the cached value."""
+        data = load_json(self.path)
+        save_json(self.path, data)
+        data[0]["amount"] = 999.0
+        self.assertEqual(load_json(self.path)[0]["amount"], 50.0)
+
+    def test_invalidate_forces_reload(self):
+        """Test explicit invalidation drops the cached value."""
+        first = load_json(self.path)
+        invalidate(self.path)
+        self.assertIsNot(load_json(self.path), first)
+
+    def test_missing_or_empty_file_uses_default(self):
+        """Test missing and empty files return the default and an empty frame."""
+        missing = os.path.join(self.tmpdir.name, "missing.json")
+        self.assertEqual(load_json(missing, []), [])
+        self.assertTrue(load_transactions_frame(missing).empty)
+        open(self.path, "w").close()
+        self.assertEqual(load_json(self.path, {}), {})
+
+    def test_by_user_budget_report(self):
+        """Test a --by-user budget report loads as one user's months."""
+        budget_path = os.path.join(self.tmpdir.name, "budget_report.json")
+        journal_path = os.path.join(self.tmpdir.name, "dashboard_journal.jsonl")
+        report = {"needs": {"amount": 900.0}, "savings_debt": {"amount": 300.0}}
+        with open(budget_path, "w") as f:
+            json.dump({"user_2": {"2025-06": report}, "user_1": {"2025-06": report}}, f)
+        budget = load_budget(budget_path, journal_path)
+        self.assertEqual(list(budget), ["2025-06"])
+        self.assertEqual(budget["2025-06"]["needs"]["amount"], 900.0)
+        # Savings actions update the shown user's month, also once compacted
+        journal_budget_amount("2025-06", "savings_debt", 350.0, journal_path)
+        self.assertEqual(
+            load_budget(budget_path, journal_path)["2025-06"]["savings_debt"],
+            {"amount": 350.0},
+        )
+        compact_journal({budget_path: replay_budget}, journal_path)
+        with open(budget_path) as f:
+            saved = json.load(f)
+        self.assertEqual(saved["user_1"]["2025-06"]["savings_debt"]["amount"], 350.0)
+        self.assertEqual(saved["user_2"]["2025-06"], report)
+        self.assertEqual(
+            load_budget(budget_path, journal_path)["2025-06"]["savings_debt"],
+            {"amount": 350.0},
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,126 @@
+import unittest
+import numpy as np
+from src.debt import (
+    AVALANCHE,
+    SNOWBALL,
+    compare_strategies,
+    payoff,
+    payoff_plan,
+    payoff_strategies,
+)
+
+DEBTS = [
+    {"name": "Card", "balance": 3000.0, "interest_rate": 22.0, "minimum_payment": 90.0},
+    {"name": "Car", "balance": 8000.0, "interest_rate": 6.0, "minimum_payment": 200.0},
+    {"name": "Store", "balance": 600.0, "interest_rate": 15.0, "minimum_payment": 25.0},
+]
+
+
+def simulate(debts, extra, strategy):
+    """Month-by-month reference: (months, total interest, payoff month per debt)."""
+    if strategy == AVALANCHE:
+        order = sorted(range(len(debts)), key=lambda i: -debts[i]["interest_rate"])
+    else:
+        order = sorted(range(len(debts)), key=lambda i: debts[i]["balance"])
+    balance = [debt["balance"] for debt in debts]
+    budget = sum(debt["minimum_payment"] for debt in debts) + extra
+    month, interest, payoff_months = 0, 0.0, [0] * len(debts)
+    while any(b > 0 for b in balance):
+        month += 1
+        unpaid = [i for i in order if balance[i] > 0]
+        payments = {i: debts[i]["minimum_payment"] for i in unpaid}
+        payments[unpaid[0]] += budget - sum(payments.values())
+        for i in unpaid:
+            accrued = balance[i] * debts[i]["interest_rate"] / 12 / 100
+            interest += accrued
+            balance[i] += accrued - min(payments[i], balance[i] + accrued)
+            if balance[i] <= 1e-9:
+                balance[i], payoff_months[i] = 0.0, month
+    return month, interest, payoff_months
+
+
+class TestPayoff(unittest.TestCase):
+    def test_matches_monthly_simulation(self):
+        """Test the closed form equals simulating one debt month by month."""
+        for balance, rate, payment in [(1000.0, 12.5, 35.0), (1200.0, 0.0, 100.0)]:
+            debt = [{"balance": balance, "interest_rate": rate, "minimum_payment": 0}]
+            months, interest, _ = simulate(debt, payment, AVALANCHE)
+            closed_months, closed_interest = payoff(balance, rate, payment)
+            self.assertEqual(closed_months, months)
+            self.assertAlmostEqual(closed_interest, interest, places=8)
+
+    def test_payment_below_interest_never_pays_off(self):
+        """Test payments that do not cover the interest give inf."""
+        months, interest = payoff(5000.0, 12.5, [0.0, 50.0, 60.0])
+        self.assertEqual(months[:2].tolist(), [np.inf, np.inf])
+        self.assertTrue(np.isfinite(months[2]) and np.isfinite(interest[2]))
+
+    def test_payoff_strategies(self):
+        """Test report texts include months and interest, or say there is no plan."""
+        with_plan, without = payoff_strategies([500.0, 0.0], 5000.0, 0.0)
+        self.assertEqual(
+            with_plan,
+            "Pay off €5000.00 in 10 months with €500.00/month (€0.00 interest)",
+        )
+        self.assertTrue(without.startswith("No payoff plan"))
+
+
+class TestPayoffPlan(unittest.TestCase):
+    def test_strategies_match_monthly_simulation(self):
+        """Test avalanche and snowball plans equal the month-by-month reference."""
+        for strategy in [AVALANCHE, SNOWBALL]:
+            for extra in [0.0, 150.0]:
+                with self.subTest(strategy=strategy, extra=extra):
+                    months, interest, payoff_months = simulate(DEBTS, extra, strategy)
+                    plan = payoff_plan(DEBTS, extra, strategy)
+                    self.assertEqual(plan["months"], months)
+                    self.assertAlmostEqual(plan["total_interest"], interest, places=6)
+                    self.assertEqual(plan["payoff_months"].tolist(), payoff_months)
+
+    def test_compare_strategies(self):
+        """Test avalanche pays less interest and snowball clears the small debt first."""
+        plans = compare_strategies(DEBTS, 100.0)
+        self.assertEqual(plans[AVALANCHE]["order"], ["Card", "Store", "Car"])
+        self.assertEqual(plans[SNOWBALL]["order"], ["Store", "Card", "Car"])
+        self.assertLess(
+            plans[AVALANCHE]["total_interest"], plans[SNOWBALL]["total_interest"]
+        )
+        self.assertLess(
+            plans[SNOWBALL]["payoff_months"][2], plans[AVALANCHE]["payoff_months"][2]
+        )
+
+    def test_sweep_over_extra_payments(self):
+        """Test an array of extra payments gives one result per scenario."""
+        extras = np.linspace(0.0, 1000.0, 2001)
+        plan = payoff_plan(DEBTS, extras)
+        self.assertEqual(plan["months"].shape, (2001,))
+        self.assertEqual(plan["payoff_months"].shape, (2001, 3))
+        self.assertTrue(np.all(np.diff(plan["total_interest"]) <= 1e-9))
+        single = payoff_plan(DEBTS, extras[700])
+        self.assertEqual(plan["months"][700], single["months"])
+        self.assertAlmostEqual(plan["total_interest"][700], single["total_interest"])
+
+    def test_minimums_below_interest(self):
+        """Test plans that never finish report inf instead of looping."""
+        debts = [{"balance": 10000.0, "interest_rate": 24.0, "minimum_payment": 100.0}]
+        plan = payoff_plan(debts, [0.0, 200.0])
+        self.assertEqual(plan["months"][0], np.inf)
+        self.assertTrue(np.isfinite(plan["months"][1]))
+
+    def test_schedule(self):
+        """Test the schedule adds up to the plan's payoff months and interest."""
+        plan = payoff_plan(DEBTS, 100.0, schedule=True)
+        schedule = plan["schedule"]
+        self.assertEqual(schedule["month"].max(), plan["months"])
+        self.assertAlmostEqual(schedule["interest"].sum(), plan["total_interest"])
+        final = schedule.groupby("debt")["month"].max()
+        self.assertEqual(
+            [final[debt["name"]] for debt in DEBTS], plan["payoff_months"].tolist()
+        )
+        self.assertTrue(np.allclose(schedule.groupby("debt")["balance"].last(), 0.0))
+        with self.assertRaises(ValueError):
+            payoff_plan(DEBTS, [0.0, 100.0], schedule=True)
+
+
+if __name__ == "__main__":
+    unittest.main()
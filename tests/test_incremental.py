@@ -0,0 +1,205 @@
+import unittest
+from unittest.mock import patch
+import os
+import json
+import tempfile
+from contextlib import closing
+import pandas as pd
+from src.analysis import analyze_spending
+from src.budgeting import apply_50_30_20_rule
+from src.db import connect
+from src.incremental import (
+    LATEST_MONTH,
+    changed_months,
+    month_fingerprints,
+    save_fingerprints,
+)
+from src.storage import save_transactions
+
+
+def make_cleaned():
+    return pd.DataFrame(
+        {
+            "transaction_id": ["tx1", "tx2", "tx3", "tx4"],
+            "date": pd.to_datetime(
+                ["2025-04-02", "2025-04-10", "2025-05-03", "2025-06-07"]
+            ),
+            "merchant_name": ["store_", "lufthansa", "store_", "bank"],
+            "amount": [100.0, 1500.0, 40.0, 900.0],
+            "category": ["Food", "Travel", "Food", "Other"],
+            "account_id": ["acc1", "acc1", "acc2", "acc3"],
+        }
+    )
+
+
+class TestMonthFingerprints(unittest.TestCase):
+    def test_ignores_row_order(self):
+        """Test a month's fingerprint does not depend on row order."""
+        df = make_cleaned()
+        shuffled = df.iloc[[3, 1, 0, 2]].reset_index(drop=True)
+        self.assertEqual(month_fingerprints(df), month_fingerprints(shuffled))
+
+    def test_only_edited_month_changes(self):
+        """Test editing one transaction changes only its month's fingerprint."""
+        before = month_fingerprints(make_cleaned())
+        df = make_cleaned()
+        df.loc[2, "amount"] = 41.0
+        after = month_fingerprints(df)
+        self.assertEqual(sorted(before), ["2025-04", "2025-05", "2025-06"])
+        self.assertNotEqual(before["2025-05"], after["2025-05"])
+        self.assertEqual(before["2025-04"], after["2025-04"])
+        self.assertEqual(before["2025-06"], after["2025-06"])
+
+
+class TestIncrementalRun(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = self.path("finagent.db")
+        self.clean_path = self.path("transactions_cleaned.parquet")
+        self.report_path = self.path("budget_report.json")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.tmpdir.name, name)
+
+    def run_pipeline(self, df, months=None, incomes=None):
+        save_transactions(df, self.clean_path)
+        with patch("src.budgeting.estimate_monthly_income", return_value=incomes or {}):
+            apply_50_30_20_rule(self.clean_path, self.report_path, months=months)
+        with closing(connect(self.db_path)) as conn:
+            analyze_spending(4000.0, self.clean_path, conn=conn, months=months)
+
+    def test_changed_months_tracks_stored_fingerprints(self):
+        """Test only months with new or different fingerprints are reported."""
+        with closing(connect(self.db_path)) as conn:
+            fingerprints = month_fingerprints(make_cleaned())
+            self.assertEqual(
+                changed_months(conn, fingerprints), ["2025-04", "2025-05", "2025-06"]
+            )
+            save_fingerprints(conn, fingerprints)
+            self.assertEqual(changed_months(conn, fingerprints), [])
+            df = make_cleaned()
+            df.loc[3, "amount"] = 950.0
+            self.assertEqual(changed_months(conn, month_fingerprints(df)), ["2025-06"])
+
+    def test_incremental_matches_full_run(self):
+        """Test recomputing only changed months gives the same outputs as a full run."""
+        self.run_pipeline(make_cleaned())
+        df = make_cleaned()
+        df.loc[3, "amount"] = 300.0
+        df.loc[4] = ["tx5", pd.Timestamp("2025-07-01"), "store_", 20.0, "Food", "acc1"]
+        with closing(connect(self.db_path)) as conn:
+            save_fingerprints(conn, month_fingerprints(make_cleaned()))
+            months = changed_months(conn, month_fingerprints(df))
+        self.assertEqual(months, ["2025-06", "2025-07"])
+        self.run_pipeline(df, months=months)
+        with open(self.report_path) as f:
+            incremental_reports = json.load(f)
+        with closing(connect(self.db_path)) as conn:
+            incremental_rows = conn.execute(
+                "SELECT * FROM monthly_reports ORDER BY month"
+            ).fetchall()
+
+        os.remove(self.report_path)
+        os.remove(self.db_path)
+        self.run_pipeline(df)
+        with open(self.report_path) as f:
+            full_reports = json.load(f)
+        with closing(connect(self.db_path)) as conn:
+            full_rows = conn.execute(
+                "SELECT * FROM monthly_reports ORDER BY month"
+            ).fetchall()
+        self.assertEqual(incremental_reports, full_reports)
+        self.assertEqual(incremental_rows, full_rows)
+
+    def read_outputs(self):
+        with open(self.report_path) as f:
+            reports = json.load(f)
+        with closing(connect(self.db_path)) as conn:
+            rows = conn.execute(
+                "SELECT * FROM monthly_reports ORDER BY month"
+            ).fetchall()
+        return reports, rows
+
+    def test_backfilled_first_month_recomputes_every_month(self):
+        """Test backfilling an earlier first month, which moves every month's
+        default savings goal, gives the same outputs as a full run."""
+        incomes = {pd.Period("2025-03", "M"): 1000.0, pd.Period("2025-04", "M"): 5000.0}
+        self.run_pipeline(make_cleaned(), incomes=incomes)
+        df = make_cleaned()
+        df.loc[4] = ["tx0", pd.Timestamp("2025-03-05"), "store_", 20.0, "Food", "acc1"]
+        with closing(connect(self.db_path)) as conn:
+            save_fingerprints(conn, month_fingerprints(make_cleaned()))
+            months = changed_months(conn, month_fingerprints(df))
+        self.assertEqual(months, ["2025-03", "2025-04", "2025-05", "2025-06"])
+        self.run_pipeline(df, months=months, incomes=incomes)
+        incremental_reports, incremental_rows = self.read_outputs()
+
+        os.remove(self.report_path)
+        os.remove(self.db_path)
+        self.run_pipeline(df, incomes=incomes)
+        full_reports, full_rows = self.read_outputs()
+        self.assertEqual(full_reports["2025-06"]["savings_debt"]["custom_goal"], 200.0)
+        self.assertEqual(incremental_reports, full_reports)
+        self.assertEqual(incremental_rows, full_rows)
+
+    def test_changed_income_month_recomputes_every_month(self):
+        """Test editing the month whose income the analysis uses marks all months."""
+        with closing(connect(self.db_path)) as conn:
+            save_fingerprints(conn, month_fingerprints(make_cleaned()))
+            df = make_cleaned()
+            df.loc[3, "amount"] = 950.0
+            fingerprints = month_fingerprints(df)
+            self.assertEqual(changed_months(conn, fingerprints), ["2025-06"])
+            self.assertEqual(
+                changed_months(conn, fingerprints, income_month="2025-06"),
+                ["2025-04", "2025-05", "2025-06"],
+            )
+            self.assertEqual(
+                changed_months(conn, fingerprints, income_month="2025-05"),
+                ["2025-06"],
+            )
+
+    def test_new_latest_month_recomputes_every_user_month(self):
+        """Test a user's new latest month, their analysis income, marks all their months."""
+        df = make_cleaned()
+        df["user_id"] = ["alice", "alice", "bob", "bob"]
+        with closing(connect(self.db_path)) as conn:
+            save_fingerprints(conn, month_fingerprints(df, True), by_user=True)
+            df.loc[4] = [
+                "tx5",
+                pd.Timestamp("2025-07-01"),
+                "store_",
+                20.0,
+                "Food",
+                "acc1",
+                "bob",
+            ]
+            self.assertEqual(
+                changed_months(conn, month_fingerprints(df, True), True, LATEST_MONTH),
+                [("bob", "2025-05"), ("bob", "2025-06"), ("bob", "2025-07")],
+            )
+
+    def test_removed_month_is_pruned(self):
+        """Test months that lose all transactions are dropped from every output."""
+        self.run_pipeline(make_cleaned())
+        with closing(connect(self.db_path)) as conn:
+            save_fingerprints(conn, month_fingerprints(make_cleaned()))
+        df = make_cleaned().drop(index=2)
+        with closing(connect(self.db_path)) as conn:
+            fingerprints = month_fingerprints(df)
+            self.assertEqual(changed_months(conn, fingerprints), ["2025-05"])
+            self.run_pipeline(df, months=["2025-05"])
+            save_fingerprints(conn, fingerprints)
+            months = [
+                row[0] for row in conn.execute("SELECT month FROM monthly_reports")
+            ]
+        with open(self.report_path) as f:
+            self.assertEqual(sorted(json.load(f)), ["2025-04", "2025-06"])
+        self.assertEqual(sorted(months), ["2025-04", "2025-06"])
+
+
+if __name__ == "__main__":
+    unittest.main()
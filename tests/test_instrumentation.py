@@ -0,0 +1,147 @@
+import unittest
+from unittest.mock import patch
+import collections
+import json
+import os
+import tempfile
+import tracemalloc
+from src.clean_transactions import clean_transactions
+from src import instrumentation
+from src.instrumentation import (
+    instrumented,
+    profile_run,
+    reset_records,
+    set_rows,
+    stage,
+    stage_records,
+    to_prometheus,
+    write_metrics,
+)
+
+
+def raw_transaction(i):
+    return {
+        "transaction_id": f"tx{i}",
+        "account_id": "acc1",
+        "date": f"2025-06-{i % 28 + 1:02d}",
+        "amount": 10.0 + i,
+        "merchant_name": "Rewe",
+        "personal_finance_category": {"primary": "FOOD_AND_DRINK"},
+    }
+
+
+@instrumented()
+def double(values):
+    return values + values
+
+
+class TestStages(unittest.TestCase):
+    def setUp(self):
+        reset_records()
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        reset_records()
+        self.tmpdir.cleanup()
+
+    def test_nested_stages_record_times_and_rows(self):
+        """Test nested stages are named by their parents and record rows and times."""
+        with stage("outer", rows_in=3):
+            self.assertEqual(double([1, 2, 3]), [1, 2, 3, 1, 2, 3])
+            set_rows(rows_out=6)
+        inner, outer = stage_records()
+        self.assertEqual(inner["stage"], "outer/double")
+        self.assertEqual(inner["rows_out"], 6)
+        self.assertEqual((outer["stage"], outer["rows_in"]), ("outer", 3))
+        self.assertGreaterEqual(outer["wall_seconds"], inner["wall_seconds"])
+        self.assertGreater(outer["max_rss_bytes"], 0)
+        self.assertIsNone(outer["python_peak_bytes"])
+
+    def test_rss_growth_is_per_stage(self):
+        """Test only the stage that raised the process peak reports growth."""
+        peaks = iter([100, 300, 300, 300])
+        with patch.object(instrumentation, "max_rss_bytes", lambda: next(peaks)):
+            with stage("big"):
+                pass
+            with stage("small"):
+                pass
+        big, small = stage_records()
+        self.assertEqual((big["max_rss_bytes"], big["rss_growth_bytes"]), (300, 200))
+        self.assertEqual((small["max_rss_bytes"], small["rss_growth_bytes"]), (300, 0))
+        self.assertIn(
+            'finagent_stage_rss_growth_bytes{stage="small"} 0',
+            to_prometheus([big, small]),
+        )
+
+    def test_records_are_bounded(self):
+        """Test only the most recent records are kept."""
+        with patch.object(instrumentation, "_records", collections.deque(maxlen=3)):
+            for i in range(5):
+                with stage(f"stage{i}"):
+                    pass
+            self.assertEqual(
+                [r["stage"] for r in stage_records()], ["stage2", "stage3", "stage4"]
+            )
+
+    def test_stage_is_recorded_when_it_raises(self):
+        """Test a failing stage still records its timings."""
+        with self.assertRaises(ValueError), stage("broken"):
+            raise ValueError("boom")
+        self.assertEqual(stage_records()[0]["stage"], "broken")
+
+    def test_peak_memory_covers_child_stages(self):
+        """Test a parent's traced peak includes allocations in its children."""
+        with profile_run(profiler="tracemalloc"):
+            with stage("outer"):
+                with stage("inner"):
+                    block = bytearray(5_000_000)
+                del block
+                with stage("after"):
+                    pass
+        self.assertFalse(tracemalloc.is_tracing())
+        peaks = {r["stage"]: r["python_peak_bytes"] for r in stage_records()}
+        self.assertGreaterEqual(peaks["outer/inner"], 5_000_000)
+        self.assertLess(peaks["outer/after"], 5_000_000)
+        self.assertGreaterEqual(peaks["outer"], 5_000_000)
+
+    def test_pipeline_stage_counts_rows(self):
+        """Test clean_transactions reports the rows it read and kept."""
+        transactions = [raw_transaction(i) for i in range(50)]
+        cleaned = clean_transactions(
+            transactions + transactions[:5],
+            output_path=os.path.join(self.tmpdir.name, "cleaned.json"),
+        )
+        record = stage_records()[-1]
+        self.assertEqual(record["stage"], "clean_transactions")
+        self.assertEqual(record["rows_in"], len(transactions) + 5)
+        self.assertEqual(record["rows_out"], len(cleaned))
+        self.assertEqual(len(cleaned), len(transactions))
+
+    def test_writes_json_and_prometheus_metrics(self):
+        """Test metrics files by extension, with repeated stages combined for Prometheus."""
+        for _ in range(2):
+            double([1])
+        json_path = write_metrics(os.path.join(self.tmpdir.name, "metrics.json"))
+        with open(json_path) as f:
+            self.assertEqual(len(json.load(f)["stages"]), 2)
+        prom_path = write_metrics(os.path.join(self.tmpdir.name, "metrics.prom"))
+        with open(prom_path) as f:
+            text = f.read()
+        self.assertEqual(text, to_prometheus(stage_records()))
+        self.assertIn("# TYPE finagent_stage_wall_seconds gauge", text)
+        self.assertIn('finagent_stage_calls{stage="double"} 2', text)
+        self.assertIn('finagent_stage_rows_out{stage="double"} 4', text)
+
+    def test_cprofile_dump(self):
+        """Test the cprofile profiler dumps stats loadable by pstats."""
+        import pstats
+
+        with profile_run("test", profiler="cprofile", output_dir=self.tmpdir.name):
+            double([1])
+        (name,) = os.listdir(self.tmpdir.name)
+        self.assertTrue(name.startswith("test-") and name.endswith(".prof"))
+        pstats.Stats(os.path.join(self.tmpdir.name, name))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,177 @@
+import unittest
+from unittest.mock import patch
+import os
+import json
+import tempfile
+import threading
+from src import journal
+from src.data_access import invalidate, load_journaled, load_transactions_frame
+from src.journal import (
+    atomic_write_json,
+    compact_journal,
+    discard_entries,
+    journal_budget_amount,
+    journal_transaction,
+    maybe_compact,
+    read_journal,
+    replay_budget,
+    replay_transactions,
+)
+
+
+def savings_transaction(txn_id, amount):
+    return {
+        "txnId": txn_id,
+        "date": "2025-06-20T10:00:00",
+        "amount": amount,
+        "category": "Savings",
+    }
+
+
+class TestJournal(unittest.TestCase):
+    def setUp(self):
+        invalidate()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.journal_path = self.path("dashboard_journal.jsonl")
+        self.transactions_path = self.path("transactions_cleaned.json")
+        self.budget_path = self.path("budget_report.json")
+        with open(self.transactions_path, "w") as f:
+            json.dump([{"date": "2025-06-01", "amount": 12.0, "category": "Food"}], f)
+        with open(self.budget_path, "w") as f:
+            json.dump({"2025-06": {"savings_debt": {"amount": 800.0}}}, f)
+        self.snapshots = {
+            self.transactions_path: replay_transactions,
+            self.budget_path: replay_budget,
+        }
+
+    def tearDown(self):
+        invalidate()
+        self.tmpdir.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.tmpdir.name, name)
+
+    def read(self, path):
+        with open(path) as f:
+            return json.load(f)
+
+    def temp_files(self):
+        return [name for name in os.listdir(self.tmpdir.name) if name.endswith(".tmp")]
+
+    def record_savings(self, txn_id, amount, new_bucket_amount):
+        journal_budget_amount(
+            "2025-06", "savings_debt", new_bucket_amount, self.journal_path
+        )
+        journal_transaction(savings_transaction(txn_id, amount), self.journal_path)
+
+    def test_append_does_not_touch_snapshots(self):
+        """Test savings actions only append to the journal."""
+        before = os.stat(self.transactions_path).st_mtime_ns
+        self.record_savings("txn_1", 50.0, 850.0)
+        self.assertEqual(os.stat(self.transactions_path).st_mtime_ns, before)
+        self.assertEqual(len(read_journal(self.journal_path)), 2)
+
+    def test_views_replay_journal_over_snapshots(self):
+        """Test loaded data includes journaled transactions and budget amounts."""
+        self.record_savings("txn_1", 50.0, 850.0)
+        self.record_savings("txn_2", 25.0, 875.0)
+        transactions = load_journaled(
+            self.transactions_path, self.journal_path, replay_transactions, []
+        )
+        budget = load_journaled(self.budget_path, self.journal_path, replay_budget)
+        self.assertEqual([t["amount"] for t in transactions], [12.0, 50.0, 25.0])
+        self.assertEqual(budget["2025-06"]["savings_debt"]["amount"], 875.0)
+        df = load_transactions_frame(self.transactions_path, self.journal_path)
+        self.assertEqual(df["amount"].sum(), 87.0)
+        # The cached snapshot itself is left untouched
+        self.assertEqual(
+            self.read(self.budget_path)["2025-06"]["savings_debt"], {"amount": 800.0}
+        )
+
+    def test_compaction_folds_journal_into_snapshots(self):
+        """Test compaction rewrites the snapshots and empties the journal."""
+        for i in range(3):
+            self.record_savings(f"txn_{i}", 10.0, 810.0 + 10 * i)
+        self.assertEqual(maybe_compact(self.snapshots, self.journal_path, every=10), 0)
+        self.assertEqual(maybe_compact(self.snapshots, self.journal_path, every=6), 6)
+        self.assertEqual(read_journal(self.journal_path), [])
+        self.assertEqual(len(self.read(self.transactions_path)), 4)
+        self.assertEqual(
+            self.read(self.budget_path)["2025-06"]["savings_debt"]["amount"], 830.0
+        )
+        self.assertEqual(self.temp_files(), [])
+
+    def test_crash_before_truncation_is_idempotent(self):
+        """Test replaying a journal already folded into the snapshots changes nothing."""
+        self.record_savings("txn_1", 50.0, 850.0)
+        with patch.object(journal, "_truncate", side_effect=OSError("crash")):
+            with self.assertRaises(OSError):
+                compact_journal(self.snapshots, self.journal_path)
+        self.assertEqual(len(read_journal(self.journal_path)), 2)
+        transactions = load_journaled(
+            self.transactions_path, self.journal_path, replay_transactions, []
+        )
+        self.assertEqual(len(transactions), 2)
+        compact_journal(self.snapshots, self.journal_path)
+        self.assertEqual(len(self.read(self.transactions_path)), 2)
+        self.assertEqual(
+            self.read(self.budget_path)["2025-06"]["savings_debt"]["amount"], 850.0
+        )
+
+    def test_torn_entry_is_skipped(self):
+        """Test a partially written line does not hide later entries."""
+        self.record_savings("txn_1", 50.0, 850.0)
+        with open(self.journal_path, "a") as f:
+            f.write('{"type": "transac')
+        journal_transaction(savings_transaction("txn_2", 5.0), self.journal_path)
+        entries = read_journal(self.journal_path)
+        self.assertEqual(len(entries), 3)
+        self.assertEqual(entries[-1]["transaction"]["txnId"], "txn_2")
+
+    def test_failed_atomic_write_keeps_old_file(self):
+        """Test a failed snapshot write leaves the previous file intact."""
+        with patch("src.journal.json.dump", side_effect=ValueError("boom")):
+            with self.assertRaises(ValueError):
+                atomic_write_json(self.budget_path, {"broken": True})
+        self.assertIn("2025-06", self.read(self.budget_path))
+        self.assertEqual(self.temp_files(), [])
+
+    def test_regenerated_report_drops_stale_budget_entries(self):
+        """Test budget entries are discarded with the report they were made against."""
+        self.record_savings("txn_1", 50.0, 850.0)
+        # The pipeline rewrites the report with a fresh savings_debt amount
+        with open(self.budget_path, "w") as f:
+            json.dump({"2025-06": {"savings_debt": {"amount": 1200.0}}}, f)
+        self.assertEqual(discard_entries("budget", self.journal_path), 1)
+        self.assertEqual(discard_entries("budget", self.journal_path), 0)
+        budget = load_journaled(self.budget_path, self.journal_path, replay_budget)
+        self.assertEqual(budget["2025-06"]["savings_debt"]["amount"], 1200.0)
+        transactions = load_journaled(
+            self.transactions_path, self.journal_path, replay_transactions, []
+        )
+        self.assertEqual([t["amount"] for t in transactions], [12.0, 50.0])
+
+    def test_concurrent_atomic_writes_do_not_interleave(self):
+        """Test writers of the same file each use their own temp file."""
+        plans = [{"name": f"plan {i}", "goal": 100.0 * i} for i in range(8)]
+        errors = []
+
+        def write(plan):
+            try:
+                for _ in range(20):
+                    atomic_write_json(self.budget_path, plan)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=write, args=(plan,)) for plan in plans]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertIn(self.read(self.budget_path), plans)
+        self.assertEqual(self.temp_files(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,194 @@
+import unittest
+import importlib.util
+import os
+import tempfile
+
+HAS_MODEL_DEPS = all(
+    importlib.util.find_spec(name) for name in ["torch", "transformers", "peft"]
+)
+
+
+def save_tiny_llama(path):
+    """Save a randomly initialized two-layer Llama and a word-level tokenizer."""
+    import torch
+    from tokenizers import Tokenizer, models, pre_tokenizers
+    from transformers import LlamaConfig, LlamaForCausalLM, PreTrainedTokenizerFast
+
+    words = ["<unk>", "<s>", "</s>", "hello", "how", "are", "you", "save", "more"]
+    vocab = {word: i for i, word in enumerate(words)}
+    tokenizer = Tokenizer(models.WordLevel(vocab, unk_token="<unk>"))
+    tokenizer.pre_tokenizer = pre_tokenizers.Whitespace()
+    PreTrainedTokenizerFast(
+        tokenizer_object=tokenizer,
+        unk_token="<unk>",
+        bos_token="<s>",
+        eos_token="</s>",
+    ).save_pretrained(path)
+    torch.manual_seed(0)
+    config = LlamaConfig(
+        vocab_size=64,
+        hidden_size=32,
+        intermediate_size=64,
+        num_hidden_layers=2,
+        num_attention_heads=4,
+        num_key_value_heads=4,
+        max_position_embeddings=128,
+    )
+    LlamaForCausalLM(config).save_pretrained(path)
+
+
+def save_tiny_lora(base_path, path):
+    """Save a LoRA adapter with non-zero weights for the tiny Llama."""
+    import torch
+    from peft import LoraConfig, get_peft_model
+    from transformers import AutoModelForCausalLM
+
+    model = get_peft_model(
+        AutoModelForCausalLM.from_pretrained(base_path),
+        LoraConfig(r=4, lora_alpha=8, target_modules=["q_proj", "v_proj"]),
+    )
+    with torch.no_grad():
+        for name, param in model.named_parameters():
+            if "lora_B" in name:
+                param.normal_(std=0.5)
+    model.save_pretrained(path)
+    return model
+
+
+@unittest.skipUnless(HAS_MODEL_DEPS, "torch, transformers and peft are required")
+class TestModelLoader(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmpdir = tempfile.TemporaryDirectory()
+        cls.base_path = os.path.join(cls.tmpdir.name, "base")
+        cls.adapter_path = os.path.join(cls.tmpdir.name, "adapter")
+        cls.merged_path = os.path.join(cls.tmpdir.name, "merged")
+        save_tiny_llama(cls.base_path)
+        cls.peft_model = save_tiny_lora(cls.base_path, cls.adapter_path)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmpdir.cleanup()
+
+    def merged(self):
+        from src.model_loader import merge_lora
+
+        return merge_lora(self.base_path, self.adapter_path, self.merged_path)
+
+    def test_merged_model_matches_base_plus_adapter(self):
+        """Test the merged checkpoint gives the same logits as base + LoRA."""
+        import torch
+        from src.model_loader import load_for_inference
+
+        model, _, stats = load_for_inference(self.merged())
+        input_ids = torch.tensor([[1, 3, 4, 5, 6]])
+        with torch.no_grad():
+            expected = self.peft_model(input_ids).logits
+            actual = model(input_ids).logits
+        self.assertTrue(torch.allclose(expected, actual, atol=1e-5))
+        self.assertTrue(
+            os.path.exists(os.path.join(self.merged_path, "model.safetensors"))
+        )
+        self.assertEqual(stats["quantization"], "float32")
+
+    def test_merge_runs_once(self):
+        """Test an existing merged checkpoint is reused."""
+        path = self.merged()
+        mtime = os.stat(os.path.join(path, "config.json")).st_mtime_ns
+        self.merged()
+        self.assertEqual(os.stat(os.path.join(path, "config.json")).st_mtime_ns, mtime)
+
+    def test_int8_inference_reports_stats(self):
+        """Test int8 dynamic quantization loads, generates and reports stats."""
+        import torch
+        from src.model_loader import load_for_inference, tokens_per_second
+
+        model, tokenizer, stats = load_for_inference(self.merged(), "int8")
+        self.assertIsInstance(
+            model.model.layers[0].self_attn.q_proj,
+            torch.ao.nn.quantized.dynamic.Linear,
+        )
+        self.assertGreater(stats["rss_mb"], 0)
+        self.assertGreaterEqual(stats["load_seconds"], 0)
+        self.assertGreater(
+            tokens_per_second(model, tokenizer, "hello how are", max_new_tokens=4), 0
+        )
+
+    def test_unknown_or_unavailable_quantization(self):
+        """Test bad modes and 4-bit without CUDA are rejected clearly."""
+        import torch
+        from src.model_loader import load_for_inference
+
+        with self.assertRaises(ValueError):
+            load_for_inference(self.merged(), "int3")
+        if not torch.cuda.is_available():
+            with self.assertRaises(ValueError):
+                load_for_inference(self.merged(), "4bit")
+
+    def test_load_model_caches_merged_checkpoint(self):
+        """Test load_model merges into the cache once and reuses it afterwards."""
+        from unittest import mock
+        from src.model_loader import (
+            ModelConfig,
+            checkpoint_dir,
+            load_model,
+            unload_models,
+        )
+
+        config = ModelConfig(
+            self.base_path,
+            self.adapter_path,
+            cache_dir=os.path.join(self.tmpdir.name, "cache"),
+        )
+        model, _ = load_model(config)
+        self.assertIs(load_model(config)[0], model)
+        self.assertTrue(
+            os.path.exists(os.path.join(checkpoint_dir(config), "model.safetensors"))
+        )
+        unload_models()
+        with mock.patch("peft.PeftModel.from_pretrained") as from_pretrained:
+            reloaded, _ = load_model(config)
+        from_pretrained.assert_not_called()
+        self.assertIsNot(reloaded, model)
+        unload_models()
+
+    def test_load_model_without_adapter(self):
+        """Test a base-only config is converted to a cached safetensors checkpoint."""
+        from src.model_loader import ModelConfig, checkpoint_dir, load_model
+
+        config = ModelConfig(
+            self.base_path,
+            adapter=None,
+            cache_dir=os.path.join(self.tmpdir.name, "cache"),
+        )
+        model, tokenizer = load_model(config)
+        self.assertEqual(type(model).__name__, "LlamaForCausalLM")
+        self.assertEqual(tokenizer.pad_token, tokenizer.eos_token)
+        self.assertIn("--base--float32-", checkpoint_dir(config))
+
+
+class TestCheckpointDir(unittest.TestCase):
+    def test_key_covers_base_adapter_and_dtype(self):
+        """Test each base model, adapter and dtype gets its own cache entry."""
+        from src.model_loader import ModelConfig, checkpoint_dir
+
+        config = ModelConfig("org/base", "org/lora", "float16", cache_dir="cache")
+        paths = {
+            checkpoint_dir(config),
+            checkpoint_dir(ModelConfig("org/base", "org/lora", "float32")),
+            checkpoint_dir(ModelConfig("org/base", None, "float16")),
+            checkpoint_dir(ModelConfig("org/other", "org/lora", "float16")),
+        }
+        self.assertEqual(len(paths), 4)
+        self.assertTrue(checkpoint_dir(config).startswith("cache/org_base--org_lora"))
+        self.assertEqual(
+            checkpoint_dir(
+                ModelConfig("org/base", "org/lora", "float16", "int8", "cache")
+            ),
+            checkpoint_dir(config),
+        )
+        self.assertEqual(ModelConfig(token="a"), ModelConfig(token="b"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+import unittest
+from unittest.mock import patch
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import pandas as pd
+from src.budgeting import apply_50_30_20_rule
+from src import db, main, parallel
+from src.parallel import plan_shards, run_parallel
+
+
+class TestPlanShards(unittest.TestCase):
+    def test_covers_every_user_and_transaction_once(self):
+        """Test shards split users and transaction ids contiguously without gaps."""
+        plan = plan_shards(1000, 10, shards=4)
+        self.assertEqual(len(plan), 4)
+        self.assertEqual(sum(users for _, users, _, _ in plan), 10)
+        self.assertEqual(sum(count for _, _, _, count in plan), 1000)
+        for previous, shard in zip(plan, plan[1:]):
+            self.assertEqual(shard[0], previous[0] + previous[1])
+            self.assertEqual(shard[2], previous[2] + previous[3])
+
+    def test_never_more_shards_than_users(self):
+        """Test small runs get one shard per user."""
+        self.assertEqual(len(plan_shards(50, 3, shards=64)), 3)
+
+
+class TestRunParallel(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def run_pipeline(self, workers):
+        out = os.path.join(self.tmpdir.name, f"workers{workers}")
+        stats = run_parallel(
+            3000,
+            12,
+            workers,
+            shards=4,
+            cleaned_path=os.path.join(out, "transactions_cleaned.parquet"),
+            budget_path=os.path.join(out, "budget_report.json"),
+            db_path=os.path.join(out, "finagent.db"),
+        )
+        with open(os.path.join(out, "budget_report.json")) as f:
+            budgets = json.load(f)
+        with sqlite3.connect(os.path.join(out, "finagent.db")) as conn:
+            rows = conn.execute("SELECT * FROM monthly_reports").fetchall()
+        cleaned = pd.read_parquet(os.path.join(out, "transactions_cleaned.parquet"))
+        return out, stats, budgets, rows, cleaned
+
+    def test_defaults_keep_live_data_apart(self):
+        """Test the load test writes under its own directory unless told otherwise."""
+        for path in [
+            parallel.CLEANED_PATH,
+            parallel.BUDGET_REPORT_PATH,
+            parallel.DB_PATH,
+        ]:
+            self.assertEqual(os.path.dirname(path), parallel.OUTPUT_DIR)
+        self.assertNotEqual(parallel.CLEANED_PATH, main.CLEANED_PATH)
+        self.assertNotEqual(parallel.DB_PATH, db.DB_PATH)
+
+    def test_command_line_paths(self):
+        """Test --cleaned-path, --budget-path and --db-path choose the outputs."""
+        paths = {
+            name: os.path.join(self.tmpdir.name, name)
+            for name in ["cleaned.parquet", "budget.json", "reports.db"]
+        }
+        subprocess.run(
+            [sys.executable, "-m", "src.parallel", "--count", "200", "--users", "2"]
+            + ["--workers", "1", "--shards", "2"]
+            + ["--cleaned-path", paths["cleaned.parquet"]]
+            + ["--budget-path", paths["budget.json"]]
+            + ["--db-path", paths["reports.db"]],
+            check=True,
+            capture_output=True,
+        )
+        for path in paths.values():
+            self.assertTrue(os.path.exists(path), path)
+
+    def test_output_does_not_depend_on_workers(self):
+        """Test a pool of workers merges to exactly the in-process result."""
+        _, stats, budgets, rows, cleaned = self.run_pipeline(1)
+        _, pool_stats, pool_budgets, pool_rows, pool_cleaned = self.run_pipeline(2)
+        self.assertEqual(stats["transactions"], 3000)
+        self.assertEqual(stats["users"], 12)
+        self.assertEqual(pool_stats["workers"], 2)
+        self.assertEqual(pool_budgets, budgets)
+        self.assertEqual(pool_rows, rows)
+        pd.testing.assert_frame_equal(pool_cleaned, cleaned)
+
+    def test_matches_partitioned_single_process_budget(self):
+        """Test sharded budgets equal budgeting the merged transactions by user."""
+        out, _, budgets, _, cleaned = self.run_pipeline(1)
+        self.assertEqual(cleaned["transaction_id"].tolist()[:2], ["tx0", "tx1"])
+        # Sample income is never negative, so every month uses the default
+        with patch("src.budgeting.estimate_monthly_income", return_value={}):
+            expected = apply_50_30_20_rule(
+                os.path.join(out, "transactions_cleaned.parquet"),
+                os.path.join(out, "expected_budget.json"),
+                by_user=True,
+            )
+        self.assertEqual(budgets, expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,188 @@
+import unittest
+import os
+import json
+import tempfile
+from contextlib import closing
+from datetime import date
+from src.db import connect
+from src.plaid_sync import (
+    MUTATION_DURING_PAGINATION,
+    fetch_updates,
+    load_cursor,
+    load_synced_transactions,
+    sync_item,
+)
+
+
+def make_transaction(transaction_id, amount, day=15):
+    return {
+        "transaction_id": transaction_id,
+        "account_id": "acc1",
+        "date": date(2025, 6, day),
+        "amount": amount,
+        "personal_finance_category": {"primary": "FOOD_AND_DRINK"},
+    }
+
+
+def request_factory(access_token, cursor=None):
+    return {"access_token": access_token, "cursor": cursor}
+
+
+class FakePlaidError(Exception):
+    def __init__(self, error_code):
+        super().__init__(error_code)
+        self.body = json.dumps({"error_code": error_code})
+
+
+NO_FAILURE = object()
+
+
+class FakePlaidClient:
+    """Local stand-in for plaid_api.PlaidApi.transactions_sync.
+
+    pages maps the cursor a request is made with to the response for it.
+    """
+
+    def __init__(self, pages, fail_once_on=NO_FAILURE):
+        self.pages = pages
+        self.fail_once_on = fail_once_on
+        self.requests = []
+
+    def transactions_sync(self, request):
+        self.requests.append(request)
+        if request["cursor"] == self.fail_once_on:
+            self.fail_once_on = NO_FAILURE
+            raise FakePlaidError(MUTATION_DURING_PAGINATION)
+        return self.pages[request["cursor"]]
+
+
+def page(next_cursor, has_more, added=(), modified=(), removed=()):
+    return {
+        "added": list(added),
+        "modified": list(modified),
+        "removed": [{"transaction_id": tx_id} for tx_id in removed],
+        "next_cursor": next_cursor,
+        "has_more": has_more,
+    }
+
+
+class TestPlaidSync(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmpdir.name, "finagent.db")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_pages_until_has_more_is_false(self):
+        """Test every page is fetched and the last cursor is returned."""
+        client = FakePlaidClient(
+            {
+                None: page("c1", True, added=[make_transaction("tx1", 10.0)]),
+                "c1": page("c2", True, added=[make_transaction("tx2", 20.0)]),
+                "c2": page("c3", False, added=[make_transaction("tx3", 30.0)]),
+            }
+        )
+        updates = fetch_updates(client, "token", request_factory=request_factory)
+        self.assertEqual(
+            [tx["transaction_id"] for tx in updates["added"]], ["tx1", "tx2", "tx3"]
+        )
+        self.assertEqual(updates["next_cursor"], "c3")
+        self.assertEqual(len(client.requests), 3)
+
+    def test_restarts_after_mutation_during_pagination(self):
+        """Test pagination restarts from the original cursor when Plaid asks to."""
+        client = FakePlaidClient(
+            {
+                None: page("c1", True, added=[make_transaction("tx1", 10.0)]),
+                "c1": page("c2", False, added=[make_transaction("tx2", 20.0)]),
+            },
+            fail_once_on="c1",
+        )
+        updates = fetch_updates(client, "token", request_factory=request_factory)
+        self.assertEqual(
+            [tx["transaction_id"] for tx in updates["added"]], ["tx1", "tx2"]
+        )
+        self.assertEqual(
+            [request["cursor"] for request in client.requests], [None, "c1", None, "c1"]
+        )
+
+    def test_incremental_sync_applies_changes_and_persists_cursor(self):
+        """Test a second sync resumes from the stored cursor and applies all changes."""
+        client = FakePlaidClient(
+            {
+                None: page(
+                    "c1",
+                    False,
+                    added=[
+                        make_transaction("tx1", 10.0),
+                        make_transaction("tx2", 20.0),
+                    ],
+                ),
+                "c1": page(
+                    "c2",
+                    False,
+                    added=[make_transaction("tx3", 30.0, day=16)],
+                    modified=[make_transaction("tx1", 12.5)],
+                    removed=["tx2"],
+                ),
+            }
+        )
+        first = sync_item(
+            client,
+            "token",
+            item_id="item1",
+            db_path=self.db_path,
+            request_factory=request_factory,
+        )
+        self.assertEqual(first["added"], 2)
+        second = sync_item(
+            client,
+            "token",
+            item_id="item1",
+            db_path=self.db_path,
+            request_factory=request_factory,
+        )
+        self.assertEqual(
+            (second["added"], second["modified"], second["removed"]), (1, 1, 1)
+        )
+        self.assertEqual(
+            [request["cursor"] for request in client.requests], [None, "c1"]
+        )
+
+        transactions = load_synced_transactions(self.db_path)
+        self.assertEqual(
+            [(tx["transaction_id"], tx["amount"]) for tx in transactions],
+            [("tx1", 12.5), ("tx3", 30.0)],
+        )
+        self.assertEqual(transactions[0]["date"], "2025-06-15")
+        with closing(connect(self.db_path)) as conn:
+            self.assertEqual(load_cursor(conn, "item1"), "c2")
+
+    def test_failed_sync_keeps_previous_cursor(self):
+        """Test the cursor is not advanced when a sync fails part way."""
+        client = FakePlaidClient(
+            {None: page("c1", False, added=[make_transaction("tx1", 10.0)])}
+        )
+        sync_item(
+            client,
+            "token",
+            item_id="item1",
+            db_path=self.db_path,
+            request_factory=request_factory,
+        )
+        with self.assertRaises(KeyError):
+            sync_item(
+                client,
+                "token",
+                item_id="item1",
+                db_path=self.db_path,
+                request_factory=request_factory,
+            )
+        with closing(connect(self.db_path)) as conn:
+            self.assertEqual(load_cursor(conn, "item1"), "c1")
+        self.assertEqual(len(load_synced_transactions(self.db_path)), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
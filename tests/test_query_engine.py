@@ -0,0 +1,196 @@
+import unittest
+import time
+import pandas as pd
+from src.query_engine import answer_query, parse_periods, parse_query
+from src.spending_cube import SpendingCube
+
+TRANSACTIONS = pd.DataFrame(
+    [
+        ("2024-06-10", 50.0, "Food", "Rewe"),
+        ("2025-03-02", 100.0, "Food", "Rewe"),
+        ("2025-03-15", 40.0, "Travel", "Lufthansa"),
+        ("2025-05-01", 80.0, "Shopping", "Zara"),
+        ("2025-06-03", 120.0, "Shopping", "Zara"),
+        ("2025-06-04", 30.0, "Food", "Rewe"),
+        ("2025-06-05", 25.5, "Transportation", "DB"),
+        ("2025-06-06", -10.0, "Transportation", "DB"),
+        ("2025-06-20", 200.0, "Travel", "Lufthansa"),
+    ],
+    columns=["date", "amount", "category", "merchant_name"],
+).assign(date=lambda df: pd.to_datetime(df["date"]))
+
+# (question, expected answer); None means the advisor model should answer
+CASES = [
+    (
+        "What’s my spending on transportation in June?",
+        "Your spending on Transportation in June 2025 was €25.50.",
+    ),
+    (
+        "What is my spending on food in June 2024?",
+        "Your spending on Food in June 2024 was €50.00.",
+    ),
+    ("spending on food in 2025-03", "Your spending on Food in March 2025 was €100.00."),
+    ("spent on food in 3/2025", "Your spending on Food in March 2025 was €100.00."),
+    (
+        "How much did I spend on travel this month?",
+        "Your spending on Travel in June 2025 was €200.00.",
+    ),
+    (
+        "How much did I spend on shopping last month?",
+        "Your spending on Shopping in May 2025 was €80.00.",
+    ),
+    ("My expenses for food?", "Your spending on Food in June 2025 was €30.00."),
+    ("spending on foods in 2025", "Your spending on Food in 2025 was €130.00."),
+    (
+        "spending on food and travel in March",
+        "Your spending on Food and Travel in March 2025 was €140.00.",
+    ),
+    (
+        "total spending from March to May 2025",
+        "Your total spending from March 2025 to May 2025 was €220.00.",
+    ),
+    (
+        "spending on shopping between may and june",
+        "Your spending on Shopping from May 2025 to June 2025 was €200.00.",
+    ),
+    (
+        "spending on food since March 2025",
+        "Your spending on Food from March 2025 to June 2025 was €130.00.",
+    ),
+    ("how much did I spend in 2024?", "Your total spending in 2024 was €50.00."),
+    (
+        "Compare spending on shopping in June vs May",
+        "Your spending on Shopping was €120.00 in June 2025 and €80.00 in May 2025 "
+        "(€40.00 more, +50.0%).",
+    ),
+    (
+        "Did I spend more on food in March than June 2025?",
+        "Your spending on Food was €100.00 in March 2025 and €30.00 in June 2025 "
+        "(€70.00 more, +233.3%).",
+    ),
+    (
+        "spending on food in June 2025 versus June 2024",
+        "Your spending on Food was €30.00 in June 2025 and €50.00 in June 2024 "
+        "(€20.00 less, -40.0%).",
+    ),
+    (
+        "top 2 merchants in June",
+        "Your top 2 merchants in June 2025: Lufthansa (€200.00), Zara (€120.00).",
+    ),
+    (
+        "Where did I spend the most in 2025?",
+        "Your top 4 merchants in 2025: Lufthansa (€240.00), Zara (€200.00), "
+        "Rewe (€130.00), DB (€25.50).",
+    ),
+    ("top merchants in January 2023", "No merchant spending found in January 2023."),
+    (
+        "spending on travel in April 2025",
+        "No spending on Travel found in April 2025.",
+    ),
+    (
+        "spending on pets in June",
+        "I couldn't find a category called 'pets'. Known categories: Food, "
+        "Shopping, Transportation, Travel.",
+    ),
+    ("How can I save more?", None),
+    ("How to reduce overspending?", None),
+    ("Should I adjust my budget?", None),
+    ("What is my savings progress?", None),
+]
+
+
+class TestQueryEngine(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.cube = SpendingCube.from_frame(TRANSACTIONS)
+
+    def test_answers(self):
+        """Test each question in the table gets its expected answer."""
+        for question, expected in CASES:
+            with self.subTest(question=question):
+                self.assertEqual(answer_query(question, self.cube), expected)
+
+    def test_periods(self):
+        """Test month references resolve to the right months."""
+        available = ["2024-11", "2024-12", "2025-01", "2025-02"]
+        cases = [
+            ("in feb", [["2025-02"]]),
+            ("in sept 2024", [["2024-09"]]),
+            (
+                "from november to february",
+                [["2024-11", "2024-12", "2025-01", "2025-02"]],
+            ),
+            ("from dec to jan 2025", [["2024-12", "2025-01"]]),
+            ("in january vs december", [["2025-01"], ["2024-12"]]),
+            ("in 2025-13", []),
+            ("lately", []),
+        ]
+        for text, expected in cases:
+            with self.subTest(text=text):
+                periods = parse_periods(text, available)
+                self.assertEqual([p["months"] for p in periods], expected)
+
+    def test_parse_without_data(self):
+        """Test questions still parse before any transactions exist."""
+        intent = parse_query("spending on food in June 2025")
+        self.assertEqual(intent["intent"], "spending")
+        self.assertEqual(intent["periods"][0]["months"], ["2025-06"])
+        self.assertEqual(
+            answer_query("spending on food in June", SpendingCube()),
+            "I couldn't find a category called 'food'. Known categories: .",
+        )
+        self.assertEqual(
+            answer_query("top merchants", SpendingCube()),
+            "No transaction data available yet.",
+        )
+
+    def test_invalid_period(self):
+        """Test an explicit month that does not exist is reported, not replaced."""
+        message = (
+            "I couldn't understand the time period '{}'. "
+            "Try a month like 'June 2025', '2025-06' or '06/2025'."
+        )
+        cases = [
+            ("spending on Food in 13/2025", "13/2025"),
+            ("spending on food in 2025-13", "2025-13"),
+            ("top merchants in 0/2025", "0/2025"),
+            ("spending on food from 13/2025 to June 2025", "from 13/2025 to june 2025"),
+        ]
+        for question, ref in cases:
+            with self.subTest(question=question):
+                self.assertEqual(answer_query(question, self.cube), message.format(ref))
+                self.assertEqual(
+                    parse_query(question, self.cube.months(), self.cube.categories())[
+                        "invalid_period"
+                    ],
+                    ref,
+                )
+
+    def test_month_without_data(self):
+        """Test a valid month missing from the data is not answered with the latest."""
+        self.assertEqual(
+            answer_query("spending on food in June 2023", self.cube),
+            "No spending on Food found in June 2023.",
+        )
+        self.assertEqual(
+            answer_query("spending on food in June 2025 vs June 2023", self.cube),
+            "No transaction data in June 2023.",
+        )
+        intent = parse_query("spending on food in June 2023", self.cube.months())
+        self.assertEqual(intent["periods"][0]["months"], ["2023-06"])
+        # Only questions without a time reference use the latest month
+        intent = parse_query("spending on food", self.cube.months())
+        self.assertEqual(intent["periods"][0]["months"], ["2025-06"])
+        self.assertNotIn("invalid_period", intent)
+
+    def test_answers_are_fast(self):
+        """Test answering takes well under a millisecond per question."""
+        questions = [question for question, _ in CASES] * 20
+        start = time.perf_counter()
+        for question in questions:
+            answer_query(question, self.cube)
+        self.assertLess((time.perf_counter() - start) / len(questions), 1e-3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+import unittest
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+from src.clean_transactions import clean_frame, iter_json_records
+from src.sample_data import (
+    CATEGORY_WEIGHTS,
+    START_DATE,
+    WEEKLY_INCOME,
+    WEEKLY_INCOME_SHARE,
+    iter_sample_batches,
+    sample_frame,
+    to_arrow_table,
+    write_sample_transactions,
+)
+
+
+class TestSampleData(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.tmpdir.name, name)
+
+    def test_batches_are_unique_and_reproducible(self):
+        """Test ids are unique across batches and a seed gives the same data."""
+        batches = list(iter_sample_batches(2500, users=50, seed=7, batch_size=1000))
+        self.assertEqual([len(b) for b in batches], [1000, 1000, 500])
+        df = pd.concat(batches, ignore_index=True)
+        self.assertTrue(df["transaction_id"].is_unique)
+        again = pd.concat(iter_sample_batches(2500, users=50, seed=7, batch_size=1000))
+        pd.testing.assert_frame_equal(df, again.reset_index(drop=True))
+        other = pd.concat(iter_sample_batches(2500, users=50, seed=8, batch_size=1000))
+        self.assertFalse(df["amount"].equals(other["amount"].reset_index(drop=True)))
+
+    def test_users_and_accounts(self):
+        """Test rows spread over users, each with their own accounts."""
+        df = sample_frame(
+            np.random.default_rng(0),
+            20_000,
+            user_scale=np.ones(100),
+            accounts_per_user=2,
+        )
+        self.assertEqual(df["user_id"].nunique(), 100)
+        self.assertEqual(df["account_id"].nunique(), 200)
+        self.assertTrue((df.groupby("account_id")["user_id"].nunique() == 1).all())
+
+    def test_distributions_follow_the_legacy_generator(self):
+        """Test categories, amounts, merchants and dates stay in their ranges."""
+        df = sample_frame(np.random.default_rng(1), 50_000)
+        shares = df["category"].value_counts(normalize=True)
+        self.assertAlmostEqual(shares["TRAVEL"], 0.30 / 1.04, delta=0.01)
+        # Income drawn like any category plus the legacy weekly income rows
+        income_share = (
+            CATEGORY_WEIGHTS["INCOME"] * (1 - WEEKLY_INCOME_SHARE) + WEEKLY_INCOME_SHARE
+        )
+        self.assertAlmostEqual(shares["INCOME"], income_share, delta=0.005)
+        self.assertTrue(
+            (
+                df.loc[df["category"] == "INCOME", "amount"] == round(WEEKLY_INCOME, 2)
+            ).all()
+        )
+        loans = df.loc[df["category"] == "LOAN_PAYMENTS", "amount"]
+        self.assertTrue(loans.between(100.0, 300.0).all())
+        refunds = df[df["amount"] < 0]
+        self.assertTrue(refunds["category"].isin(["TRAVEL", "SHOPPING"]).all())
+        travel = df[df["category"] == "TRAVEL"]
+        self.assertTrue((travel["merchant_name"] == "Lufthansa").all())
+        self.assertTrue(travel["store_number"].isna().all())
+        self.assertEqual(df["date"].min()[:4], "2024")
+        self.assertLessEqual(df["date"].max(), "2025-12-31")
+
+    def test_weekly_income_continues_across_batches(self):
+        """Test each batch pays the weeks after the previous batch's."""
+        batches = iter_sample_batches(2600, batch_size=1000)
+        weekly = []
+        # round(2600 * 0.04 / 1.04) = 100 payments, split by cumulative row
+        for batch, payments in zip(batches, [38, 39, 23]):
+            tail = batch.tail(payments)
+            self.assertTrue((tail["category"] == "INCOME").all())
+            weekly.extend(tail["date"])
+        expected = pd.date_range(START_DATE, periods=100, freq="7D")
+        self.assertEqual(weekly, list(expected.strftime("%Y-%m-%d")))
+
+    def test_jsonl_and_parquet_hold_the_same_plaid_records(self):
+        """Test both formats stream the same records, which the cleaner accepts."""
+        jsonl, parquet = self.path("sample.jsonl"), self.path("sample.parquet")
+        stats = write_sample_transactions(jsonl, 1200, users=5, batch_size=500)
+        self.assertEqual(stats["rows"], 1200)
+        self.assertEqual(stats["batches"], 3)
+        write_sample_transactions(parquet, 1200, users=5, batch_size=500)
+        records = list(iter_json_records(jsonl))
+        self.assertEqual(pd.read_parquet(parquet).shape[0], 1200)
+        import pyarrow.parquet as pq
+
+        self.assertEqual(pq.read_table(parquet).to_pylist(), records)
+        self.assertEqual(
+            records[0]["personal_finance_category"]["detailed"],
+            records[0]["personal_finance_category"]["primary"] + "_DETAILED",
+        )
+        cleaned = clean_frame(pd.DataFrame(records))
+        self.assertEqual(len(cleaned), 1200)
+        self.assertNotIn("Uncategorized", set(cleaned["category"]))
+
+    def test_schema_is_stable_for_single_kind_batches(self):
+        """Test a batch without travel rows keeps string-typed columns."""
+        df = sample_frame(np.random.default_rng(2), 200)
+        travel = to_arrow_table(df[df["category"] == "TRAVEL"])
+        other = to_arrow_table(df[df["category"] != "TRAVEL"])
+        self.assertEqual(travel.schema, other.schema)
+
+    def test_unsupported_format(self):
+        """Test an unknown extension reports an error and writes nothing."""
+        path = self.path("sample.csv")
+        self.assertEqual(write_sample_transactions(path, 10), {})
+        self.assertFalse(os.path.exists(path))
+        self.assertFalse(os.path.exists(f"{path}.tmp"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,152 @@
+import unittest
+from unittest.mock import patch
+import os
+import re
+import tempfile
+import numpy as np
+import pandas as pd
+from src.analysis import spending_reports
+from src.budgeting import apply_50_30_20_rule
+from src.scenarios import (
+    cube_aggregates,
+    evaluate_scenarios,
+    monthly_aggregates,
+    scenario_grid,
+    summarize_scenarios,
+)
+from src.spending_cube import SpendingCube
+from src.storage import save_transactions
+
+
+def make_cleaned():
+    return pd.DataFrame(
+        {
+            "transaction_id": ["tx1", "tx2", "tx3", "tx4", "tx5", "tx6"],
+            "date": pd.to_datetime(
+                [
+                    "2025-05-02",
+                    "2025-05-10",
+                    "2025-05-20",
+                    "2025-06-03",
+                    "2025-06-07",
+                    "2025-06-09",
+                ]
+            ),
+            "merchant_name": ["rewe", "lufthansa", "bank", "rewe", "ikea", "zara"],
+            "amount": [900.0, 1500.0, 300.0, 1200.0, 600.0, -50.0],
+            "category": ["Food", "Travel", "Other", "Food", "Shopping", "Shopping"],
+        }
+    )
+
+
+class TestScenarioGrid(unittest.TestCase):
+    def test_one_row_per_combination(self):
+        """Test the grid is the product of every adjustment."""
+        grid = scenario_grid(
+            income=[None, 3500.0],
+            multipliers={"Travel": [1.0, 0.8, 0.5]},
+            debt_interest_rate=[0.0, 12.5],
+        )
+        self.assertEqual(len(grid), 12)
+        self.assertEqual(grid["income"].isna().sum(), 6)
+        self.assertEqual(sorted(set(grid["Travel multiplier"])), [0.5, 0.8, 1.0])
+
+
+class TestEvaluateScenarios(unittest.TestCase):
+    def test_unchanged_scenario_matches_budget_report(self):
+        """Test the neutral scenario reproduces apply_50_30_20_rule's statuses."""
+        df = make_cleaned()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "transactions_cleaned.parquet")
+            save_transactions(df, path)
+            with patch("src.budgeting.estimate_monthly_income", return_value={}):
+                reports = apply_50_30_20_rule(
+                    path, os.path.join(tmpdir, "budget_report.json")
+                )
+        income = {month: report["income"] for month, report in reports.items()}
+        outcomes = evaluate_scenarios(
+            monthly_aggregates(df, income), scenario_grid()
+        ).set_index("month")
+        for month, report in reports.items():
+            for bucket in ["needs", "wants"]:
+                self.assertAlmostEqual(
+                    outcomes.loc[month, bucket], report[bucket]["amount"]
+                )
+                self.assertEqual(
+                    outcomes.loc[month, f"{bucket}_status"], report[bucket]["status"]
+                )
+            self.assertEqual(
+                outcomes.loc[month, "savings_status"],
+                report["savings_debt"]["status"],
+            )
+
+    def test_cutting_a_category(self):
+        """Test a Travel multiplier only scales Travel spending."""
+        aggregates = monthly_aggregates(make_cleaned())
+        grid = scenario_grid(multipliers={"Travel": [1.0, 0.5]})
+        outcomes = evaluate_scenarios(aggregates, grid, months=["2025-05"])
+        self.assertEqual(outcomes["wants"].tolist(), [1500.0, 750.0])
+        self.assertEqual(outcomes["needs"].tolist(), [900.0, 900.0])
+        self.assertEqual(outcomes["wants_status"].tolist(), ["Over", "Under"])
+
+    def test_income_drop_and_debt(self):
+        """Test lower income raises risk and debt follows the spare savings."""
+        aggregates = monthly_aggregates(make_cleaned())
+        grid = scenario_grid(income=[None, 3500.0], debt_interest_rate=[0.0])
+        outcomes = evaluate_scenarios(aggregates, grid, months=["2025-06"])
+        self.assertEqual(outcomes["income"].tolist(), [4000.0, 3500.0])
+        self.assertEqual(outcomes["risks"].tolist(), ["High", "High"])
+        # 20% of income with no Other spending goes to the €5000 debt
+        self.assertEqual(outcomes["debt_months"].tolist(), [7.0, 8.0])
+        self.assertEqual(outcomes["debt_interest"].tolist(), [0.0, 0.0])
+
+    def test_income_rows_count_against_savings_debt(self):
+        """Test risks and debt use the analysis' signed Other total."""
+        df = pd.DataFrame(
+            {
+                "date": pd.to_datetime(["2025-06-02", "2025-06-05", "2025-06-28"]),
+                "amount": [500.0, 900.0, -3000.0],
+                # Cleaned INCOME rows are categorised as Other
+                "category": ["Food", "Other", "Other"],
+            }
+        )
+        outcomes = evaluate_scenarios(monthly_aggregates(df), scenario_grid())
+        _, reports = spending_reports(df, 4000.0)
+        report = reports[("default", "2025-06")]
+        # The 50/30/20 bucket still only counts the positive €900
+        self.assertEqual(outcomes["savings_debt"].tolist(), [900.0])
+        self.assertEqual(outcomes["savings_status"].tolist(), ["Over"])
+        self.assertEqual(outcomes["risks"].tolist(), [report["risks"]])
+        self.assertEqual(report["risks"], "High")
+        months = int(re.search(r"in (\d+) months", report["debt_strategy"])[1])
+        self.assertEqual(outcomes["debt_months"].tolist(), [months])
+        # €800 + €2100 a month goes to the debt instead of nothing
+        self.assertEqual(months, 2)
+
+    def test_matches_cube_aggregates(self):
+        """Test the dashboard's SpendingCube gives the same aggregates."""
+        df = make_cleaned()
+        from_frame = monthly_aggregates(df)
+        from_cube = cube_aggregates(SpendingCube.from_frame(df))
+        self.assertEqual(from_cube["months"], from_frame["months"])
+        self.assertEqual(from_cube["categories"], from_frame["categories"])
+        np.testing.assert_allclose(from_cube["spend"], from_frame["spend"])
+        np.testing.assert_allclose(from_cube["net"], from_frame["net"])
+
+    def test_unknown_category(self):
+        """Test multipliers for categories without data are rejected."""
+        grid = scenario_grid(multipliers={"Gambling": [0.5]})
+        with self.assertRaises(ValueError):
+            evaluate_scenarios(monthly_aggregates(make_cleaned()), grid)
+
+    def test_summary(self):
+        """Test the summary counts risky months per scenario."""
+        grid = scenario_grid(multipliers={"Travel": [1.0, 0.0], "Shopping": [1.0]})
+        outcomes = evaluate_scenarios(monthly_aggregates(make_cleaned()), grid)
+        summary = summarize_scenarios(grid, outcomes)
+        self.assertEqual(summary["wants_over_months"].tolist(), [1, 0])
+        self.assertEqual(len(summary), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,200 @@
+import unittest
+from unittest.mock import patch
+import os
+import json
+import tempfile
+import numpy as np
+import pandas as pd
+from src import data_access
+from src.data_access import invalidate, load_spending_cube
+from src.journal import compact_journal, journal_transaction, replay_transactions
+from src.spending_cube import SpendingCube
+
+
+def make_transactions(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.Series(
+        np.datetime64("2025-01-01")
+        + rng.integers(0, 365, rows).astype("timedelta64[D]")
+    )
+    dates[rng.random(rows) < 0.02] = pd.NaT
+    return pd.DataFrame(
+        {
+            "date": dates,
+            "amount": rng.uniform(-100.0, 300.0, rows).round(2),
+            "category": np.array(["Food", "Travel", "Shopping", "Other"])[
+                rng.integers(0, 4, rows)
+            ],
+        }
+    )
+
+
+def panel_spending(df, month):
+    """The Spending Analysis panel's original filter + groupby."""
+    df_month = df[
+        (df["date"].dt.to_period("M") == pd.to_datetime(month).to_period("M"))
+        & (df["amount"] > 0)
+    ]
+    return df_month.groupby("category")["amount"].sum().to_dict()
+
+
+class TestSpendingCube(unittest.TestCase):
+    def assertSpendingEqual(self, actual, expected):
+        self.assertEqual(list(actual), list(expected))
+        for category in expected:
+            self.assertAlmostEqual(actual[category], expected[category], places=6)
+
+    def test_matches_panel_groupby_for_every_month(self):
+        """Test cube lookups equal filtering and grouping the full frame."""
+        df = make_transactions(5000)
+        cube = SpendingCube.from_frame(df)
+        self.assertEqual(len(cube.months()), 12)
+        for month in cube.months() + ["2030-01"]:
+            self.assertSpendingEqual(cube.spending(month), panel_spending(df, month))
+
+    def test_cell_counts_and_net(self):
+        """Test a cell tracks positive spend/count and net amount/row count."""
+        df = pd.DataFrame(
+            {
+                "date": pd.to_datetime(["2025-06-01", "2025-06-02", "2025-06-03"]),
+                "amount": [20.0, -5.0, 10.0],
+                "category": ["Food", "Food", "Food"],
+            }
+        )
+        cell = SpendingCube.from_frame(df).cell("2025-06", "Food")
+        self.assertEqual(cell, {"spend": 30.0, "count": 2, "net": 25.0, "n": 3})
+
+    def test_incremental_add_matches_rebuild(self):
+        """Test adding appended rows gives the same cube as rebuilding."""
+        df = make_transactions(3000, seed=1)
+        cube = SpendingCube.from_frame(df.iloc[:2500])
+        extended = cube.with_frame(df.iloc[2500:])
+        rebuilt = SpendingCube.from_frame(df)
+        self.assertEqual(extended.months(), rebuilt.months())
+        for month in rebuilt.months():
+            self.assertSpendingEqual(extended.spending(month), rebuilt.spending(month))
+        # The original cube is left unchanged
+        self.assertSpendingEqual(
+            cube.spending("2025-03"), panel_spending(df.iloc[:2500], "2025-03")
+        )
+
+    def test_totals_and_top_merchants(self):
+        """Test totals over months and merchant rankings use positive spend."""
+        df = pd.DataFrame(
+            {
+                "date": pd.to_datetime(
+                    ["2025-05-01", "2025-06-01", "2025-06-02", "2025-06-03"]
+                ),
+                "amount": [10.0, 20.0, -5.0, 30.0],
+                "category": ["Food", "Food", "Food", "Travel"],
+                "merchant_name": ["Rewe", "Rewe", "Rewe", "Lufthansa"],
+            }
+        )
+        cube = SpendingCube.from_frame(df.iloc[:2]).with_frame(df.iloc[2:])
+        self.assertEqual(cube.categories(), ["Food", "Travel"])
+        self.assertEqual(
+            cube.total(["2025-05", "2025-06"], "Food"),
+            {"spend": 30.0, "count": 2, "net": 25.0, "n": 3},
+        )
+        self.assertEqual(cube.total(["2025-06"])["spend"], 50.0)
+        self.assertEqual(
+            cube.top_merchants(["2025-05", "2025-06"]),
+            [("Lufthansa", 30.0), ("Rewe", 30.0)],
+        )
+        self.assertEqual(cube.top_merchants(["2025-06"], n=1), [("Lufthansa", 30.0)])
+
+    def test_journaled_transactions_update_loaded_cube(self):
+        """Test journal appends show up without regrouping the snapshot."""
+        invalidate()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "transactions_cleaned.json")
+            journal_path = os.path.join(tmpdir, "dashboard_journal.jsonl")
+            with open(path, "w") as f:
+                json.dump(
+                    [
+                        {"date": "2025-06-01", "amount": 12.0, "category": "Food"},
+                        {
+                            "txnId": "txn_1",
+                            "date": "2025-06-02",
+                            "amount": 50.0,
+                            "category": "Savings",
+                        },
+                    ],
+                    f,
+                )
+            self.assertEqual(
+                load_spending_cube(path, journal_path).spending("2025-06"),
+                {"Food": 12.0, "Savings": 50.0},
+            )
+            for txn_id in ["txn_1", "txn_2"]:  # txn_1 was already compacted
+                journal_transaction(
+                    {
+                        "txnId": txn_id,
+                        "date": "2025-06-20T10:00:00",
+                        "amount": 25.0,
+                        "category": "Savings",
+                    },
+                    journal_path,
+                )
+            self.assertEqual(
+                load_spending_cube(path, journal_path).spending("2025-06"),
+                {"Food": 12.0, "Savings": 75.0},
+            )
+        invalidate()
+
+    def test_journal_appends_are_read_incrementally(self):
+        """Test each load reads only the journal entries added since the last one."""
+        invalidate()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "transactions_cleaned.json")
+            journal_path = os.path.join(tmpdir, "dashboard_journal.jsonl")
+            with open(path, "w") as f:
+                json.dump(
+                    [
+                        {"date": "2025-05-01", "amount": 40.0, "category": "Food"},
+                        {"date": "2025-06-01", "amount": 12.0, "category": "Food"},
+                    ],
+                    f,
+                )
+
+            def save(txn_id):
+                journal_transaction(
+                    {
+                        "txnId": txn_id,
+                        "date": "2025-06-20T10:00:00",
+                        "amount": 25.0,
+                        "category": "Savings",
+                    },
+                    journal_path,
+                )
+
+            save("txn_1")
+            first = load_spending_cube(path, journal_path)
+            with patch.object(
+                data_access,
+                "read_journal_from",
+                wraps=data_access.read_journal_from,
+            ) as mock_read:
+                self.assertIs(load_spending_cube(path, journal_path), first)
+                save("txn_2")
+                second = load_spending_cube(path, journal_path)
+            (call,) = mock_read.call_args_list
+            self.assertEqual(call.args[1], os.path.getsize(journal_path) // 2)
+            self.assertEqual(
+                second.spending("2025-06"), {"Food": 12.0, "Savings": 50.0}
+            )
+            # Only the touched month is copied; the first cube is unchanged
+            self.assertIs(second.cells["2025-05"], first.cells["2025-05"])
+            self.assertEqual(first.spending("2025-06"), {"Food": 12.0, "Savings": 25.0})
+            # Compaction rewrites the journal, so the cube is rebuilt
+            compact_journal({path: replay_transactions}, journal_path)
+            save("txn_3")
+            self.assertEqual(
+                load_spending_cube(path, journal_path).spending("2025-06"),
+                {"Food": 12.0, "Savings": 75.0},
+            )
+        invalidate()
+
+
+if __name__ == "__main__":
+    unittest.main()
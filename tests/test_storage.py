@@ -0,0 +1,92 @@
+import unittest
+import os
+import tempfile
+import pandas as pd
+from src.storage import (
+    load_transactions,
+    register_backend,
+    save_transactions,
+    BACKENDS,
+)
+from src.budgeting import apply_50_30_20_rule
+from unittest.mock import patch
+
+
+class TestStorage(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.df = pd.DataFrame(
+            {
+                "transaction_id": ["tx1", "tx2", "tx3"],
+                "date": pd.to_datetime(["2025-05-03", "2025-05-20", "2025-06-01"]),
+                "merchant_name": ["store_", "lufthansa", "store_"],
+                "amount": [12.5, 300.0, -4.0],
+                "category": ["Food", "Travel", "Shopping"],
+                "account_id": ["acc1", "acc2", "acc1"],
+            }
+        )
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.tmpdir.name, name)
+
+    def test_parquet_round_trip_types(self):
+        """Test Parquet keeps native datetime and categorical dtypes."""
+        save_transactions(self.df, self.path("cleaned.parquet"))
+        loaded = load_transactions(self.path("cleaned.parquet"))
+        self.assertTrue(pd.api.types.is_datetime64_any_dtype(loaded["date"]))
+        self.assertIsInstance(loaded["category"].dtype, pd.CategoricalDtype)
+        self.assertEqual(loaded["amount"].tolist(), self.df["amount"].tolist())
+        self.assertEqual(loaded["category"].tolist(), self.df["category"].tolist())
+
+    def test_column_projection(self):
+        """Test both backends return only the requested columns."""
+        for name in ["cleaned.parquet", "cleaned.json"]:
+            save_transactions(self.df, self.path(name))
+            loaded = load_transactions(self.path(name), columns=["date", "amount"])
+            self.assertEqual(list(loaded.columns), ["date", "amount"])
+            self.assertTrue(pd.api.types.is_datetime64_any_dtype(loaded["date"]))
+
+    def test_json_export_format(self):
+        """Test the JSON export keeps the indented ISO-dated records layout."""
+        save_transactions(self.df, self.path("cleaned.json"))
+        with open(self.path("cleaned.json")) as f:
+            text = f.read()
+        self.assertIn('"date":"2025-05-03T00:00:00.000"', text)
+        self.assertTrue(text.startswith("[\n  {"))
+
+    def test_unknown_extension(self):
+        """Test an unregistered extension raises a clear error."""
+        with self.assertRaises(ValueError):
+            save_transactions(self.df, self.path("cleaned.csv"))
+
+    def test_register_backend(self):
+        """Test a custom backend can be plugged in by extension."""
+        saved = {}
+        register_backend(
+            ".mem",
+            lambda path, columns=None: saved[path],
+            lambda df, path: saved.__setitem__(path, df),
+        )
+        try:
+            save_transactions(self.df, self.path("cleaned.mem"))
+            self.assertIs(load_transactions(self.path("cleaned.mem")), self.df)
+        finally:
+            del BACKENDS[".mem"]
+
+    def test_budget_report_same_for_both_backends(self):
+        """Test the budget report is identical when read from Parquet or JSON."""
+        reports = {}
+        for name in ["cleaned.parquet", "cleaned.json"]:
+            save_transactions(self.df, self.path(name))
+            with patch("src.budgeting.estimate_monthly_income", return_value={}):
+                reports[name] = apply_50_30_20_rule(
+                    self.path(name), self.path("budget_report.json")
+                )
+        self.assertEqual(reports["cleaned.parquet"], reports["cleaned.json"])
+
+
+if __name__ == "__main__":
+    unittest.main()
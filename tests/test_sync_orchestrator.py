@@ -0,0 +1,171 @@
+import unittest
+import os
+import json
+import tempfile
+import threading
+import time
+from datetime import date
+from src.plaid_sync import item_key
+from src.storage import load_transactions
+from src.sync_orchestrator import is_rate_limited, sync_items
+
+
+def request_factory(access_token, cursor=None):
+    return {"access_token": access_token, "cursor": cursor}
+
+
+class FakeRateLimitError(Exception):
+    def __init__(self):
+        super().__init__("rate limited")
+        self.status = 429
+        self.body = json.dumps(
+            {"error_type": "RATE_LIMIT_EXCEEDED", "error_code": "TRANSACTIONS_LIMIT"}
+        )
+
+
+class StubPlaidClient:
+    """Serves two pages per access token after sleeping for latency seconds.
+
+    Tokens listed in rate_limited fail their first call with a 429 and tokens
+    in broken always fail.
+    """
+
+    def __init__(self, latency=0.0, rate_limited=(), broken=()):
+        self.latency = latency
+        self.rate_limited = set(rate_limited)
+        self.broken = set(broken)
+        self.lock = threading.Lock()
+        self.active = 0
+        self.max_active = 0
+
+    def transactions_sync(self, request):
+        token, cursor = request["access_token"], request["cursor"]
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            time.sleep(self.latency)
+            with self.lock:
+                if token in self.rate_limited:
+                    self.rate_limited.discard(token)
+                    raise FakeRateLimitError()
+            if token in self.broken:
+                raise ValueError(f"item {token} is broken")
+            page = 1 if cursor is None else 2
+            return {
+                "added": [
+                    {
+                        "transaction_id": f"{token}-{page}",
+                        "account_id": f"{token}-acc",
+                        "date": date(2025, 6, page),
+                        "merchant_name": "store_",
+                        "amount": 10.0 * page,
+                        "personal_finance_category": {"primary": "FOOD_AND_DRINK"},
+                    }
+                ],
+                "modified": [],
+                "removed": [],
+                "next_cursor": f"{token}-c{page}",
+                "has_more": page == 1,
+            }
+        finally:
+            with self.lock:
+                self.active -= 1
+
+
+class TestSyncOrchestrator(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmpdir.name, "finagent.db")
+        self.cleaned_path = os.path.join(
+            self.tmpdir.name, "transactions_cleaned.parquet"
+        )
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def sync(self, client, tokens, **kwargs):
+        kwargs.setdefault("sleep", lambda delay: None)
+        return sync_items(
+            client,
+            tokens,
+            db_path=self.db_path,
+            cleaned_path=self.cleaned_path,
+            request_factory=request_factory,
+            **kwargs,
+        )
+
+    def test_items_are_fetched_concurrently_within_the_pool_bound(self):
+        """Test items overlap in time but never exceed max_workers."""
+        client = StubPlaidClient(latency=0.05)
+        tokens = [f"token{i}" for i in range(6)]
+        start = time.perf_counter()
+        summaries = self.sync(client, tokens, max_workers=3)
+        elapsed = time.perf_counter() - start
+        # Serially: 6 items x 2 pages x 50ms = 600ms
+        self.assertLess(elapsed, 0.45)
+        self.assertEqual(client.max_active, 3)
+        self.assertEqual([s["item_id"] for s in summaries], list(map(item_key, tokens)))
+        self.assertTrue(all(s["added"] == 2 for s in summaries))
+
+    def test_rate_limited_item_retries_with_backoff(self):
+        """Test a 429 is retried after a jittered, bounded backoff delay."""
+        delays = []
+        client = StubPlaidClient(rate_limited=["token1"])
+        summaries = self.sync(
+            client, ["token0", "token1"], base_delay=0.5, sleep=delays.append
+        )
+        self.assertEqual([s["retries"] for s in summaries], [0, 1])
+        self.assertEqual(len(delays), 1)
+        self.assertTrue(0 <= delays[0] <= 0.5)
+
+    def test_failed_item_does_not_block_others(self):
+        """Test one broken item is reported while the rest are merged."""
+        client = StubPlaidClient(broken=["token1"])
+        summaries = self.sync(client, ["token0", "token1", "token2"])
+        self.assertIn("error", summaries[1])
+        self.assertEqual(summaries[0]["added"], 2)
+        cleaned = load_transactions(self.cleaned_path)
+        self.assertEqual(
+            sorted(cleaned["transaction_id"]),
+            ["token0-1", "token0-2", "token2-1", "token2-2"],
+        )
+
+    def test_rerun_only_fetches_new_pages(self):
+        """Test a second run resumes every item from its stored cursor."""
+        client = StubPlaidClient()
+        self.sync(client, ["token0", "token1"])
+        summaries = self.sync(client, ["token0", "token1"])
+        # Stored cursors point at page 2, which is served again but upserted
+        self.assertEqual([s["added"] for s in summaries], [1, 1])
+        self.assertEqual(len(load_transactions(self.cleaned_path)), 4)
+
+    def test_all_transactions_removed(self):
+        """Test the cleaned store is emptied once every transaction is removed."""
+        client = StubPlaidClient()
+        self.sync(client, ["token0"])
+        self.assertEqual(len(load_transactions(self.cleaned_path)), 2)
+        client.transactions_sync = lambda request: {
+            "added": [],
+            "modified": [],
+            "removed": [
+                {"transaction_id": "token0-1"},
+                {"transaction_id": "token0-2"},
+            ],
+            "next_cursor": "token0-c3",
+            "has_more": False,
+        }
+        (summary,) = self.sync(client, ["token0"])
+        self.assertEqual(summary["removed"], 2)
+        cleaned = load_transactions(self.cleaned_path)
+        self.assertTrue(cleaned.empty)
+        self.assertIn("transaction_id", cleaned.columns)
+
+    def test_is_rate_limited(self):
+        """Test rate limits are recognised by status or Plaid error_type."""
+        self.assertTrue(is_rate_limited(FakeRateLimitError()))
+        self.assertFalse(is_rate_limited(ValueError("boom")))
+
+
+if __name__ == "__main__":
+    unittest.main()
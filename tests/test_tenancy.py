@@ -0,0 +1,210 @@
+import unittest
+from unittest.mock import patch
+import os
+import tempfile
+from contextlib import closing
+import pandas as pd
+from src.analysis import analyze_spending
+from src.budgeting import apply_50_30_20_rule
+from src.db import connect, init_schema, save_monthly_reports, table_columns
+from src.incremental import (
+    changed_months,
+    init_fingerprint_table,
+    load_fingerprints,
+    month_fingerprints,
+    save_fingerprints,
+)
+from src.storage import save_transactions
+from src.tenancy import DEFAULT_USER, select_months, user_reports
+
+
+def make_cleaned():
+    return pd.DataFrame(
+        {
+            "transaction_id": [f"tx{i}" for i in range(1, 8)],
+            "date": pd.to_datetime(
+                [
+                    "2025-05-02",
+                    "2025-05-10",
+                    "2025-06-03",
+                    "2025-05-04",
+                    "2025-06-07",
+                    "2025-06-20",
+                    "2025-06-21",
+                ]
+            ),
+            "merchant_name": [
+                "rewe",
+                "lufthansa",
+                "rewe",
+                "bank",
+                "ikea",
+                "h&m",
+                "bank",
+            ],
+            "amount": [100.0, 1500.0, 40.0, 900.0, 250.0, 60.0, 300.0],
+            "category": [
+                "Food",
+                "Travel",
+                "Food",
+                "Other",
+                "Shopping",
+                "Shopping",
+                "Other",
+            ],
+            "account_id": ["acc1", "acc1", "acc1", "acc2", "acc2", "acc3", "acc3"],
+            "user_id": ["alice", "alice", "alice", "bob", "bob", "carol", "carol"],
+        }
+    )
+
+
+class TestSelectMonths(unittest.TestCase):
+    def test_months_and_user_month_pairs(self):
+        """Test plain months select every user and pairs select one user's month."""
+        df = make_cleaned()
+        periods = df["date"].dt.to_period("M")
+        mask = select_months(df["user_id"], periods, ["2025-05", ("carol", "2025-06")])
+        self.assertEqual(
+            list(df["transaction_id"][mask]), ["tx1", "tx2", "tx4", "tx6", "tx7"]
+        )
+
+
+class TestUserReports(unittest.TestCase):
+    def test_single_user_and_nested_reports(self):
+        """Test one user's months are picked out of reports nested by user."""
+        months = {"2025-05": 1, "2025-06": 2}
+        self.assertIs(user_reports(months), months)
+        self.assertEqual(user_reports({"bob": {"2025-06": 3}, "alice": months}), months)
+        self.assertEqual(
+            user_reports({"bob": {"2025-06": 3}, DEFAULT_USER: months}), months
+        )
+        self.assertEqual(user_reports({"bob": {"2025-06": 3}}, "bob"), {"2025-06": 3})
+        self.assertEqual(user_reports({}), {})
+
+
+class TestMigration(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmpdir.name, "finagent.db")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_single_user_tables_are_migrated(self):
+        """Test tables from before user_id keep their rows under DEFAULT_USER."""
+        with closing(connect(self.db_path)) as conn:
+            with conn:
+                conn.execute(
+                    """CREATE TABLE monthly_reports
+                    (month TEXT PRIMARY KEY, income REAL, needs_amount REAL,
+                    wants_amount REAL, savings_debt_amount REAL, total_spending REAL,
+                    avg_spending REAL, risks TEXT, debt_strategy TEXT)"""
+                )
+                conn.execute(
+                    "INSERT INTO monthly_reports VALUES "
+                    "('2025-06', 4000, 1, 2, 3, 6, 2, '[]', '{}')"
+                )
+                conn.execute(
+                    """CREATE TABLE month_fingerprints
+                    (month TEXT PRIMARY KEY, fingerprint TEXT, updated_at TEXT)"""
+                )
+                conn.execute(
+                    "INSERT INTO month_fingerprints VALUES ('2025-06', 'abc', 'now')"
+                )
+            init_schema(conn)
+            init_fingerprint_table(conn)
+            self.assertEqual(table_columns(conn, "monthly_reports")[0], "user_id")
+            self.assertEqual(
+                conn.execute(
+                    "SELECT user_id, month, income FROM monthly_reports"
+                ).fetchall(),
+                [(DEFAULT_USER, "2025-06", 4000.0)],
+            )
+            self.assertEqual(load_fingerprints(conn), {"2025-06": "abc"})
+            # Another user's month no longer collides with the migrated one
+            save_monthly_reports(
+                conn, [("2025-06", 100, 0, 0, 0, 0, 0, "[]", "{}")], "alice"
+            )
+            self.assertEqual(
+                conn.execute("SELECT COUNT(*) FROM monthly_reports").fetchone()[0], 2
+            )
+
+
+class TestByUser(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.tmpdir.name, name)
+
+    def run_stages(self, df, name, by_user=False, income=4000.0):
+        clean_path = self.path(f"{name}.parquet")
+        save_transactions(df, clean_path)
+        with patch("src.budgeting.estimate_monthly_income", return_value={}):
+            budget = apply_50_30_20_rule(
+                clean_path, self.path(f"{name}_budget.json"), by_user=by_user
+            )
+        with closing(connect(self.path(f"{name}.db"))) as conn:
+            analysis = analyze_spending(income, clean_path, conn=conn, by_user=by_user)
+        return budget, analysis
+
+    def test_matches_separate_single_user_runs(self):
+        """Test one partitioned run equals running each user's data on its own."""
+        df = make_cleaned()
+        budget, analysis = self.run_stages(
+            df,
+            "all",
+            by_user=True,
+            income={"alice": 3000.0, "bob": 5000.0, "carol": 4000.0},
+        )
+        self.assertEqual(sorted(budget), ["alice", "bob", "carol"])
+        for user, income in [("alice", 3000.0), ("bob", 5000.0), ("carol", 4000.0)]:
+            subset = df[df["user_id"] == user].drop(columns="user_id")
+            user_budget, user_analysis = self.run_stages(subset, user, income=income)
+            self.assertEqual(budget[user], user_budget)
+            self.assertEqual(sorted(analysis[user]), sorted(user_analysis))
+            for month, report in user_analysis.items():
+                for key, value in report.items():
+                    if isinstance(value, float):
+                        self.assertAlmostEqual(analysis[user][month][key], value)
+                    else:
+                        self.assertEqual(analysis[user][month][key], value)
+
+    def test_reports_are_stored_per_user(self):
+        """Test monthly_reports holds one row per user and month."""
+        self.run_stages(make_cleaned(), "all", by_user=True)
+        with closing(connect(self.path("all.db"))) as conn:
+            rows = conn.execute(
+                "SELECT user_id, month FROM monthly_reports ORDER BY user_id, month"
+            ).fetchall()
+        self.assertEqual(
+            rows,
+            [
+                ("alice", "2025-05"),
+                ("alice", "2025-06"),
+                ("bob", "2025-05"),
+                ("bob", "2025-06"),
+                ("carol", "2025-06"),
+            ],
+        )
+
+    def test_fingerprints_are_keyed_by_user(self):
+        """Test editing one user's month only marks that user's month changed."""
+        df = make_cleaned()
+        with closing(connect(self.path("finagent.db"))) as conn:
+            fingerprints = month_fingerprints(df, by_user=True)
+            self.assertEqual(len(changed_months(conn, fingerprints, True)), 5)
+            save_fingerprints(conn, fingerprints, by_user=True)
+            df.loc[4, "amount"] = 255.0
+            self.assertEqual(
+                changed_months(conn, month_fingerprints(df, by_user=True), True),
+                [("bob", "2025-06")],
+            )
+            self.assertEqual(load_fingerprints(conn), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
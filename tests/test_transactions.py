@@ -1,7 +1,16 @@
 import unittest
 from unittest.mock import patch
 from src.sample_data import generate_sample_transactions
-from src.clean_transactions import clean_transactions
+from src.clean_transactions import (
+    clean_frame,
+    clean_transactions,
+    clean_transactions_stream,
+    iter_json_records,
+    SeenTransactionIds,
+)
+import os
+import json
+import tempfile
 import pandas as pd
 from datetime import datetime
 
@@ -152,11 +161,122 @@ class TestTransactionCleaner(unittest.TestCase):
         cleaned = clean_transactions(data)
         self.assertEqual(len(cleaned), 0)
 
+    def test_adjust_date_to_authorized_previous_month(self):
+        """Test a transaction posted on the 1st keeps its previous-month authorized date."""
+        data = [
+            {"transaction_id": "tx1", "date": "2025-06-01", "authorized_date": "2025-05-30", "amount": 12.0,
+             "personal_finance_category": {"primary": "FOOD_AND_DRINK"}},
+            {"transaction_id": "tx2", "date": "2025-06-02", "authorized_date": "2025-05-30", "amount": 12.0,
+             "personal_finance_category": {"primary": "FOOD_AND_DRINK"}},
+            {"transaction_id": "tx3", "date": "2025-06-01", "authorized_date": None, "amount": 12.0,
+             "personal_finance_category": {"primary": "FOOD_AND_DRINK"}},
+        ]
+        cleaned = clean_transactions(data)
+        self.assertEqual(cleaned["date"].dt.strftime("%Y-%m-%d").tolist(), ["2025-05-30", "2025-06-02", "2025-06-01"])
+
+    def test_category_fallback_to_legacy_category(self):
+        """Test the legacy category list is used when personal_finance_category has no primary."""
+        data = [
+            {"transaction_id": "tx1", "date": "2025-06-15", "amount": 12.0,
+             "personal_finance_category": {"detailed": "X"}, "category": ["TRAVEL airline"]},
+            {"transaction_id": "tx2", "date": "2025-06-15", "amount": 12.0,
+             "personal_finance_category": {"primary": "SHOPPING"}, "category": ["TRAVEL"]},
+            {"transaction_id": "tx3", "date": "2025-06-15", "amount": 12.0,
+             "personal_finance_category": "FOOD_AND_DRINK", "category": []},
+        ]
+        cleaned = clean_transactions(data)
+        self.assertEqual(cleaned["category"].tolist(), ["Travel", "Shopping", "Uncategorized"])
+
+    def test_category_missing_and_null_legacy_category(self):
+        """Test rows with a null or absent legacy category still map by primary category."""
+        data = [
+            {"transaction_id": "tx1", "date": "2025-06-15", "amount": 12.0,
+             "personal_finance_category": {"primary": "TRAVEL"}, "category": None},
+            {"transaction_id": "tx2", "date": "2025-06-15", "amount": 12.0,
+             "personal_finance_category": {"primary": "INCOME"}},
+        ]
+        cleaned = clean_transactions(data)
+        self.assertEqual(cleaned["category"].tolist(), ["Travel", "Other"])
+
+    def test_category_without_any_legacy_category_list(self):
+        """Test a legacy category column with no lists (all null, so float) is ignored."""
+        data = pd.DataFrame([
+            {"transaction_id": "tx1", "date": "2025-06-15", "amount": 12.0,
+             "personal_finance_category": {"primary": "TRAVEL"}, "category": float("nan")},
+            {"transaction_id": "tx2", "date": "2025-06-15", "amount": 12.0,
+             "personal_finance_category": {"detailed": "X"}, "category": float("nan")},
+        ])
+        self.assertEqual(data["category"].dtype, float)
+        cleaned = clean_frame(data)
+        self.assertEqual(cleaned["category"].tolist(), ["Travel", "Uncategorized"])
+
     def test_clean_empty_list(self):
         """Test cleaning an empty transaction list."""
         data = []
         cleaned = clean_transactions(data)
         self.assertEqual(len(cleaned), 0)
 
+class TestStreamingCleaner(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.transactions = [
+            create_transaction(f"tx{i % 40}", float(i + 1), datetime(2025, 1 + i % 12, 15),
+                               ["FOOD_AND_DRINK", "TRAVEL", "SHOPPING"][i % 3])
+            for i in range(100)
+        ]
+        for tx in self.transactions:
+            tx["authorized_date"] = tx["date"]
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.tmpdir.name, name)
+
+    def test_stream_json_array_matches_in_memory_cleaning(self):
+        """Test chunked cleaning of a JSON array matches cleaning the whole list at once."""
+        with open(self.path("raw.json"), "w") as f:
+            json.dump(self.transactions, f, indent=2)
+        expected = clean_transactions(self.transactions, self.path("expected.json"))
+        summary = clean_transactions_stream(self.path("raw.json"), self.path("cleaned.json"), chunk_size=7)
+        self.assertEqual(summary, {"rows_in": 100, "rows_out": 40, "chunks": 15})
+        streamed = pd.read_json(self.path("cleaned.json"))
+        self.assertEqual(streamed["transaction_id"].tolist(), expected["transaction_id"].tolist())
+        self.assertEqual(streamed["amount"].tolist(), expected["amount"].tolist())
+        self.assertEqual(streamed["category"].tolist(), expected["category"].tolist())
+
+    def test_stream_json_lines(self):
+        """Test JSON Lines input and output with duplicates spread across chunks."""
+        with open(self.path("raw.jsonl"), "w") as f:
+            for tx in self.transactions:
+                f.write(json.dumps(tx) + "\n")
+        summary = clean_transactions_stream(self.path("raw.jsonl"), self.path("cleaned.jsonl"), chunk_size=30)
+        self.assertEqual(summary["rows_out"], 40)
+        streamed = pd.read_json(self.path("cleaned.jsonl"), lines=True)
+        self.assertEqual(len(streamed), 40)
+        self.assertTrue(streamed["transaction_id"].is_unique)
+
+    def test_iter_json_records_across_blocks(self):
+        """Test records split across read blocks are parsed intact."""
+        with open(self.path("raw.json"), "w") as f:
+            json.dump(self.transactions, f)
+        records = list(iter_json_records(self.path("raw.json"), block_size=64))
+        self.assertEqual(records, self.transactions)
+
+    def test_seen_ids_across_chunks(self):
+        """Test the compact seen-set flags ids repeated in later chunks."""
+        seen = SeenTransactionIds()
+        self.assertEqual(seen.add_new(pd.Series(["a", "b"])).tolist(), [True, True])
+        self.assertEqual(seen.add_new(pd.Series(["c"])).tolist(), [True])
+        self.assertEqual(seen.add_new(pd.Series(["b", "d", "a"])).tolist(), [False, True, False])
+        self.assertEqual(len(seen), 4)
+
+    def test_stream_missing_input(self):
+        """Test a missing input file returns an empty summary and no output."""
+        summary = clean_transactions_stream(self.path("missing.json"), self.path("cleaned.json"))
+        self.assertEqual(summary, {})
+        self.assertFalse(os.path.exists(self.path("cleaned.json")))
+
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file